@@ -0,0 +1,135 @@
+__all__ = [
+    "CACHE_FORMAT_VERSION",
+    "_get_cache_path",
+    "_read_dataset_cache",
+    "_write_dataset_cache",
+]
+
+import os
+import json
+import hashlib
+import warnings
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from dataset.constants import NAN
+from dataset.functions import _get_storage_dtype, _is_missing
+
+# Increment whenever the layout of the cached data changes so that old cache files are ignored
+CACHE_FORMAT_VERSION = 3
+HASH_CHUNK_SIZE = 1 << 20
+# Data types of the columns that can be cached, by the name they are stored under
+CACHED_DTYPES = {"int": int, "float": float, "datetime": datetime, "str": str, "bool": bool}
+# Values that can be stored as JSON: the names, the schema and the values of columns not stored as numbers or dates
+CACHED_VALUE_TYPES = (str, int, float, bool)
+
+Columns = List[Tuple[np.ndarray, type]]
+Schema = List[Tuple[Any, Any]]
+
+
+def _get_cache_path(workbook_path: str) -> str:
+    # The cache is a hidden file stored next to the workbook it was parsed from
+    directory, file_name = os.path.split(workbook_path)
+    return os.path.join(directory, f".{file_name}.cache")
+
+
+def _get_content_hash(workbook_path: str) -> str:
+    content_hash = hashlib.sha256()
+    with open(workbook_path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
+def _is_cached_value(value: Any) -> bool:
+    return value is None or type(value) in CACHED_VALUE_TYPES
+
+
+def _read_dataset_cache(workbook_path: str) -> Optional[Tuple[List[Any], Schema, Columns]]:
+    # Returns None whenever the cache is missing, unreadable, malformed or out of date
+    # The cache is read as plain arrays and JSON only (never unpickled), so a cache file cannot run any code
+    cache_path = _get_cache_path(workbook_path)
+    try:
+        fingerprint, column_names, schema, columns = _load_cache(cache_path)
+        workbook_stat = os.stat(workbook_path)
+        size, mtime, content_hash = fingerprint
+        if size != workbook_stat.st_size:
+            return None
+        if mtime != workbook_stat.st_mtime_ns:
+            # The file was touched or copied; only its contents decide whether the cache is still valid
+            if content_hash != _get_content_hash(workbook_path):
+                return None
+            _dump_cache(cache_path, (size, workbook_stat.st_mtime_ns, content_hash), column_names, schema, columns)
+    except Exception:
+        # Whatever is wrong with the cache (e.g. a truncated file or one written by another version), the workbook
+        # is loaded instead, and the cache is written again
+        return None
+    return column_names, schema, columns
+
+
+def _write_dataset_cache(workbook_path: str, column_names: List[Any], schema: Schema, columns: Columns):
+    # Datasets with names or values that cannot be stored as arrays or JSON (e.g. times) are not cached
+    if not all(map(_is_cached_value, [*column_names, *(item for pair in schema for item in pair)])):
+        return
+    for values, dtype in columns:
+        if dtype not in CACHED_DTYPES.values():
+            return
+        if values.dtype == object and not all(_is_missing(value) or _is_cached_value(value) for value in values):
+            return
+    workbook_stat = os.stat(workbook_path)
+    fingerprint = (workbook_stat.st_size, workbook_stat.st_mtime_ns, _get_content_hash(workbook_path))
+    _dump_cache(_get_cache_path(workbook_path), fingerprint, column_names, schema, columns)
+
+
+def _load_cache(cache_path: str) -> Tuple[tuple, List[Any], Schema, Columns]:
+    # Raises an exception unless the cache is exactly what _dump_cache writes
+    with np.load(cache_path, allow_pickle=False) as archive:
+        metadata = json.loads(archive["metadata"].item())
+        if type(metadata) is not dict or metadata["version"] != CACHE_FORMAT_VERSION:
+            raise ValueError("The cache was written by another version")
+        size, mtime, content_hash = metadata["fingerprint"]
+        if not (type(size) is int and type(mtime) is int and type(content_hash) is str):
+            raise ValueError("The cache has no valid fingerprint")
+        column_names = list(metadata["column_names"])
+        schema = [(column_name, column_title) for column_name, column_title in metadata["schema"]]
+        object_values = metadata["object_values"]
+        columns = []
+        for index, dtype_name in enumerate(metadata["dtypes"]):
+            dtype = CACHED_DTYPES[dtype_name]
+            if _get_storage_dtype(dtype) == object:
+                values = np.empty(len(object_values[str(index)]), dtype=object)
+                values[:] = [NAN if value is None else value for value in object_values[str(index)]]
+            else:
+                values = archive[f"column_{index}"]
+                if values.dtype != _get_storage_dtype(dtype):
+                    raise ValueError("A column of the cache is stored with the wrong data type")
+            columns.append((values, dtype))
+    if len(columns) != len(column_names) or len({len(values) for values, _ in columns}) > 1 \
+            or any(values.ndim != 1 for values, _ in columns):
+        raise ValueError("The columns of the cache do not match")
+    return (size, mtime, content_hash), column_names, schema, columns
+
+
+def _dump_cache(cache_path: str, fingerprint: tuple, column_names: List[Any], schema: Schema, columns: Columns):
+    # Numbers and dates are stored as arrays; everything else, including the values of any other columns, as JSON
+    dtype_names = {dtype: dtype_name for dtype_name, dtype in CACHED_DTYPES.items()}
+    metadata = {
+        "version": CACHE_FORMAT_VERSION,
+        "fingerprint": list(fingerprint),
+        "column_names": column_names,
+        "schema": [list(pair) for pair in schema],
+        "dtypes": [dtype_names[dtype] for _, dtype in columns],
+        "object_values": {str(index): [None if _is_missing(value) else value for value in values.tolist()]
+                          for index, (values, _) in enumerate(columns) if values.dtype == object},
+    }
+    arrays = {f"column_{index}": values for index, (values, _) in enumerate(columns) if values.dtype != object}
+    # Write to a temporary file first so that an interrupted write never leaves a corrupt cache behind
+    temporary_path = cache_path + ".tmp"
+    try:
+        with open(temporary_path, "wb") as file:
+            np.savez(file, allow_pickle=False, metadata=np.array(json.dumps(metadata)), **arrays)
+        os.replace(temporary_path, cache_path)
+    except OSError as error:
+        warnings.warn(f"Could not write the dataset cache {cache_path!r}: {error}")
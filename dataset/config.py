@@ -4,15 +4,20 @@ __all__ = [
     "array_print_columns",
     "dataset_print_columns",
     "indentation_character",
+    "statistic_cache_size",
+    "statistic_executor",
+    "statistic_workers",
+    "approximate_quantiles",
+    "quantile_sketch_error",
     "dataset_configurables",
 ]
 
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 
 class Configurable:
 
-    def __init__(self, name: str, value: Any, validation: Optional[dict | list] = None):
+    def __init__(self, name: str, value: Any, validation: Optional[dict | list | Callable[[Any], bool]] = None):
         self.__name = name
         self.__value = value
         self.__validation = validation
@@ -30,7 +35,11 @@ class Configurable:
 
     def register_value(self, value: Any):
         iter_val = None
-        if self.__validation is not None:
+        if callable(self.__validation):
+            # A predicate telling whether the value is valid
+            if not self.__validation(value):
+                raise ValueError
+        elif self.__validation is not None:
             iter_val = value if value in self.__validation else None
             if type(self.__validation) is dict:
                 iter_val = self.__validation.get(value) or (value if value in self.__validation.values() else None)
@@ -45,10 +54,28 @@ max_array_print_rows = Configurable("max_array_print_rows", 30)
 array_print_columns = Configurable("array_print_columns", 80)
 dataset_print_columns = Configurable("dataset_print_columns", 120)
 indentation_character = Configurable("indentation_character", "<", validation={"left": "<", "right": ">"})
+# Maximum number of computed statistics remembered by each dataset (0 disables the cache)
+statistic_cache_size = Configurable("statistic_cache_size", 256)
+# How a statistic is evaluated over the columns of a dataset; the thread and process pools are opt-in
+statistic_executor = Configurable("statistic_executor", "serial", validation=["serial", "thread", "process"])
+# Number of workers used by the statistic executor (None uses one worker per CPU)
+statistic_workers = Configurable("statistic_workers", None,
+                                 validation=lambda value: value is None or (type(value) is int and value > 0))
+# Estimate the median, quartiles, IQR and outlier fences with a quantile sketch instead of sorting the data
+# Columns of a dataset are already loaded, so this saves the sort only (see QuantileSketch for bounded memory)
+approximate_quantiles = Configurable("approximate_quantiles", False, validation=[True, False])
+# Rank error of the quantile sketch as a fraction of the number of values (e.g. 0.01 is within 1% of the ranks)
+quantile_sketch_error = Configurable("quantile_sketch_error", 0.01,
+                                     validation=lambda value: type(value) in (int, float) and 0 < value < 1)
 
 dataset_configurables = [
     max_array_print_rows,
     array_print_columns,
     dataset_print_columns,
     indentation_character,
+    statistic_cache_size,
+    statistic_executor,
+    statistic_workers,
+    approximate_quantiles,
+    quantile_sketch_error,
 ]
@@ -1,64 +1,169 @@
 __all__ = ["Dataset", "DatasetStructure"]
 
 import os
-from datetime import timedelta
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from copy import copy
+from datetime import datetime, timedelta
 from inspect import signature
-from operator import attrgetter, itemgetter
-from typing import Any, Callable, List, Tuple, Generator
-from collections import Counter
+from itertools import repeat
+from typing import Any, Callable, List, Optional, Tuple, Generator
 
+import numpy as np
 from openpyxl import load_workbook
-from openpyxl.worksheet.worksheet import Worksheet
 
-from dataset.constants import DATA_FILE_DIRECTORY, EXCEL_FILE_NAME
+from dataset.constants import DATA_FILE_DIRECTORY, EXCEL_FILE_NAME, NAN
 from dataset.functions import (
-    _bound_worksheet_data_region, _generate_structure_string, _column_number_to_letter, _flatten,
-    _get_cell_values, _date_string_to_datetime, _replace_nones, _format_slice, _remove_nans, _get_array_dtype
+    _bound_worksheet_data_region, _generate_structure_string, _get_blank_column_numbers,
+    _format_slice, _get_cast_type, _is_missing, _pack_validity, _paginate_lines, _to_datetime64_array,
+    _to_python_list, _to_storage_array
 )
-from dataset.statmeasures import STATISTICAL_FUNCTIONS, Numeric, get_base_statistical_function, reformat_data
-from dataset.structures import _DatasetArrayRow, _DatasetArrayColumnView, _DatasetArray, _Schema
-from dataset.config import indentation_character, dataset_configurables
+from dataset.cache import _read_dataset_cache, _write_dataset_cache
+from dataset.query import _Expression
+from dataset.sketch import QuantileSketch
+from dataset.timeseries import ROLLING_STATISTICS, _get_bucket_bounds, _get_window_starts, _rolling_statistic
+from dataset.statmeasures import (
+    APPROXIMATE_FUNCTIONS, STATISTICAL_FUNCTIONS, SUMMARY_STATISTICS, Numeric, correlation_matrix, covariance_matrix,
+    _get_registry_version, _get_runtime_registrations, _register_worker_statistics, get_base_statistical_function,
+    get_statistical_measure, get_vectorized_function, reformat_data, statistical_summary
+)
+from dataset.structures import (
+    _DatasetArrayRow, _DatasetArrayColumnView, _DatasetColumn, _DatasetArray, _DateIndex, _Schema, _StatisticCache,
+    _StatisticTable, _check_date_storage
+)
+from dataset.config import (
+    indentation_character, dataset_configurables, approximate_quantiles, quantile_sketch_error, statistic_executor,
+    statistic_workers, max_array_print_rows
+)
+
+# Rows of a dataset are converted to Python values this many at a time while they are printed
+PRINT_CHUNK_SIZE = 1024
+STATISTIC_TABLE_HEADINGS = ["Column Name", "NA action", "Outlier action", "Decimal places", "Statistic", "Value"]
+
+# Pools used to evaluate statistics over many columns, keyed by executor type and worker count
+_statistic_executors = {}
+
+
+def _generate_column(column_name: str, values: list) -> _DatasetColumn:
+    # The most frequently appearing data type is cast to the whole column
+    dtype = _get_cast_type(values)
+    # Blank cells are read as None, so the validity of each value is known before it is stored
+    validity = _pack_validity(~np.fromiter(map(_is_missing, values), dtype=bool, count=len(values)))
+    return _DatasetColumn(column_name, _to_storage_array(values, dtype), dtype, validity=validity)
+
+
+def _generate_date_column(column_name: str, values: list) -> _DatasetColumn:
+    # Dates may be native Excel dates or "dd.mm.yy" strings in any mix, so they are parsed in one pass over the
+    # whole column instead of being cast to the most frequent data type first
+    raw_values = np.empty(len(values), dtype=object)
+    raw_values[:] = values
+    dates = _to_datetime64_array(raw_values)
+    return _DatasetColumn(column_name, dates, datetime, validity=_pack_validity(~np.isnat(dates)))
 
 
-def _generate_array_from_worksheet(worksheet: Worksheet) -> Tuple[list, Any]:
-    index_row, last_data_row, last_data_column = _bound_worksheet_data_region(worksheet)
-    blank_column_numbers = []
+def _generate_statistic_column(column_name: str, values: list) -> _DatasetColumn:
+    # Statistics of an int column can be floats (e.g. the median of two values), which must not be truncated
+    if {type(value) for value in values if not _is_missing(value)} == {int, float}:
+        return _DatasetColumn(column_name, _to_storage_array(values, float), float)
+    return _generate_column(column_name, values)
+
+
+def _generate_array_from_rows(index_row: tuple, rows: List[tuple],
+                              blank_column_numbers: List[int]) -> Tuple[list, Any]:
+    kept_indexes = [index for index in range(len(index_row)) if index + 1 not in blank_column_numbers]
+    column_names = [index_row[index] for index in kept_indexes]
+    columns = []
+    for index in kept_indexes:
+        generate_column = _generate_date_column if index_row[index] == "Date" else _generate_column
+        columns.append(generate_column(index_row[index], [row[index] for row in rows]))
+    return column_names, _DatasetArray(columns)
+
+
+def _generate_dataset_schema(title_row: tuple, index_row: tuple, blank_column_numbers: List[int]) -> _Schema:
+    # In the current dataset, the statement below is true
+    # assert blank_column_numbers == [3, 5]
     column_names = []
-    for column_number in range(1, last_data_column + 1):
-        column_letter = _column_number_to_letter(column_number)
-        cell_range = _flatten(worksheet[f"{column_letter}{index_row}:{column_letter}{last_data_row}"])
-        index_name, *column_values = _get_cell_values(cell_range)
-        if all(value is None for value in column_values):
-            blank_column_numbers.append(column_number)
+    column_titles = []
+    last_valid_column_title = None
+    for index in range(len(index_row)):
+        # Excel index (i.e. columns) starts at 1; Python starts at 0 for indexing the list
+        if index + 1 not in blank_column_numbers:
+            column_title = title_row[index]
+            column_name = index_row[index]
+            if column_title is not None:
+                last_valid_column_title = column_title
+            if last_valid_column_title is not None:
+                column_names.append(column_name)
+                column_titles.append(last_valid_column_title)
+
+    return _Schema(dict(zip(column_names, column_titles)))
+
+
+def _get_statistic_executor() -> Optional[Executor]:
+    # Pools are created on first use and reused for as long as the configuration stays the same
+    if statistic_executor.value == "serial":
+        return None
+    workers = statistic_workers.value or os.cpu_count() or 1
+    # Worker processes are restarted when statistics are registered, since they only know those registered before
+    registry_version = _get_registry_version() if statistic_executor.value == "process" else None
+    key = (statistic_executor.value, workers, registry_version)
+    for stale_key in [stale_key for stale_key in _statistic_executors if stale_key != key]:
+        _statistic_executors.pop(stale_key).shutdown(wait=False)
+    if (executor := _statistic_executors.get(key)) is None:
+        if statistic_executor.value == "thread":
+            executor = ThreadPoolExecutor(max_workers=workers)
         else:
-            column_names.append(index_name)
+            # Workers started with spawn or forkserver import the package again, so they are given the statistics
+            # registered since; those must then be picklable (e.g. functions defined at the top level of a module)
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_register_worker_statistics,
+                                           initargs=(_get_runtime_registrations(),))
+        _statistic_executors[key] = executor
+    return executor
 
-    array = []
-    for row_number in range(index_row + 1, last_data_row + 1):
-        cell_range = _flatten(worksheet[f"A{row_number}:{_column_number_to_letter(last_data_column)}{row_number}"])
-        cell_value_column_mapping = list(enumerate(_get_cell_values(cell_range), 1))
-        for index, (column_number, _) in enumerate(cell_value_column_mapping):
-            if column_number in blank_column_numbers:
-                del cell_value_column_mapping[index]
 
-        array.append(_DatasetArrayRow(list(map(itemgetter(1), cell_value_column_mapping)), column_names))
+def _evaluate_column_statistic(column_name: str, values: np.ndarray, dtype: type, statistic: str,
+                               args: tuple, kwargs: dict) -> Any:
+    # Runs in a worker process, so the column is rebuilt from its storage instead of the dataset
+    column_view = _DatasetArrayColumnView(_DatasetColumn(column_name, values, dtype))
+    return STATISTICAL_FUNCTIONS[statistic](column_view, *args, **kwargs)
 
-    return column_names, _DatasetArray(array)
+
+def _evaluate_rows_statistic(column: _DatasetColumn, rows: slice | np.ndarray, statistic: str,
+                             args: tuple, kwargs: dict) -> Any:
+    # The rows are only read, so they are viewed without sharing the column's storage (i.e. copy-on-write)
+    column_view = _DatasetArrayColumnView(_DatasetColumn(column.name, column.values[rows], column.dtype))
+    measure = STATISTICAL_FUNCTIONS[statistic]
+    if not measure.has_enough_values(column_view, kwargs.get("na_action", "ignore"),
+                                     kwargs.get("outlier_action", "keep")):
+        # Too few values for the statistic, e.g. a month in which the column was never measured
+        return NAN
+    return measure(column_view, *args, **kwargs)
+
+
+def _generate_array_from_columns(column_names: List[str], columns: List[Tuple[Any, type]]) -> _DatasetArray:
+    return _DatasetArray([_DatasetColumn(column_name, values, dtype)
+                          for column_name, (values, dtype) in zip(column_names, columns)])
 
 
 class _Dataset:
 
-    def __init__(self, excel_file_name: str):
+    def __init__(self, excel_file_name: str, read_only: bool = True, use_cache: bool = True):
         self._workbook_name = excel_file_name
-        self._workbook = load_workbook(os.path.join(DATA_FILE_DIRECTORY, excel_file_name))
-        self._worksheet = self._workbook.active
-        self._column_names, self._array = _generate_array_from_worksheet(self._worksheet)
-        self._schema = self._generate_dataset_schema()
-        self._apply_function_to_column("Date", _date_string_to_datetime)
-        for row_index in range(len(self._array)):
-            self._apply_function_to_row(row_index, _replace_nones)
-        for column_name in self._column_names:
-            self._cast_to_one_type(column_name)
+        self._read_only = read_only
+        # Column views reference the column storage, so one view per column is created and reused
+        self._column_views = {}
+        self._statistic_cache = _StatisticCache()
+        workbook_path = os.path.join(DATA_FILE_DIRECTORY, excel_file_name)
+        if use_cache and (cached_data := _read_dataset_cache(workbook_path)) is not None:
+            self._column_names, schema, columns = cached_data
+            self._schema = _Schema(dict(schema))
+            self._array = _generate_array_from_columns(self._column_names, columns)
+        else:
+            self._load_workbook(workbook_path)
+            if use_cache:
+                columns = [(column.values, column.dtype) for column in self._array.columns]
+                _write_dataset_cache(workbook_path, self._column_names, list(self._schema.to_dict().items()), columns)
+        # Sorted once here; the index keeps itself up to date when the dates are modified
+        self._date_index = _DateIndex(self._get_column("Date"))
 
     def __iter__(self):
         return iter(self._array)
@@ -72,14 +177,17 @@ class _Dataset:
             return self._array[index]
 
     def __setitem__(self, column_name: str, column: _DatasetArrayColumnView):
-        column_number = self._column_names.index(column_name)
-        for index, value in enumerate(column):
-            self._array[index][column_number] = value
+        self._array.column(self._column_names.index(column_name)).set_values(column)
+        self._statistic_cache.invalidate(column_name)
 
     def __len__(self):
         return len(self._array)
 
     def __str__(self) -> str:
+        return "\n".join(self._generate_lines())
+
+    def _generate_lines(self) -> Generator[str, None, None]:
+        # The column names, then one line per row; rows are converted from the column storage a chunk at a time
         ellipsis_space = (2 * 2 + 3) * " "  # 2 * space around + 1 (elipsis length)
         min_column_characters = max(map(len, self._column_names))
 
@@ -92,10 +200,26 @@ class _Dataset:
                      + ellipsis_space \
                      + "..." + ellipsis_space \
                      + column_format * ((length - right) - 2)
-        output = row_format.format(*self._column_names[0:left], *self._column_names[right + 1:length])
-        for row in self._array:
-            output += "\n" + row_format.format(*(map(str, row[0:left] + row[right + 1:length])))
-        return output
+        yield row_format.format(*self._column_names[0:left], *self._column_names[right + 1:length])
+
+        # Only the columns either side of the ellipsis are read
+        shown_columns = self._array.columns[0:left] + self._array.columns[right + 1:length]
+        missing_masks = [column.missing_mask for column in shown_columns]
+        for start in range(0, len(self), PRINT_CHUNK_SIZE):
+            stop = start + PRINT_CHUNK_SIZE
+            chunk_columns = [_to_python_list(column.values[start:stop], column.dtype, missing_mask[start:stop])
+                             for column, missing_mask in zip(shown_columns, missing_masks)]
+            yield from (row_format.format(*map(str, row)) for row in zip(*chunk_columns))
+
+    def _load_workbook(self, workbook_path: str):
+        workbook = load_workbook(workbook_path, read_only=self._read_only)
+        # The worksheet is only read once; both the array and the schema are built from this region
+        title_row, index_row, rows = _bound_worksheet_data_region(workbook.active)
+        # Read-only workbooks keep the file open until they are closed
+        workbook.close()
+        blank_column_numbers = _get_blank_column_numbers(rows)
+        self._column_names, self._array = _generate_array_from_rows(index_row, rows, blank_column_numbers)
+        self._schema = _generate_dataset_schema(title_row, index_row, blank_column_numbers)
 
     # Noteworthy point: properties defined here have only getters (unlike the public attributes which have setters too)
 
@@ -107,84 +231,50 @@ class _Dataset:
     def schema(self) -> _Schema:
         return self._schema
 
-    def _cast_to_one_type(self, column_name: str):
-        column_data = self._get_column_data(column_name, remove_nans=True)
-        dtype_counter = Counter(map(type, column_data))
-        dtype_occurences = list(dtype_counter.items())
-        # Reverse sort so that the most frequently appearing data type is first in the list
-        dtype_occurences.sort(key=itemgetter(1), reverse=True)
-        if not len(dtype_occurences) == 1:
-            # The first data type (i.e. most occuring) is indexed and cast to the whole column
-            cast_type = dtype_occurences[0][0]
-            self._apply_function_to_column(column_name, cast_type)
+    def _get_column(self, column_name: str) -> _DatasetColumn:
+        return self._array.column(self._column_names.index(column_name))
 
     def _get_column_dtype(self, column_name: str) -> type:
-        column_data = self._get_column_data(column_name, remove_nans=True)
-        return _get_array_dtype(list(column_data))
+        return self._get_column(column_name).dtype
 
     def _get_column_data(self, column_name: str, remove_nans: bool = False) -> list:
-        column_index = self._column_names.index(column_name)
-        column_data = [self._array[i][column_index] for i in range(len(self._array))]
-        return column_data if not remove_nans else _remove_nans(column_data)
+        return self._get_column(column_name).tolist(remove_missing=remove_nans)
 
     def _get_column_view(self, column_name: str) -> _DatasetArrayColumnView:
-        # Implemented to remove recursive calls between the above two functions
-        # Also, this is much more readable with each function call returning its respective class attribute
-        return _DatasetArrayColumnView(column_name,
-                                       self._get_column_data(column_name),
-                                       self._get_column_dtype(column_name)
-                                       )
-
-    def _generate_dataset_schema(self) -> _Schema:
-        _, last_data_row, last_data_column = _bound_worksheet_data_region(self._worksheet)
-
-        blank_column_numbers = []
-        for column_number in range(1, last_data_column + 1, 1):
-            column_letter = _column_number_to_letter(column_number)
-            cell_range = _flatten(self._worksheet[f"{column_letter}1:{column_letter}{last_data_row}"])
-            cell_values = _get_cell_values(cell_range)
-            if all(cell_value is None for cell_value in cell_values):
-                blank_column_numbers.append(column_number)
-
-        # In the current dataset, the statement below is true
-        # assert blank_column_numbers == [3, 5]
-
-        top_cells = ([], [])
-        for i, row in enumerate(self._worksheet.iter_rows(min_row=1, min_col=1, max_row=2, max_col=last_data_column)):
-            top_cells[i].extend(_get_cell_values(_flatten(row)))
-
-        column_names = []
-        column_titles = []
-        last_valid_column_title = None
-        for index in range(len(top_cells[0])):
-            # Excel index (i.e. columns) starts at 1; Python starts at 0 for indexing the list
-            if index + 1 not in blank_column_numbers:
-                column_title = top_cells[0][index]
-                column_name = top_cells[1][index]
-                if column_title is not None:
-                    last_valid_column_title = column_title
-                if last_valid_column_title is not None:
-                    column_names.append(column_name)
-                    column_titles.append(last_valid_column_title)
-
-        return _Schema(dict(zip(column_names, column_titles)))
+        if (column_view := self._column_views.get(column_name)) is None:
+            column_view = self._column_views[column_name] = _DatasetArrayColumnView(self._get_column(column_name),
+                                                                                    self._statistic_cache)
+        return column_view
 
     def _apply_function_to_column(self, column_name: str, function: Callable):
-        column_position = self._column_names.index(column_name)
-        for index in range(len(self[column_name])):
-            self._array[index].apply_function_at_index(function, column_position)
+        self._get_column(column_name).apply_function(function)
+        self._statistic_cache.invalidate(column_name)
 
     def _apply_function_to_row(self, row_index: int, function: Callable):
         self._array[row_index].apply_function(function)
 
+    def _derive(self, columns: List[_DatasetColumn]) -> "_Dataset":
+        # A dataset of the same type and with the same names and schema, holding the given columns
+        derived_dataset = copy(self)
+        derived_dataset._column_names = list(self._column_names)
+        derived_dataset._array = _DatasetArray(columns)
+        derived_dataset._column_views = {}
+        derived_dataset._statistic_cache = _StatisticCache()
+        derived_dataset._date_index = _DateIndex(derived_dataset._get_column("Date"))
+        return derived_dataset
+
+    def _take_rows(self, rows: slice | np.ndarray) -> "_Dataset":
+        # A range of rows shares the storage of this dataset until either of them is modified
+        return self._derive([column.take(rows) for column in self._array.columns])
+
     def _column_iterator(self) -> Generator[_DatasetArrayColumnView, Any, None]:
         yield from map(self._get_column_view, self._column_names)
 
 
 class Dataset(_Dataset):
 
-    def __init__(self, excel_file_name: str, dataset_name: str):
-        super().__init__(excel_file_name)
+    def __init__(self, excel_file_name: str, dataset_name: str, read_only: bool = True, use_cache: bool = True):
+        super().__init__(excel_file_name, read_only, use_cache)
         self.dataset_name = dataset_name
 
     def get_column_dtype(self, column_name: str, type_string: bool = True) -> type | str:
@@ -196,20 +286,229 @@ class Dataset(_Dataset):
                                            list(map(self.get_column_dtype, self._column_names))],
                                           ["Column", "Data type"])
 
-    def get_timedeltas_between_measurements(self) -> List[timedelta]:
-        column_length = len(date_column := self["Date"])
-        differences = []
-        for index in range(column_length - 1):
-            value, next_value = date_column[index], date_column[index + 1]
-            differences.append(next_value - value)
-        return differences
+    def pages(self, page_rows: Optional[int] = None) -> Generator[str, None, None]:
+        # The dataset a page at a time, each page headed by the column names; a page fills the terminal by default
+        # Rows are only read and formatted when their page is reached
+        if page_rows is None:
+            try:
+                page_rows = os.get_terminal_size().lines - 2
+            except OSError:
+                page_rows = max_array_print_rows.value
+        yield from _paginate_lines(self._generate_lines(), page_rows)
+
+    def _get_measurement_intervals(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Intervals between consecutive measurements, and the row index each interval starts at
+        # Rows without a date are skipped
+        date_column = self._get_column("Date")
+        _check_date_storage(date_column)
+        row_indexes = np.flatnonzero(~date_column.missing_mask)
+        return row_indexes[:-1], np.diff(date_column.values[row_indexes])
 
-    def get_average_timedelta(self):
-        timedeltas = self.get_timedeltas_between_measurements()
-        return timedelta(days=sum(map(attrgetter("days"), timedeltas)) // len(timedeltas))
+    def get_timedeltas_between_measurements(self) -> List[timedelta]:
+        return self._get_measurement_intervals()[1].tolist()
+
+    def get_average_timedelta(self) -> timedelta:
+        # Like timedelta.days, whole days are rounded down
+        days = self._get_measurement_intervals()[1] // np.timedelta64(1, "D")
+        return timedelta(days=int(days.sum()) // len(days))
+
+    def get_measurement_gaps(self, min_gap: timedelta) -> List[Tuple[int, timedelta]]:
+        # The row index before every interval of at least min_gap without measurements, and the length of the interval
+        row_indexes, intervals = self._get_measurement_intervals()
+        gap_indexes = np.flatnonzero(intervals >= np.timedelta64(min_gap))
+        return list(zip(row_indexes[gap_indexes].tolist(), intervals[gap_indexes].tolist()))
+
+    def between(self, start: Any, end: Any) -> "Dataset":
+        # The measurements dated from start to end (both inclusive) as a dataset, in date order
+        # Dates may be datetimes, dates or ISO 8601 strings, e.g. dataset.between("2009-01-01", "2010-06-30")
+        return self._take_rows(self._date_index.between(start, end))
+
+    def asof(self, date: Any) -> Optional[_DatasetArrayRow]:
+        # The latest measurement made on or before the date
+        row_index = self._date_index.asof(date)
+        return self._array[row_index] if row_index is not None else None
+
+    def nearest(self, date: Any) -> Optional[_DatasetArrayRow]:
+        row_index = self._date_index.nearest(date)
+        return self._array[row_index] if row_index is not None else None
+
+    def resample(self, frequency: str, statistic: str, *args: Any, **kwargs: Any) -> "Dataset":
+        # One row per month, season or year (see RESAMPLE_FREQUENCIES), dated by the start of the bucket
+        # Every other column holds the statistic of its measurements within the bucket
+        sorted_dates, sorted_rows = self._date_index.sorted_rows()
+        # The bucket boundaries are found once, for all of the columns
+        bucket_dates, starts, stops = _get_bucket_bounds(sorted_dates, frequency)
+        in_row_order = self._date_index.in_row_order
+        bucket_rows = [slice(start, stop) if in_row_order else sorted_rows[start:stop]
+                       for start, stop in zip(starts.tolist(), stops.tolist())]
+        columns = []
+        for column in self._array.columns:
+            if column.name == "Date":
+                columns.append(_DatasetColumn(column.name, bucket_dates, datetime))
+                continue
+            columns.append(_generate_statistic_column(column.name, [
+                _evaluate_rows_statistic(column, rows, statistic, args, kwargs) for rows in bucket_rows
+            ]))
+        return self._derive(columns)
+
+    def rolling(self, window: timedelta, statistic: str, *args: Any, **kwargs: Any) -> "Dataset":
+        # The dated rows in date order, where every column other than Date holds the statistic of the measurements
+        # made within the window up to and including the row, e.g. rolling(timedelta(days=30), "mean")
+        sorted_dates, sorted_rows = self._date_index.sorted_rows()
+        window_starts = _get_window_starts(sorted_dates, window)
+        ordered_rows = slice(0, len(sorted_rows)) if self._date_index.in_row_order else sorted_rows
+        # Statistics are updated incrementally as the window slides (see ROLLING_STATISTICS), so the missing values
+        # and outliers of each window are left as they are
+        if statistic not in ROLLING_STATISTICS:
+            raise ValueError(f"The statistic {statistic!r} cannot be rolled, expected one of {ROLLING_STATISTICS}")
+        if args or set(kwargs) - {"na_action", "round_dp"} \
+                or kwargs.get("na_action", "ignore") not in ["ignore", "remove"]:
+            raise ValueError("Rolling statistics ignore missing values and keep outliers, and take no other arguments "
+                             "than round_dp")
+        columns = []
+        for column in self._array.columns:
+            if column.name == "Date":
+                columns.append(column.take(ordered_rows))
+                continue
+            if column.dtype not in (int, float):
+                # Like the statistics of any column that is not numeric
+                columns.append(_DatasetColumn(column.name, np.full(len(sorted_rows), NAN), float))
+                continue
+            rolling_values = _rolling_statistic(np.asarray(column.values[ordered_rows], dtype=np.float64),
+                                                window_starts, statistic)
+            if (round_dp := kwargs.get("round_dp")) is not None:
+                rolling_values = np.round(rolling_values, round_dp)
+            columns.append(_DatasetColumn(column.name, rolling_values, float))
+        return self._derive(columns)
 
     def get_stat_of_columns(self, statistic: str, *args: Any, **kwargs: Any) -> List[Numeric | None]:
-        return [STATISTICAL_FUNCTIONS[statistic](column, *args, **kwargs) for column in self._column_iterator()]
+        executor = _get_statistic_executor()
+        columns = list(self._column_iterator())
+        if executor is None or len(columns) < 2:
+            return [column.statistic(statistic, *args, **kwargs) for column in columns]
+        # Executor.map returns the results in the order of the columns, whichever worker finishes first
+        if statistic_executor.value == "thread":
+            return list(executor.map(lambda column: column.statistic(statistic, *args, **kwargs), columns))
+        return self._get_stat_of_columns_in_processes(executor, columns, statistic, args, kwargs)
+
+    def _get_stat_of_columns_in_processes(self, executor: Executor, columns: List[_DatasetArrayColumnView],
+                                          statistic: str, args: tuple, kwargs: dict) -> List[Numeric | None]:
+        # Only the statistics that are not remembered are sent to the worker processes, together with the storage
+        # of their columns. The statistic and its arguments must be picklable
+        statistical_values = []
+        missing_indexes = []
+        for index, column in enumerate(columns):
+            found, value = self._statistic_cache.lookup(column, statistic, args, kwargs)
+            statistical_values.append(value)
+            if not found:
+                missing_indexes.append(index)
+
+        missing_columns = [columns[index] for index in missing_indexes]
+        # The versions are read before evaluating so that a column changed in the meantime is not remembered as current
+        versions = [column.version for column in missing_columns]
+        computed_values = executor.map(_evaluate_column_statistic,
+                                       [column.name for column in missing_columns],
+                                       [column.values for column in missing_columns],
+                                       [column.dtype for column in missing_columns],
+                                       repeat(statistic), repeat(args), repeat(kwargs))
+        for index, version, value in zip(missing_indexes, versions, computed_values):
+            self._statistic_cache.store(columns[index], statistic, args, kwargs, value, version)
+            statistical_values[index] = value
+        return statistical_values
+
+    def _get_numeric_matrix(self, na_action: str, outlier_action: str) -> Tuple[List[str], np.ndarray]:
+        # The numeric columns side by side (rows × columns); missing values that are not replaced are nan
+        column_views = [column for column in self._column_iterator() if column.dtype in (int, float)]
+        data = [column.reformat_plan.reformat(na_action, outlier_action, keep_length=True) for column in column_views]
+        return [column.name for column in column_views], \
+            np.column_stack(data) if data else np.zeros((len(self), 0))
+
+    def correlation(self, method: str = "pearson", *, na_action: str = "ignore",
+                    outlier_action: str = "keep") -> Tuple[List[str], List[list]]:
+        # Correlation coefficient of every pair of numeric columns (see CORRELATION_METHODS)
+        # Missing values are left out pair by pair (i.e. pairwise-complete) unless na_action replaces them
+        # Returns the column names and one list of coefficients per column, like statistic()
+        column_names, data = self._get_numeric_matrix(na_action, outlier_action)
+        return column_names, correlation_matrix(data, method).T.tolist()
+
+    def covariance(self, *, na_action: str = "ignore", outlier_action: str = "keep") -> Tuple[List[str], List[list]]:
+        column_names, data = self._get_numeric_matrix(na_action, outlier_action)
+        return column_names, covariance_matrix(data).T.tolist()
+
+    @staticmethod
+    def get_matrix_string(column_names: List[str], matrix: List[list], cut_data: bool = False) -> str:
+        # Prints the result of correlation() or covariance() as a table
+        return _generate_structure_string([column_names, *matrix], ["Column Name", *column_names], cut_data=cut_data)
+
+    @staticmethod
+    def get_matrix_columns(column_names: List[str], matrix: List[list]) -> List[list]:
+        # The result of correlation() or covariance() as columns headed by their headings, as
+        # write_columns_to_worksheet takes them (see _StatisticTable.to_columns)
+        return [["Column Name", *column_names], *([name, *values] for name, values in zip(column_names, matrix))]
+
+    def quantile_sketch(self, column_name: str, *, na_action: str = "ignore", outlier_action: str = "keep",
+                        error: Optional[float] = None) -> QuantileSketch:
+        # Approximate quantiles of a column; sketches of other datasets (e.g. other files) can be merged into it
+        error = quantile_sketch_error.value if error is None else error
+        sketch = self[column_name].reformat_plan.quantile_sketch(na_action, outlier_action, error)
+        # The sketch is remembered by the column, so the caller is given its own copy to merge into
+        return QuantileSketch(sketch.error).merge(sketch)
+
+    def _evaluate_statistics(self, column: _DatasetArrayColumnView, statistics: List[str], options: dict) -> list:
+        # Statistics found in the summary share one preparation and one sort of the column's data
+        # Statistics of columns with too few values for them (e.g. without any values) are missing values
+        na_action, outlier_action = options.get("na_action", "ignore"), options.get("outlier_action", "keep")
+        summary = None
+        if any(statistic in SUMMARY_STATISTICS for statistic in statistics):
+            summary = statistical_summary(column, **options)
+
+        statistical_values = []
+        for statistic in statistics:
+            if summary is not None and statistic in summary \
+                    and not (approximate_quantiles.value and statistic in APPROXIMATE_FUNCTIONS):
+                value = summary[statistic]
+                if statistic in STATISTICAL_FUNCTIONS:
+                    self._statistic_cache.store(column, statistic, (), options, value)
+            elif STATISTICAL_FUNCTIONS[statistic].has_enough_values(column, na_action, outlier_action):
+                # Rounded like the summary, which leaves lists (i.e. modes) as they are
+                round_dp = options.get("round_dp")
+                value = column.statistic(statistic, **{**options, "round_dp": None})
+                if round_dp is not None and type(value) is not list:
+                    value = round(value, round_dp)
+            else:
+                value = NAN
+            statistical_values.append(value)
+        return statistical_values
+
+    def statistics(self, statistics: Optional[List[str]] = None, columns: Optional[List[str]] = None,
+                   options: Optional[List[dict]] = None) -> _StatisticTable:
+        # Every statistic of every column under every set of options (na_action, outlier_action and round_dp)
+        # By default: the statistics without extra arguments, the numeric columns and the default options
+        # e.g. dataset.statistics(["mean", "median"], options=[{}, {"na_action": "mean", "outlier_action": "median"}])
+        if statistics is None:
+            statistics = [name for name, measure in STATISTICAL_FUNCTIONS.items() if not measure.extra_args]
+        for statistic in statistics:
+            if statistic not in STATISTICAL_FUNCTIONS and statistic not in SUMMARY_STATISTICS:
+                raise ValueError(f"Unknown statistic {statistic!r}")
+            if statistic in STATISTICAL_FUNCTIONS and STATISTICAL_FUNCTIONS[statistic].extra_args:
+                raise ValueError(f"The statistic {statistic!r} takes arguments, so it is computed with statistic() "
+                                 f"instead of statistics()")
+        if columns is None:
+            columns = [name for name in self._column_names if self._get_column_dtype(name) in (int, float)]
+        table_rows = []
+        for column_name in columns:
+            column = self[column_name]
+            for column_options in options or [{}]:
+                statistical_values = self._evaluate_statistics(column, statistics, column_options)
+                table_rows.extend((column_name, column_options.get("na_action", "ignore"),
+                                   column_options.get("outlier_action", "keep"), column_options.get("round_dp"),
+                                   statistic, value) for statistic, value in zip(statistics, statistical_values))
+        table_columns = [list(column) for column in zip(*table_rows)] or [[] for _ in STATISTIC_TABLE_HEADINGS]
+        return _StatisticTable(STATISTIC_TABLE_HEADINGS, table_columns)
+
+    def statistic_cache_info(self) -> dict:
+        # Hit and miss counts of the statistics remembered for this dataset's columns
+        return self._statistic_cache.cache_info()
 
     def get_outliers_in_column(self, column_name: str) -> Tuple[tuple, tuple]:
         outlier_function = get_base_statistical_function("outlier")
@@ -256,25 +555,62 @@ class Dataset(_Dataset):
     def filter_column(self, column_name: str, function: Callable) -> list:
         data = self[column_name]
         filter_matches = []
-        function_argcount = len(signature(function).parameters)
+        # Registered statistics declare their arguments; only other functions have their signature inspected
+        if (measure := get_statistical_measure(function)) is not None:
+            function_argcount = measure.extra_args + 1
+        else:
+            function_argcount = len(signature(function).parameters)
         if function_argcount == 2:
+            if (vectorized_function := get_vectorized_function(function)) is not None:
+                # Evaluate the whole column at once, then only look up the matching values
+                filter_matches = [(index, data[index]) for index in np.flatnonzero(vectorized_function(data)).tolist()]
+            elif measure is not None:
+                # The statistic is given its declared input (e.g. sorted data) and intermediates, which are shared
+                # by every value through the column's reformat plan
+                for index, value in enumerate(data):
+                    if measure(data, [value]):
+                        filter_matches.append((index, value))
+            else:
+                for index, value in enumerate(data):
+                    if function(data, value):
+                        filter_matches.append((index, value))
+        elif function_argcount == 1:
+            # Predicates of a single value; see where() to evaluate conditions over whole columns instead
             for index, value in enumerate(data):
-                if function(data, value):
+                if function(value):
                     filter_matches.append((index, value))
-        elif function_argcount == 1:
-            pass
         return filter_matches
 
+    def query(self, condition: _Expression) -> List[int]:
+        # Indexes of the rows that match a condition on any of the columns, e.g.
+        # dataset.query((col("pH at 0.5m") > 8) & (col("Turbidity,NTU") > 50))
+        return np.flatnonzero(condition.mask(self._get_column)).tolist()
+
+    def where(self, condition: _Expression) -> "Dataset":
+        # The rows that match a condition as a dataset, which shares its storage with this one until modified
+        return self._take_rows(np.flatnonzero(condition.mask(self._get_column)))
+
     def reformat(self, *, na_action: str = "ignore", outlier_action: str = "keep", round_dp: bool = False):
-        reformatted_dataset = Dataset(self._workbook_name, self.dataset_name)
-        for index in range(len(self._column_names), 1):
-            column_name = self._column_names[index]
-            column = self[column_name]
-            data = reformat_data(list(column), na_action=na_action, outlier_action=outlier_action)
+        # The reformatted dataset is derived from the columns in memory; only the numeric columns are changed and
+        # every column that is not changed shares its storage with this dataset until either of them is modified
+        # Removed values become missing values so that the rows of the dataset stay aligned, so when no outliers are
+        # replaced or removed and nothing is rounded, the numeric columns are not changed either (unless their
+        # storage holds values of other types, see set_values)
+        unchanged = na_action in ["ignore", "remove"] and outlier_action == "keep" and not round_dp
+        columns = []
+        for column in self._array.columns:
+            if column.dtype not in (int, float) or (unchanged and column.values.dtype != object):
+                columns.append(column.copy())
+                continue
+            data = reformat_data(self._get_column_view(column.name), na_action=na_action,
+                                 outlier_action=outlier_action, keep_length=True)
             if round_dp:
-                data = [round(value, round_dp) for value in data]
-            reformatted_dataset[column_name] = data
-        return reformatted_dataset
+                data = np.round(data, round_dp)
+            # Like applying a function to a column, values that are no longer whole numbers make the column a float one
+            dtype = int if column.dtype is int and np.all(np.isnan(data) | (data == np.trunc(data))) else float
+            # The reformatted data may be remembered by the column's reformat plan, so it is only copied when modified
+            columns.append(_DatasetColumn(column.name, data, dtype, shared=True))
+        return self._derive(columns)
 
 
 DatasetStructure = Dataset | _DatasetArrayColumnView | _DatasetArrayRow
@@ -1,40 +1,108 @@
 __all__ = [
     "write_dataset_to_worksheet",
+    "write_dataset_to_file",
     "write_dataset_column_to_worksheet",
     "write_columns_to_worksheet",
+    "write_dataset_to_csv",
+    "write_columns_to_csv",
+    "write_dataset_to_columnar",
+    "write_columns_to_columnar",
 ]
 
-from typing import Iterable
+import csv
+import json
+import math
+import zipfile
+from datetime import date, datetime, time, timedelta
+from itertools import zip_longest
+from typing import Any, Generator, Iterable, List, Optional
 
+import numpy as np
 from openpyxl.styles import Border, Side
 from openpyxl.workbook import Workbook
-from openpyxl.cell.cell import Cell
+from openpyxl.cell.cell import Cell, WriteOnlyCell
 from openpyxl.worksheet.worksheet import Worksheet
 
-from dataset.functions import _column_number_to_letter, _datetime_to_date_string, _column_letter_to_number
+from dataset.functions import (
+    _datetime_to_date_string, _column_letter_to_number, _get_cast_type, _pack_validity, _to_python_list,
+    _to_storage_array
+)
 from dataset.datasetclass import Dataset
+from dataset.structures import _DatasetArrayColumnView, _DatasetColumn
 
 THICK_BOTTOM_BORDER = Border(left=Side(style='thin'),
                              right=Side(style='thin'),
                              top=Side(style='thin'),
                              bottom=Side(style='thick'))
+# Rows of a dataset are converted to Python values this many at a time while they are written
+EXPORT_CHUNK_SIZE = 4096
 
 
-def write_dataset_to_worksheet(worksheet: Worksheet, ds: Dataset):
-    schema = ds.schema
+def _get_title_row(ds: Dataset) -> list:
+    # A title is written above the first column it describes only; the first (date) column has no title
+    title_row = [None]
     previous_title = None
-    write_dataset_column_to_worksheet(worksheet, "A", list(map(_datetime_to_date_string, ds[ds.column_names[0]])))
-    for index in range(1, len(ds.column_names)):
-        column_data = []
-        column_name, column_letter = ds.column_names[index], _column_number_to_letter(index)
-        if (title := schema[column_name]) != previous_title:
-            previous_title = title
-            column_data.append(title)
-        else:
-            column_data.append(None)
-        column_data.append(column_name)
-        column_data.extend(list(ds[column_name]))
-        write_dataset_column_to_worksheet(worksheet, column_letter, column_data)
+    for column_name in ds.column_names[1:]:
+        title = ds.schema[column_name]
+        title_row.append(title if title != previous_title else None)
+        previous_title = title
+    return title_row
+
+
+def _get_export_values(ds: Dataset, column_name: str, start: int, stop: int) -> list:
+    # Missing values are written as blank cells and dates as "dd.mm.yy" strings (like the workbooks are read)
+    column = ds[column_name]
+    missing_mask = column.missing_mask[start:stop]
+    values = _to_python_list(column.values[start:stop], column.dtype, missing_mask)
+    if column.dtype is datetime:
+        return [None if missing else _datetime_to_date_string(value)
+                for value, missing in zip(values, missing_mask.tolist())]
+    for index in np.flatnonzero(missing_mask).tolist():
+        values[index] = None
+    return values
+
+
+def _generate_dataset_rows(ds: Dataset) -> Generator[list, None, None]:
+    # The title row, the index row (the column names) and then every data row, in the layout of the workbooks
+    # that datasets are read from, so the written worksheet can be read by _bound_worksheet_data_region
+    yield _get_title_row(ds)
+    yield list(ds.column_names)
+    for start in range(0, len(ds), EXPORT_CHUNK_SIZE):
+        stop = min(start + EXPORT_CHUNK_SIZE, len(ds))
+        yield from map(list, zip(*(_get_export_values(ds, column_name, start, stop)
+                                   for column_name in ds.column_names)))
+
+
+def _is_bordered_row(row_number: int, ds: Dataset) -> bool:
+    # The index row and the last data row have bottom borders
+    return row_number == 2 or row_number == len(ds) + 2
+
+
+def _make_bordered_cell(worksheet: Worksheet, value: Any) -> WriteOnlyCell:
+    cell = WriteOnlyCell(worksheet, value=value)
+    cell.border = THICK_BOTTOM_BORDER
+    return cell
+
+
+def write_dataset_to_worksheet(worksheet: Worksheet, ds: Dataset):
+    for row_number, row in enumerate(_generate_dataset_rows(ds), 1):
+        add_border = _is_bordered_row(row_number, ds)
+        for column_number, value in enumerate(row, 1):
+            cell = worksheet.cell(row=row_number, column=column_number, value=value)
+            if add_border:
+                cell.border = THICK_BOTTOM_BORDER
+
+
+def write_dataset_to_file(file_path: str, ds: Dataset, worksheet_title: str = "Sheet"):
+    # Streams the dataset to a new workbook file in one pass over its rows (a write-only workbook), so that only
+    # the rows being written are held in memory rather than every cell of the worksheet
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(worksheet_title)
+    for row_number, row in enumerate(_generate_dataset_rows(ds), 1):
+        if _is_bordered_row(row_number, ds):
+            row = [_make_bordered_cell(worksheet, value) for value in row]
+        worksheet.append(row)
+    workbook.save(file_path)
 
 
 def write_dataset_column_to_worksheet(worksheet: Worksheet, column_letter: str,
@@ -48,14 +116,137 @@ def write_dataset_column_to_worksheet(worksheet: Worksheet, column_letter: str,
         worksheet.cell(row=index, column=column_number).border = THICK_BOTTOM_BORDER
 
 
+def _to_cell_value(value: Any) -> Any:
+    # Values that Excel stores natively (numbers, dates and times, text and booleans) keep their type
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        # Missing values are blank cells; Excel has no infinite numbers
+        return None if math.isnan(value) else str(value)
+    if value is None or isinstance(value, (str, bool, int, float, datetime, date, time, timedelta)):
+        return value
+    if isinstance(value, (list, tuple)):
+        # e.g. the modes of multimodal data
+        return ", ".join(map(str, value))
+    return str(value)
+
+
+def _to_cell_values(column: Iterable) -> list:
+    if isinstance(column, np.ndarray) and column.dtype.kind in "biuf":
+        # Numeric arrays are converted at once; only their missing values need replacing
+        values = column.tolist()
+        if column.dtype.kind == "f":
+            for index in np.flatnonzero(~np.isfinite(column)).tolist():
+                values[index] = _to_cell_value(values[index])
+        return values
+    return list(map(_to_cell_value, column))
+
+
 def write_columns_to_worksheet(worksheet: Worksheet, columns: list):
-    longest_length = max(len(column) for column in columns)
-    for column_number in range(1, len(columns) + 1):
-        column = columns[column_number - 1]
-        for row_number in range(1, longest_length + 1):
-            if row_number >= len(column):
-                value = None
-            else:
-                value = str(column[row_number - 1])
-            worksheet.cell(row=row_number, column=column_number).value = value
+    # Each value is converted once, per column, and shorter columns are padded with blank cells once
+    rows = zip_longest(*map(_to_cell_values, columns))
+    if not hasattr(worksheet, "cell"):
+        # Worksheets of write-only workbooks are streamed, a row at a time
+        for row in rows:
+            worksheet.append(row)
+        return
+    for row_number, row in enumerate(rows, 1):
+        for column_number, value in enumerate(row, 1):
+            worksheet.cell(row=row_number, column=column_number, value=value)
+
+
+# Columnar files are zip archives of .npy arrays (i.e. .npz files that np.load reads), one array per column
+COLUMNAR_FORMAT_VERSION = 1
+
+
+def _get_headed_columns(columns: List[list], headings: List[str]) -> List[_DatasetColumn]:
+    # Lists of values (e.g. Dataset.statistic results) are stored like the columns of a dataset before being written
+    headed_columns = []
+    for heading, values in zip(headings, columns):
+        dtype = _get_cast_type(values)
+        headed_columns.append(_DatasetColumn(heading, _to_storage_array(list(values), dtype), dtype))
+    return headed_columns
+
+
+def _get_date_unit(column: _DatasetArrayColumnView | _DatasetColumn) -> str:
+    # Dates without a time of day are written as ISO 8601 dates, others as ISO 8601 date times
+    dates = column.values[~column.missing_mask]
+    return "D" if np.array_equal(dates, dates.astype("datetime64[D]")) else "s"
+
+
+def _get_csv_values(column: _DatasetArrayColumnView | _DatasetColumn, start: int, stop: int,
+                    date_unit: Optional[str]) -> list:
+    values = column.values[start:stop]
+    missing_mask = column.missing_mask[start:stop]
+    if date_unit is not None:
+        data = np.datetime_as_string(values, unit=date_unit).tolist()
+    elif values.dtype == object:
+        data = [_to_cell_value(value) for value in values.tolist()]
+    else:
+        data = _to_python_list(values, column.dtype, missing_mask)
+    # Missing values are empty fields
+    for index in np.flatnonzero(missing_mask).tolist():
+        data[index] = None
+    return data
+
+
+def _write_csv(file_path: str, columns: List[_DatasetArrayColumnView | _DatasetColumn]):
+    # The rows are converted and written EXPORT_CHUNK_SIZE at a time, straight from the column storage
+    row_count = max(map(len, columns), default=0)
+    date_units = [_get_date_unit(column) if column.values.dtype.kind == "M" else None for column in columns]
+    with open(file_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow([column.name for column in columns])
+        for start in range(0, row_count, EXPORT_CHUNK_SIZE):
+            stop = min(start + EXPORT_CHUNK_SIZE, row_count)
+            writer.writerows(zip_longest(*(_get_csv_values(column, start, stop, date_unit)
+                                           for column, date_unit in zip(columns, date_units))))
+
+
+def write_dataset_to_csv(file_path: str, ds: Dataset):
+    # One row per measurement, headed by the column names; works for reformatted datasets too
+    _write_csv(file_path, [ds[column_name] for column_name in ds.column_names])
+
+
+def write_columns_to_csv(file_path: str, columns: List[list], headings: List[str]):
+    # e.g. write_columns_to_csv(file_path, list(dataset.statistic("mean")), ["Column", "Mean"])
+    _write_csv(file_path, _get_headed_columns(columns, headings))
+
+
+def _write_array_to_archive(archive: zipfile.ZipFile, member_name: str, array: np.ndarray):
+    # The .npy header is followed by the array's buffer, which is written EXPORT_CHUNK_SIZE rows at a time
+    with archive.open(f"{member_name}.npy", "w", force_zip64=True) as file:
+        np.lib.format.write_array_header_1_0(file, np.lib.format.header_data_from_array_1_0(array))
+        for start in range(0, len(array), EXPORT_CHUNK_SIZE):
+            file.write(np.ascontiguousarray(array[start:start + EXPORT_CHUNK_SIZE]).tobytes())
+
+
+def _get_columnar_buffer(column: _DatasetArrayColumnView | _DatasetColumn) -> np.ndarray:
+    # Numeric columns are written as float64 (missing values are nan, even in int columns) and dates as
+    # datetime64[us] (missing dates are NaT); any other column is written as text, so no pickling is needed
+    if column.values.dtype != object:
+        return column.values
+    return np.array(["" if value is None else str(value)
+                     for value in map(_to_cell_value, column.values.tolist())], dtype=str)
+
+
+def _write_columnar(file_path: str, columns: List[_DatasetArrayColumnView | _DatasetColumn]):
+    # Each column is stored as column_<n>.npy, with its validity bitmask (little bit order) as validity_<n>.npy
+    # schema.npy describes the columns as JSON: their names and the Python types of their values
+    schema = {
+        "version": COLUMNAR_FORMAT_VERSION,
+        "columns": [{"name": column.name, "dtype": column.dtype.__name__} for column in columns],
+    }
+    with zipfile.ZipFile(file_path, "w", compression=zipfile.ZIP_STORED) as archive:
+        _write_array_to_archive(archive, "schema", np.array([json.dumps(schema)]))
+        for column_number, column in enumerate(columns):
+            _write_array_to_archive(archive, f"column_{column_number}", _get_columnar_buffer(column))
+            _write_array_to_archive(archive, f"validity_{column_number}", _pack_validity(~column.missing_mask))
+
+
+def write_dataset_to_columnar(file_path: str, ds: Dataset):
+    _write_columnar(file_path, [ds[column_name] for column_name in ds.column_names])
+
 
+def write_columns_to_columnar(file_path: str, columns: List[list], headings: List[str]):
+    _write_columnar(file_path, _get_headed_columns(columns, headings))
@@ -1,24 +1,46 @@
 __all__ = [
     "_column_number_to_letter",
-    "_flatten",
+    "_column_letter_to_number",
     "_get_array_dtype",
     "_date_string_to_datetime",
     "_datetime_to_date_string",
-    "_replace_nones",
+    "_to_datetime64_array",
+    "_to_datetime64",
+    "_is_missing",
     "_remove_nans",
     "_replace_nans",
+    "_get_cast_type",
+    "_get_storage_dtype",
+    "_get_missing_mask",
+    "_pack_validity",
+    "_unpack_validity",
+    "_set_validity_bit",
+    "_to_storage_array",
+    "_to_storage_value",
+    "_fits_dtype",
+    "_is_dtype_subtype",
+    "_to_column_value",
+    "_to_column_storage",
+    "_to_python_list",
+    "_to_python_value",
     "_format_slice",
-    "_get_cell_values",
     "_has_border_type",
     "_bound_worksheet_data_region",
+    "_get_blank_column_numbers",
+    "_generate_structure_lines",
     "_generate_structure_string",
+    "_paginate_lines",
 ]
 
 import os
 import warnings
-from datetime import datetime
-from typing import Any, List, Tuple
-from operator import attrgetter
+from datetime import date, datetime
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Generator, Iterable, List, Optional, Tuple
+
+import numpy as np
 
 from openpyxl.cell.cell import Cell
 from openpyxl.worksheet.worksheet import Worksheet
@@ -28,19 +50,19 @@ from dataset.config import array_print_columns, max_array_print_rows, dataset_pr
 
 
 def _column_number_to_letter(number: int) -> str:
-    return chr(64 + number)
+    # Bijective base 26, i.e. 26 -> "Z", 27 -> "AA", 28 -> "AB"
+    letters = ""
+    while number > 0:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
 
 
 def _column_letter_to_number(letter: str) -> int:
-    return ord(letter) - 64
-
-
-def _flatten(lst: list):
-    if not lst:
-        return lst
-    if isinstance(lst[0], (list, tuple)):
-        return _flatten(lst[0]) + _flatten(lst[1:])
-    return lst[:1] + _flatten(lst[1:])
+    number = 0
+    for character in letter.upper():
+        number = number * 26 + ord(character) - 64
+    return number
 
 
 def _get_array_dtype(array: Any) -> type:
@@ -57,16 +79,180 @@ def _datetime_to_date_string(datetime_obj: datetime) -> str:
     return datetime_obj.strftime("%d.%m.%y")
 
 
-def _replace_nones(value: Any, replacement_value: Any = NAN) -> Any:
-    return replacement_value if value is None else value
+def _date_strings_to_datetime64(date_strings: np.ndarray) -> np.ndarray:
+    # Vectorized equivalent of _date_string_to_datetime: each "dd.mm.yy" string is read as eight bytes
+    date_strings = date_strings.astype(str)
+    lengths = np.char.str_len(date_strings)
+    valid = (lengths == 7) | (lengths == 8)
+    try:
+        date_bytes = np.char.zfill(np.where(valid, date_strings, "00.00.00"), 8).astype("S8")
+    except UnicodeEncodeError:
+        date_bytes = np.array([value.encode("ascii", "replace") for value in np.char.zfill(date_strings, 8)],
+                              dtype="S8")
+    characters = date_bytes.view(np.uint8).reshape(-1, 8).astype(np.int64)
+    digits = characters[:, [0, 1, 3, 4, 6, 7]] - ord("0")
+    valid &= np.all((digits >= 0) & (digits <= 9), axis=1) & np.all(characters[:, [2, 5]] == ord("."), axis=1)
+
+    day, month, year = (digits[:, 0::2] * 10 + digits[:, 1::2]).T
+    # Like %y, years 69-99 are in the 1900s and years 00-68 are in the 2000s
+    year += np.where(year < 69, 2000, 1900)
+    valid &= (month >= 1) & (month <= 12) & (day >= 1)
+    months = ((year - 1970) * 12 + np.clip(month, 1, 12) - 1).astype("datetime64[M]")
+    dates = months.astype("datetime64[D]") + np.maximum(day - 1, 0)
+    # Days past the end of the month roll over into the next one
+    valid &= dates.astype("datetime64[M]") == months
+
+    if not valid.all():
+        raise ValueError(f"time data {str(date_strings[np.argmin(valid)])!r} does not match format '%d.%m.%y'")
+    return dates.astype("datetime64[us]")
+
+
+def _to_datetime64(value: Any) -> np.datetime64:
+    # Accepts datetimes, dates, datetime64 values and ISO 8601 strings (e.g. "2009-01-01")
+    return np.datetime64(value).astype("datetime64[us]")
+
+
+def _to_datetime64_array(values: np.ndarray) -> np.ndarray:
+    # Dates may be native Excel dates or "dd.mm.yy" strings (the leading zero of the day is optional)
+    # Missing values become NaT; any other value (e.g. a number) is not a date and raises a TypeError
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[us]")
+    dates = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[us]")
+    is_string = np.fromiter((isinstance(value, str) for value in values), dtype=bool, count=len(values))
+    is_native = np.fromiter((isinstance(value, (date, np.datetime64)) for value in values), dtype=bool,
+                            count=len(values))
+    is_missing = _get_missing_mask(values)
+    if len(not_dates := np.flatnonzero(~is_string & ~is_native & ~is_missing)):
+        value = values[not_dates[0]]
+        raise TypeError(f"{value!r} of type {type(value).__name__} is not a date")
+    is_native &= ~is_missing
+    if is_string.any():
+        dates[is_string] = _date_strings_to_datetime64(values[is_string])
+    if is_native.any():
+        dates[is_native] = np.array(values[is_native].tolist(), dtype="datetime64[us]")
+    return dates
+
+
+def _is_missing(value: Any) -> bool:
+    # Blank cells (None), the NAN constant and any other NaN or NaT value are all missing values
+    return value is None or value is NAN or (isinstance(value, float) and value != value) \
+        or (isinstance(value, np.datetime64) and np.isnat(value))
 
 
 def _remove_nans(array: Any) -> Any:
-    return type(array)([item for item in array if item is not NAN])
+    return type(array)([item for item in array if not _is_missing(item)])
 
 
 def _replace_nans(array: Any, value: Any) -> Any:
-    return type(array)([item if item is not NAN else value for item in array])
+    return type(array)([item if not _is_missing(item) else value for item in array])
+
+
+def _get_cast_type(values: list) -> type:
+    # The most frequently appearing data type is cast to the whole column
+    # Ties are resolved in favour of the data type that appears first
+    dtype_counter = Counter(type(value) for value in values if not _is_missing(value))
+    return dtype_counter.most_common(1)[0][0] if dtype_counter else float
+
+
+def _get_storage_dtype(dtype: type) -> np.dtype:
+    # Measurements are stored as float64 (so that missing values can be stored as nan) and dates as datetime64
+    if dtype in (int, float):
+        return np.dtype(np.float64)
+    elif issubclass(dtype, datetime):
+        return np.dtype("datetime64[us]")
+    return np.dtype(object)
+
+
+def _get_missing_mask(values: np.ndarray) -> np.ndarray:
+    if values.dtype.kind == "f":
+        return np.isnan(values)
+    elif values.dtype.kind == "M":
+        return np.isnat(values)
+    return np.fromiter(map(_is_missing, values), dtype=bool, count=len(values))
+
+
+def _pack_validity(valid_mask: np.ndarray) -> np.ndarray:
+    # One bit per row (set when the value is not missing), eight rows to a byte
+    return np.packbits(valid_mask, bitorder="little")
+
+
+def _unpack_validity(validity: np.ndarray, length: int) -> np.ndarray:
+    return np.unpackbits(validity, count=length, bitorder="little").view(bool)
+
+
+def _set_validity_bit(validity: np.ndarray, index: int, valid: bool):
+    if valid:
+        validity[index >> 3] |= 1 << (index & 7)
+    else:
+        validity[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+
+def _to_storage_array(values: list, dtype: type) -> np.ndarray:
+    storage_dtype = _get_storage_dtype(dtype)
+    if storage_dtype == object:
+        array = np.empty(len(values), dtype=object)
+        array[:] = [NAN if _is_missing(value) else value for value in values]
+        return array
+    array = np.array([None if _is_missing(value) else value for value in values], dtype=storage_dtype)
+    # Casting to int truncates, just like int() does
+    return np.trunc(array) if dtype is int else array
+
+
+def _to_storage_value(value: Any, dtype: type) -> Any:
+    if _is_missing(value):
+        return NAN if _get_storage_dtype(dtype) == object else None
+    return int(value) if dtype is int else value
+
+
+def _fits_dtype(value: Any, dtype: type) -> bool:
+    # Whether the value has the data type of the column, so that its storage keeps it as it is (e.g. 2.7 does not fit
+    # an int column, and would be truncated)
+    return _is_missing(value) or _is_dtype_subtype(type(value), dtype)
+
+
+def _is_dtype_subtype(value_type: type, dtype: type) -> bool:
+    # bool is a subclass of int, but True is not an int value of a column
+    return issubclass(value_type, dtype) and (value_type is not bool or dtype is bool)
+
+
+def _to_column_value(value: Any, dtype: type) -> Any:
+    # Values assigned to a date column may be "dd.mm.yy" strings, like the dates of the workbook
+    if dtype is datetime and isinstance(value, str) and DATE_VALUE.fullmatch(value):
+        return _date_string_to_datetime(value)
+    return value
+
+
+def _to_column_storage(values: list) -> Tuple[np.ndarray, type]:
+    # The storage and data type of a column of assigned values: the data type is the most frequent one, and values
+    # of other types are kept as they are in object storage (like the lists of rows the dataset used to be)
+    dtype = _get_cast_type(values)
+    if all(_fits_dtype(value, dtype) for value in values):
+        return _to_storage_array(values, dtype), dtype
+    array = np.empty(len(values), dtype=object)
+    array[:] = [NAN if _is_missing(value) else value for value in values]
+    return array, dtype
+
+
+def _to_python_list(values: np.ndarray, dtype: type, missing_mask: Optional[np.ndarray] = None) -> list:
+    # Columns pass the missing value mask they already keep
+    if missing_mask is None:
+        missing_mask = _get_missing_mask(values)
+    if dtype is int and values.dtype != object:
+        data = np.where(missing_mask, 0, values).astype(np.int64).tolist()
+    else:
+        # float64 becomes float and datetime64 becomes datetime; values in object storage are kept as they are
+        data = values.tolist()
+    for index in np.flatnonzero(missing_mask).tolist():
+        data[index] = NAN
+    return data
+
+
+def _to_python_value(value: Any, dtype: type) -> Any:
+    if _is_missing(value):
+        return NAN
+    if dtype is int and isinstance(value, np.floating):
+        return int(value)
+    return value.item() if isinstance(value, np.generic) else value
 
 
 def _format_slice(min_column_characters: int, ellipsis_space_length: int, iterable_length: int) -> Tuple[int, int, int]:
@@ -80,55 +266,73 @@ def _format_slice(min_column_characters: int, ellipsis_space_length: int, iterab
         print()
         columns = dataset_print_columns.value
     finally:
-        columns -= ellipsis_space_length
-        max_column_fits = columns // min_column_characters
-        column_characters = min_column_characters
-        # Maximise space taken up by the output
-        while (column_characters + 1) * max_column_fits <= columns:
-            column_characters += 1
-        max_column_fits = columns // column_characters
-        characters_per_side, remainder = divmod(max_column_fits, 2)
-        return column_characters, characters_per_side + remainder, iterable_length - characters_per_side - 1
+        return _fit_columns(columns, min_column_characters, ellipsis_space_length, iterable_length)
 
 
-def _get_cell_values(cell_range: List[Cell]) -> List[Any]:
-    return list(map(attrgetter("value"), cell_range))
+@lru_cache(maxsize=64)
+def _fit_columns(columns: int, min_column_characters: int, ellipsis_space_length: int,
+                 iterable_length: int) -> Tuple[int, int, int]:
+    # The layout only changes with the width of the terminal, so it is computed once per width
+    columns -= ellipsis_space_length
+    max_column_fits = columns // min_column_characters
+    column_characters = min_column_characters
+    # Maximise space taken up by the output
+    while (column_characters + 1) * max_column_fits <= columns:
+        column_characters += 1
+    max_column_fits = columns // column_characters
+    characters_per_side, remainder = divmod(max_column_fits, 2)
+    return column_characters, characters_per_side + remainder, iterable_length - characters_per_side - 1
 
 
 def _has_border_type(cell: Cell, border_type: str) -> bool:
-    return getattr(cell.border, border_type).style
-
-
-def _bound_worksheet_data_region(worksheet: Worksheet) -> Tuple[int, int, int]:
-    # 1. Find last data row
-
-    # The "a" column always has data as it is used to distinguish entries
-    row = 1
-    border_count = 0
-    while border_count < 2:
-        cell = worksheet["A" + str(row)]
-        if _has_border_type(cell, "bottom"):
-            if border_count == 0:
-                index_row = row
-            elif border_count == 1:
-                last_data_row = row
-            border_count += 1
-        row += 1
-
-    # 2. Find last data column
-    col = 1
-    while 1:
-        cell = worksheet[_column_number_to_letter(col) + str(last_data_row)]
-        if not _has_border_type(cell, "bottom"):
-            last_data_column = col - 1
-            break
-        col += 1
-
-    return index_row, last_data_row, last_data_column
-
-
-def _generate_structure_string(structures: List[Any], column_headings: List[str],
-                               index_column: bool = False, cut_data: bool = True) -> str:
+    # Empty cells streamed from read-only worksheets have no border object at all
+    return cell.border is not None and getattr(cell.border, border_type).style
+
+
+def _bound_worksheet_data_region(worksheet: Worksheet) -> Tuple[tuple, tuple, List[tuple]]:
+    # Bounds the data region and reads it in the same streaming pass (works in read-only mode too)
+    # The "a" column always has data as it is used to distinguish entries; its bottom borders mark
+    # the index row and the last data row, and the bordered cells of the last data row mark the last data column
+    # Returns the title row (the row above the index row), the index row and the data rows
+    # Rows of worksheets without recorded dimensions (e.g. written by write-only workbooks) stop at their last
+    # non-empty cell when streamed, so they are padded to the width of the data region
+    title_row = ()
+    rows = []
+    for row in worksheet.iter_rows():
+        first_cell_bordered = bool(row) and _has_border_type(row[0], "bottom")
+        if not rows and not first_cell_bordered:
+            title_row = tuple(cell.value for cell in row)
+            continue
+        rows.append(tuple(cell.value for cell in row))
+        if len(rows) > 1 and first_cell_bordered:
+            last_data_column = 0
+            while last_data_column < len(row) and _has_border_type(row[last_data_column], "bottom"):
+                last_data_column += 1
+            # Stop reading; anything below the last data row is not part of the dataset
+            padding = (None,) * last_data_column
+            index_row, *data_rows = [values[:last_data_column] if len(values) >= last_data_column
+                                     else (values + padding)[:last_data_column] for values in rows]
+            # Pad the title row in case the worksheet has fewer title cells than data columns
+            title_row = (title_row + (None,) * last_data_column)[:last_data_column]
+            return title_row, index_row, data_rows
+
+    raise ValueError("The worksheet has no bordered data region")
+
+
+def _get_blank_column_numbers(rows: List[tuple]) -> List[int]:
+    column_count = len(rows[0]) if rows else 0
+    return [column_number for column_number in range(1, column_count + 1)
+            if all(row[column_number - 1] is None for row in rows)]
+
+
+@lru_cache(maxsize=64)
+def _get_row_format(column_count: int, column_characters: int, indent_char: str) -> str:
+    return f"{{:{indent_char}{column_characters}}}" * column_count
+
+
+def _generate_structure_lines(structures: List[Any], column_headings: List[str],
+                              index_column: bool = False, cut_data: bool = True) -> Generator[str, None, None]:
+    # The headings, then one line per row, formatted as they are needed; only the rows that are shown are read
     # Make copies because these variables are passed in by reference (i.e. inplace operations affect variables in outer scopes)
     data = structures[:]
     headings = column_headings[:]
@@ -136,9 +340,6 @@ def _generate_structure_string(structures: List[Any], column_headings: List[str]
         data.insert(0, range(len(data[0])))
         headings.insert(0, "Index")
 
-    # writing it this way so that PyCharm does not state that this variable may be undefined
-    indent_char = indentation_character.value
-
     assert len(data) == len(headings), "This isn't going to work..."
     data_length = len(data)
     column_length = len(data[0])
@@ -148,21 +349,38 @@ def _generate_structure_string(structures: List[Any], column_headings: List[str]
     except OSError:
         columns = array_print_columns.value
 
-    string_format = f"{{:{indent_char}{columns}}}" * data_length
-    output = string_format.format(*headings)
+    string_format = _get_row_format(data_length, columns, indentation_character.value)
+    yield string_format.format(*headings)
 
     max_print_rows = max_array_print_rows.value
-    cutoff = column_length
-    if cut_data and cutoff > max_print_rows + 1:
-        indices = list(range(max_print_rows // 2 - 1)) \
-                  + list(range(column_length - max_print_rows // 2 - 2, column_length - 1))
+    if cut_data and column_length > max_print_rows + 1:
+        # The first and last rows, with an ellipsis in place of the rest
+        yield from (string_format.format(*(str(structure[index]) for structure in data))
+                    for index in range(max_print_rows // 2 - 1))
+        yield string_format.format(*(["..."] * data_length))
+        indices = range(column_length - max_print_rows // 2 - 1, column_length - 1)
     else:
         indices = range(column_length)
 
     for index in indices:
-        if cut_data and cutoff and index == column_length - max_print_rows // 2 - 2:
-            output += "\n" + string_format.format(*(["..."] * data_length))
-        else:
-            values = list(str(structure[index]) for structure in data)
-            output += "\n" + string_format.format(*values)
-    return output
+        yield string_format.format(*(str(structure[index]) for structure in data))
+
+
+def _generate_structure_string(structures: List[Any], column_headings: List[str],
+                               index_column: bool = False, cut_data: bool = True) -> str:
+    return "\n".join(_generate_structure_lines(structures, column_headings, index_column, cut_data))
+
+
+def _paginate_lines(lines: Iterable[str], page_rows: int) -> Generator[str, None, None]:
+    # Pages of page_rows lines each, every page headed by the first line (the headings); lines are read page by page
+    lines = iter(lines)
+    heading = next(lines, None)
+    if heading is None:
+        return
+    page_rows = max(page_rows, 1)
+    page = list(islice(lines, page_rows))
+    while True:
+        # Structures without any rows are one page of headings
+        yield "\n".join([heading, *page])
+        if not (page := list(islice(lines, page_rows))):
+            return
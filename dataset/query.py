@@ -0,0 +1,226 @@
+__all__ = [
+    "QUERY_OPERATORS",
+    "col",
+    "_Expression",
+]
+
+import numbers
+import operator
+from abc import ABCMeta, abstractmethod
+from datetime import date
+from typing import Any, Callable, Iterable, Tuple
+
+import numpy as np
+
+from dataset.functions import _to_datetime64
+from dataset.structures import _DatasetColumn
+
+QUERY_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+# Values that columns stored as numbers and as dates can be compared with, by the kind of their storage
+COMPARABLE_TYPES = {"f": numbers.Real, "M": np.datetime64}
+
+ColumnGetter = Callable[[str], _DatasetColumn]
+# Rows where an expression is true, and rows where it is false; rows in neither are unknown (i.e. a value is missing)
+Truth = Tuple[np.ndarray, np.ndarray]
+
+
+def col(column_name: str) -> "_ColumnReference":
+    # e.g. dataset.where((col("pH at 0.5m") > 8) & (col("Turbidity,NTU") > 50) & col("Date").between(start, end))
+    return _ColumnReference(column_name)
+
+
+def _comparison_operand(column: _DatasetColumn, value: Any) -> Any:
+    # Dates are compared with the datetime64 storage of the date column
+    kind = column.values.dtype.kind
+    if kind == "M" and isinstance(value, (str, date, np.datetime64)):
+        value = _to_datetime64(value)
+    if kind in COMPARABLE_TYPES and not isinstance(value, COMPARABLE_TYPES[kind]):
+        # e.g. col("pH at 0.5m") > "8"; strings are not converted to numbers
+        raise TypeError(f"The column {column.name!r} cannot be compared with {value!r} of type {type(value).__name__}")
+    return value
+
+
+def _compare(column: _DatasetColumn, comparison: Callable, other: Any) -> np.ndarray:
+    # Evaluated over the whole column; missing values are left out by the caller
+    values = column.values
+    if values.dtype != object:
+        return np.asarray(comparison(values, other), dtype=bool)
+    # Columns of other values (e.g. strings) cannot be compared with a missing value, so only the others are compared
+    result = np.zeros(len(values), dtype=bool)
+    valid = ~column.missing_mask
+    other = other[valid] if isinstance(other, np.ndarray) else other
+    result[valid] = np.asarray(comparison(values[valid], other), dtype=bool)
+    return result
+
+
+class _Expression(metaclass=ABCMeta):
+
+    # A condition on the rows of a dataset, evaluated over whole columns at once
+    # Conditions combine with & (and), | (or) and ~ (not). A comparison with a missing value is neither true nor
+    # false, so ~(col("pH") > 8) matches the same rows as col("pH") <= 8 (like SQL)
+
+    def __and__(self, other: "_Expression") -> "_Expression":
+        return _Combination(self, other, "and") if isinstance(other, _Expression) else NotImplemented
+
+    def __or__(self, other: "_Expression") -> "_Expression":
+        return _Combination(self, other, "or") if isinstance(other, _Expression) else NotImplemented
+
+    def __invert__(self) -> "_Expression":
+        return _Negation(self)
+
+    def __bool__(self):
+        raise TypeError("Combine conditions with &, | and ~ instead of and, or and not")
+
+    @abstractmethod
+    def evaluate(self, get_column: ColumnGetter) -> Truth:
+        pass
+
+    def mask(self, get_column: ColumnGetter) -> np.ndarray:
+        # Rows that match the condition
+        return self.evaluate(get_column)[0]
+
+
+class _ColumnReference:
+
+    # Comparing a column with a value or another column makes a condition
+
+    def __init__(self, column_name: str):
+        self.__column_name = column_name
+
+    def __repr__(self):
+        return f"col({self.__column_name!r})"
+
+    @property
+    def column_name(self) -> str:
+        return self.__column_name
+
+    def __eq__(self, other: Any) -> _Expression:
+        return _Comparison(self, "==", other)
+
+    def __ne__(self, other: Any) -> _Expression:
+        return _Comparison(self, "!=", other)
+
+    def __lt__(self, other: Any) -> _Expression:
+        return _Comparison(self, "<", other)
+
+    def __le__(self, other: Any) -> _Expression:
+        return _Comparison(self, "<=", other)
+
+    def __gt__(self, other: Any) -> _Expression:
+        return _Comparison(self, ">", other)
+
+    def __ge__(self, other: Any) -> _Expression:
+        return _Comparison(self, ">=", other)
+
+    __hash__ = None
+
+    def between(self, lower: Any, upper: Any) -> _Expression:
+        # Both bounds are inclusive, e.g. col("Date").between("2009-01-01", "2010-06-30")
+        return (self >= lower) & (self <= upper)
+
+    def isin(self, values: Iterable) -> _Expression:
+        return _Membership(self, values)
+
+    def is_missing(self) -> _Expression:
+        return _Missing(self)
+
+    def not_missing(self) -> _Expression:
+        return ~_Missing(self)
+
+
+class _Comparison(_Expression):
+
+    def __init__(self, column: _ColumnReference, operator_symbol: str, other: Any):
+        self.__column = column
+        self.__operator_symbol = operator_symbol
+        self.__other = other
+
+    def __repr__(self):
+        return f"({self.__column!r} {self.__operator_symbol} {self.__other!r})"
+
+    def evaluate(self, get_column: ColumnGetter) -> Truth:
+        column = get_column(self.__column.column_name)
+        unknown = column.missing_mask
+        if isinstance(self.__other, _ColumnReference):
+            other_column = get_column(self.__other.column_name)
+            if column.values.dtype != other_column.values.dtype:
+                raise TypeError(f"The columns {column.name!r} and {other_column.name!r} hold different types of values "
+                                f"and cannot be compared")
+            unknown = unknown | other_column.missing_mask
+            other = other_column.values
+        else:
+            other = _comparison_operand(column, self.__other)
+        result = _compare(column, QUERY_OPERATORS[self.__operator_symbol], other)
+        return result & ~unknown, ~result & ~unknown
+
+
+class _Membership(_Expression):
+
+    def __init__(self, column: _ColumnReference, values: Iterable):
+        self.__column = column
+        self.__values = list(values)
+
+    def __repr__(self):
+        return f"{self.__column!r}.isin({self.__values!r})"
+
+    def evaluate(self, get_column: ColumnGetter) -> Truth:
+        column = get_column(self.__column.column_name)
+        known = ~column.missing_mask
+        values = [_comparison_operand(column, value) for value in self.__values]
+        if column.values.dtype == object:
+            result = np.zeros(len(column), dtype=bool)
+            result[known] = [value in values for value in column.values[known].tolist()]
+        else:
+            result = np.isin(column.values, np.asarray(values, dtype=column.values.dtype))
+        return result & known, ~result & known
+
+
+class _Missing(_Expression):
+
+    def __init__(self, column: _ColumnReference):
+        self.__column = column
+
+    def __repr__(self):
+        return f"{self.__column!r}.is_missing()"
+
+    def evaluate(self, get_column: ColumnGetter) -> Truth:
+        missing = get_column(self.__column.column_name).missing_mask
+        return missing, ~missing
+
+
+class _Combination(_Expression):
+
+    def __init__(self, left: _Expression, right: _Expression, combination: str):
+        self.__left = left
+        self.__right = right
+        self.__combination = combination
+
+    def __repr__(self):
+        return f"({self.__left!r} {'&' if self.__combination == 'and' else '|'} {self.__right!r})"
+
+    def evaluate(self, get_column: ColumnGetter) -> Truth:
+        left_true, left_false = self.__left.evaluate(get_column)
+        right_true, right_false = self.__right.evaluate(get_column)
+        if self.__combination == "and":
+            return left_true & right_true, left_false | right_false
+        return left_true | right_true, left_false & right_false
+
+
+class _Negation(_Expression):
+
+    def __init__(self, expression: _Expression):
+        self.__expression = expression
+
+    def __repr__(self):
+        return f"~{self.__expression!r}"
+
+    def evaluate(self, get_column: ColumnGetter) -> Truth:
+        expression_true, expression_false = self.__expression.evaluate(get_column)
+        return expression_false, expression_true
@@ -0,0 +1,145 @@
+__all__ = ["QuantileSketch"]
+
+import math
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# The rank error of a KLL sketch with top compactor capacity k is about 1.65 / k (with high probability)
+KLL_ERROR_CONSTANT = 1.65
+# Each compactor holds 2/3 of the items of the one above it, down to a minimum capacity
+CAPACITY_RATIO = 2 / 3
+MIN_CAPACITY = 2
+MIN_K = 8
+# Values are added to a sketch in chunks of this size so that it never holds much more than its capacity
+CHUNK_SIZE = 4096
+
+
+class QuantileSketch:
+
+    # KLL sketch of a stream of numbers: approximate quantiles in memory that grows with log(count) only
+    # Items at level h stand for 2 ** h values. When a level is full it is sorted and every other item
+    # (starting at a random offset) is promoted to the next level, so the total weight never changes
+    # Sketches of different chunks, files or workers are combined with merge() and can be pickled
+    # Memory is only bounded when the values are never all loaded at once, i.e. when the caller reads a large source
+    # chunk by chunk and calls update() with each chunk (or merges the sketches of the chunks)
+    # Missing values (nan) are not counted
+
+    def __init__(self, error: float = 0.01, seed: Optional[int] = 0):
+        if not 0 < error < 1:
+            raise ValueError("The error bound must be between 0 and 1")
+        self.__error = error
+        self.__k = max(MIN_K, math.ceil(KLL_ERROR_CONSTANT / error))
+        self.__levels = [np.zeros(0)]
+        self.__count = 0
+        self.__min = math.inf
+        self.__max = -math.inf
+        self.__rng = np.random.default_rng(seed)
+
+    def __repr__(self):
+        return f"QuantileSketch(error={self.__error!r}, count={self.__count!r})"
+
+    def __len__(self) -> int:
+        # Number of values the sketch stands for (not the number of items it holds)
+        return self.__count
+
+    @classmethod
+    def from_values(cls, values: Iterable, error: float = 0.01) -> "QuantileSketch":
+        sketch = cls(error)
+        values = np.asarray(values, dtype=np.float64)
+        for start in range(0, len(values), CHUNK_SIZE):
+            sketch.update(values[start:start + CHUNK_SIZE])
+        return sketch
+
+    @property
+    def error(self) -> float:
+        return self.__error
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def min(self) -> float:
+        return self.__min if self.__count else math.nan
+
+    @property
+    def max(self) -> float:
+        return self.__max if self.__count else math.nan
+
+    @property
+    def retained_items(self) -> int:
+        return sum(map(len, self.__levels))
+
+    def update(self, values: Iterable) -> "QuantileSketch":
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.__count += len(values)
+        self.__min = min(self.__min, values.min().item())
+        self.__max = max(self.__max, values.max().item())
+        self.__levels[0] = np.concatenate((self.__levels[0], values))
+        self.__compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        # Adds the values of the other sketch to this one; the error bound of this sketch is kept
+        for level, items in enumerate(other.__levels):
+            if level == len(self.__levels):
+                self.__levels.append(np.zeros(0))
+            self.__levels[level] = np.concatenate((self.__levels[level], items))
+        self.__count += other.__count
+        self.__min = min(self.__min, other.__min)
+        self.__max = max(self.__max, other.__max)
+        self.__compress()
+        return self
+
+    def quantiles(self, fractions: Iterable[float]) -> List[float]:
+        # Fractions are between 0 and 1; 0 and 1 give the exact minimum and maximum
+        fractions = np.asarray(fractions, dtype=np.float64)
+        if not self.__count:
+            return [math.nan] * len(fractions)
+        items = np.concatenate(self.__levels)
+        weights = np.concatenate([np.full(len(level_items), 2 ** level, dtype=np.int64)
+                                  for level, level_items in enumerate(self.__levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative_weights = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative_weights, fractions * cumulative_weights[-1], side="left")
+        results = items[order][np.minimum(positions, len(items) - 1)]
+        results = np.where(fractions <= 0, self.__min, np.where(fractions >= 1, self.__max, results))
+        return results.tolist()
+
+    def quantile(self, fraction: float) -> float:
+        return self.quantiles([fraction])[0]
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def quartiles(self) -> Tuple[float, float]:
+        q1, q3 = self.quantiles([0.25, 0.75])
+        return q1, q3
+
+    def iqr(self) -> float:
+        q1, q3 = self.quartiles()
+        return q3 - q1
+
+    def outlier_fences(self) -> Tuple[float, float]:
+        q1, q3 = self.quartiles()
+        return q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+
+    def __capacity(self, level: int) -> int:
+        depth = len(self.__levels) - level - 1
+        return max(MIN_CAPACITY, math.ceil(self.__k * CAPACITY_RATIO ** depth))
+
+    def __compress(self):
+        while self.retained_items > sum(map(self.__capacity, range(len(self.__levels)))):
+            level = next(level for level, items in enumerate(self.__levels) if len(items) >= self.__capacity(level))
+            if level + 1 == len(self.__levels):
+                self.__levels.append(np.zeros(0))
+            items = np.sort(self.__levels[level])
+            # An odd item out stays at its level
+            held_items = items[len(items) - len(items) % 2:]
+            promoted_items = items[:len(items) - len(held_items)][self.__rng.integers(2)::2]
+            self.__levels[level] = held_items
+            self.__levels[level + 1] = np.concatenate((self.__levels[level + 1], promoted_items))
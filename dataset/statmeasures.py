@@ -1,99 +1,344 @@
 __all__ = [
     "STATISTICAL_FUNCTIONS",
+    "VECTORIZED_FUNCTIONS",
+    "SUMMARY_STATISTICS",
+    "VALUE_STATISTICS",
+    "SAMPLE_STATISTICS",
+    "CORRELATION_METHODS",
+    "APPROXIMATE_FUNCTIONS",
+    "INTERMEDIATES",
     "Numeric",
+    "register_statistic",
+    "get_statistical_measure",
     "get_base_statistical_function",
+    "statistical_summary",
+    "get_vectorized_function",
+    "covariance_matrix",
+    "correlation_matrix",
 ]
 
 import math
-import operator
 import numpy as np
-from typing import NewType, Callable, List, Dict, Optional
-from collections import Counter
-from itertools import groupby
+from functools import cached_property
+from typing import Any, NewType, Callable, Iterable, List, Dict, Optional, Tuple
 
 from dataset.constants import NAN
-from dataset.functions import _remove_nans, _replace_nans, _get_array_dtype
+from dataset.functions import _get_array_dtype
+from dataset.sketch import QuantileSketch
+from dataset.config import approximate_quantiles, quantile_sketch_error
 
 Numeric = int | float
 Data = NewType("Data", List[Numeric])
 
 
-def _remove_outliers(data: Data | list) -> list:
-    return [value for value in data if not get_base_statistical_function("outlier")(data, value)]
+def _as_array(data: Data | np.ndarray) -> np.ndarray:
+    # Lists of ints become int64 arrays (so results keep their Python type), anything with nan becomes float64
+    return data if isinstance(data, np.ndarray) else np.asarray(data)
 
 
-def _replace_outliers(data: Data, repl: Numeric) -> list:
-    outlier = get_base_statistical_function("outlier")
-    return [value if not outlier(_remove_nans(data), value) else repl for value in data]
+def _sequential_sum(data: np.ndarray) -> Numeric:
+    # np.sum uses pairwise summation, which rounds differently to the builtin sum
+    # The last cumulative sum adds the values from left to right exactly like sum() does
+    return np.cumsum(data)[-1].item() if len(data) else 0
 
 
-def _no_outlier_mean(data: Data) -> Numeric:
-    no_outlier_data = _remove_outliers(_remove_nans(data))
-    no_outlier_mean = sum(no_outlier_data) / len(no_outlier_data)
+def _sorted_median(sorted_data: np.ndarray) -> Numeric:
+    mid, remainder = divmod(len(sorted_data), 2)
+    if remainder == 0:
+        return (sorted_data[mid - 1].item() + sorted_data[mid].item()) / 2
+    else:
+        return sorted_data[mid].item()
+
+
+def _typed_values(data: np.ndarray, indexes: np.ndarray, int_mask: Optional[np.ndarray]) -> list:
+    # Values of the data as the type they have in the column, i.e. the ints of an int column stay ints even
+    # when other values were replaced with floats (see int_mask)
+    values = data[indexes].tolist()
+    if int_mask is None:
+        return values
+    return [int(value) if is_int else value for value, is_int in zip(values, int_mask[indexes].tolist())]
+
+
+def _typed_value(data: np.ndarray, index: int, int_mask: Optional[np.ndarray]) -> Numeric:
+    return _typed_values(data, np.array([index]), int_mask)[0]
+
+
+def _ordered_median(data: np.ndarray, order: np.ndarray, int_mask: Optional[np.ndarray]) -> Numeric:
+    # The order is a stable argsort of the data, so equal values keep their order (like sorted()) and the
+    # median of an odd number of values is the same value, and of the same type, as in the column's list of values
+    mid, remainder = divmod(len(order), 2)
+    if remainder == 0:
+        return (data[order[mid - 1]].item() + data[order[mid]].item()) / 2
+    return _typed_value(data, order[mid], int_mask)
+
+
+def _typed_median(data: np.ndarray, int_mask: Optional[np.ndarray] = None) -> Numeric:
+    if int_mask is None:
+        return _sorted_median(np.sort(data))
+    return _ordered_median(data, np.argsort(data, kind="stable"), int_mask)
+
+
+def _outlier_fences(data: np.ndarray) -> tuple:
+    # Quartiles are computed once for the whole array rather than once per value
+    # If the data contains nan, so do the fences, and no value is an outlier (this matches np.percentile)
+    q1, q3 = np.percentile(data, [25, 75])
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+def _outlier_mask(data: np.ndarray, fence_data: Optional[np.ndarray] = None) -> np.ndarray:
+    lower_fence, upper_fence = _outlier_fences(data if fence_data is None else fence_data)
+    return (data < lower_fence) | (data > upper_fence)
+
+
+def _remove_array_nans(data: np.ndarray) -> np.ndarray:
+    return data[~np.isnan(data)]
+
+
+def _replace_array_nans(data: np.ndarray, value: Numeric) -> np.ndarray:
+    return np.where(np.isnan(data), value, data)
+
+
+def _remove_outliers(data: Data | np.ndarray) -> np.ndarray:
+    data = _as_array(data)
+    return data[~_outlier_mask(data)]
+
+
+def _replace_outliers(data: Data | np.ndarray, repl: Numeric) -> np.ndarray:
+    data = _as_array(data)
+    return np.where(_outlier_mask(data, _remove_array_nans(data)), repl, data)
+
+
+def _no_outlier_mean(data: Data | np.ndarray) -> Numeric:
+    no_outlier_data = _remove_outliers(_remove_array_nans(_as_array(data)))
+    no_outlier_mean = _sequential_sum(no_outlier_data) / len(no_outlier_data)
     return no_outlier_mean
 
 
-def _no_outlier_median(data: Data) -> Numeric:
-    data = _remove_outliers(sorted(data))
-    num_of_elements = len(data)
-    if num_of_elements % 2 == 1:
-        return data[num_of_elements // 2]
-    else:
-        return (data[num_of_elements // 2 - 1] + data[num_of_elements // 2]) / 2
-
-
-def reformat_data(data: Data, *, na_action: str = "ignore", outlier_action: str = "keep"):
-    modified_data = data[:]
-    match outlier_action:
-        case "remove" | "ignore":
-            modified_data = _remove_outliers(modified_data)
-        case "average" | "mean":
-            no_outlier_mean = _no_outlier_mean(modified_data)
-            modified_data = _replace_outliers(modified_data, no_outlier_mean)
-        case "median":
-            # modified_data = _replace_outliers(modified_data, _no_outlier_median(modified_data))
-            median = _no_outlier_median(_remove_nans(modified_data))
-            if na_action in ["remove", "ignore", "median"]:
-                median = _no_outlier_median(_remove_nans(modified_data))
-            elif na_action in ["average", "mean"]:
-                median = _no_outlier_median(_replace_nans(modified_data, _no_outlier_mean(modified_data)))
-            modified_data = _replace_outliers(modified_data, median)
-    match na_action:
-        case "remove" | "ignore":
-            modified_data = _remove_nans(modified_data)
-        case "average" | "mean":
-            numeric_data = _remove_nans(modified_data)
-            if outlier_action == "keep":
-                mean = sum(numeric_data) / len(numeric_data)
+def _no_outlier_median(data: Data | np.ndarray, int_mask: Optional[np.ndarray] = None) -> Numeric:
+    data = _as_array(data)
+    kept = ~_outlier_mask(data)
+    return _typed_median(data[kept], None if int_mask is None else int_mask[kept])
+
+
+def _replace_int_mask(int_mask: Optional[np.ndarray], replaced: np.ndarray, value: Numeric) -> Optional[np.ndarray]:
+    # Replaced values are ints only if the value replacing them is one (e.g. the median of an odd number of ints)
+    return None if int_mask is None else np.where(replaced, type(value) is int, int_mask)
+
+
+class _ReformatPlan:
+
+    # Reformats one column's data for any combination of na_action and outlier_action
+    # The missing value mask, the outlier mask and the replacement values are computed once, when first needed,
+    # and every reformatted array is remembered, so the statistics of a column share them (see reformat_plan)
+
+    def __init__(self, data: Data | np.ndarray, dtype: type = float, na_mask: Optional[np.ndarray] = None):
+        self.__data = np.array(data, dtype=np.float64)
+        self.__dtype = dtype
+        # Lists and object storage may hold ints and floats together (e.g. 2.7 assigned to an int column)
+        self.__value_int_mask = None
+        if not isinstance(data, np.ndarray) or data.dtype == object:
+            value_int_mask = np.fromiter((type(value) is int for value in data), dtype=bool, count=len(data))
+            if value_int_mask.any() and not (dtype is int and np.array_equal(value_int_mask, ~np.isnan(self.__data))):
+                self.__value_int_mask = value_int_mask
+        self.__results = {}
+        if na_mask is not None:
+            # Columns keep their own mask of missing values
+            self.na_mask = na_mask
+
+    @cached_property
+    def na_mask(self) -> np.ndarray:
+        return np.isnan(self.__data)
+
+    @cached_property
+    def has_missing(self) -> bool:
+        return bool(self.na_mask.any())
+
+    @cached_property
+    def valid_data(self) -> np.ndarray:
+        return self.__data[~self.na_mask] if self.has_missing else self.__data
+
+    @cached_property
+    def outlier_mask(self) -> np.ndarray:
+        # The fences are those of the values that are not missing; missing values are never outliers
+        return _outlier_mask(self.__data, self.valid_data)
+
+    @cached_property
+    def mean(self) -> Numeric:
+        return _sequential_sum(self.valid_data) / len(self.valid_data)
+
+    @cached_property
+    def no_outlier_mean(self) -> Numeric:
+        return _no_outlier_mean(self.valid_data)
+
+    @cached_property
+    def int_mask(self) -> Optional[np.ndarray]:
+        # Which values are ints: every value of an int column that is not missing, None for other columns
+        # (unless the data holds values of both types). Values replaced while reformatting are usually floats
+        # (see _replace_int_mask)
+        if self.__value_int_mask is not None:
+            return self.__value_int_mask
+        return ~self.na_mask if self.__dtype is int else None
+
+    @cached_property
+    def no_outlier_median(self) -> Numeric:
+        valid_int_mask = None if self.int_mask is None else self.int_mask[~self.na_mask]
+        return _no_outlier_median(self.valid_data, valid_int_mask)
+
+    @cached_property
+    def filled_no_outlier_median(self) -> Numeric:
+        # Median of the data once its missing values are replaced with the mean of the values that are not outliers
+        if not self.has_missing:
+            return self.no_outlier_median
+        return _no_outlier_median(_replace_array_nans(self.__data, self.no_outlier_mean), self.int_mask)
+
+    def reformat(self, na_action: str = "ignore", outlier_action: str = "keep", keep_length: bool = False) -> np.ndarray:
+        # The returned arrays are shared by every caller, so they are read-only
+        key = (na_action, outlier_action, keep_length)
+        if (result := self.__results.get(key)) is None:
+            data, removed, _ = self.__applied(na_action, outlier_action)
+            if keep_length:
+                result = np.where(removed, np.nan, data)
+            else:
+                result = data[~removed] if removed.any() else data
+            result.flags.writeable = False
+            self.__results[key] = result
+        return result
+
+    def prepare(self, na_action: str = "ignore", outlier_action: str = "keep") -> np.ndarray:
+        # The reformatted data that statistics are computed from
+        # Int columns are evaluated as int64 unless some of their values were replaced (see the int_mask intermediate)
+        key = ("prepared", na_action, outlier_action)
+        if (result := self.__results.get(key)) is None:
+            result = self.reformat(na_action, outlier_action)
+            if self.__dtype is int and self.__kept_int_mask(na_action, outlier_action) is None:
+                result = result.astype(np.int64)
+                result.flags.writeable = False
+            self.__results[key] = result
+        return result
+
+    def intermediate(self, name: str, na_action: str = "ignore", outlier_action: str = "keep") -> Any:
+        # One of INTERMEDIATES of the prepared data, shared by every statistic that declares it
+        key = ("intermediate", name, na_action, outlier_action)
+        if key not in self.__results:
+            data = self.prepare(na_action, outlier_action)
+            match name:
+                case "sorted":
+                    result = np.sort(data)
+                    result.flags.writeable = False
+                case "count":
+                    result = len(data)
+                case "mean":
+                    result = _sequential_sum(data) / len(data)
+                case "stdev":
+                    squared_deviations = np.float_power(data - self.intermediate("mean", na_action, outlier_action), 2)
+                    result = math.sqrt(_sequential_sum(squared_deviations) / (len(data) - 1))
+                case "int_mask":
+                    result = self.__kept_int_mask(na_action, outlier_action)
+                case _:
+                    raise ValueError(f"Unknown intermediate {name!r}, expected one of {INTERMEDIATES}")
+            self.__results[key] = result
+        return self.__results[key]
+
+    def quantile_sketch(self, na_action: str = "ignore", outlier_action: str = "keep",
+                        error: float = 0.01) -> QuantileSketch:
+        # Sketch of the reformatted data (see approximate_quantiles)
+        # It is built from the loaded column, so it saves sorting rather than memory
+        key = ("sketch", na_action, outlier_action, error)
+        if (sketch := self.__results.get(key)) is None:
+            sketch = self.__results[key] = QuantileSketch.from_values(self.reformat(na_action, outlier_action), error)
+        return sketch
+
+    def __kept_int_mask(self, na_action: str, outlier_action: str) -> Optional[np.ndarray]:
+        # Which of the prepared values are ints, or None if they all have the type of the column
+        _, removed, int_mask = self.__applied(na_action, outlier_action)
+        if int_mask is None:
+            return None
+        int_mask = int_mask[~removed]
+        return None if int_mask.all() else int_mask
+
+    def __applied(self, na_action: str, outlier_action: str) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        key = ("applied", na_action, outlier_action)
+        if (applied := self.__results.get(key)) is None:
+            applied = self.__results[key] = self.__apply(na_action, outlier_action)
+        return applied
+
+    def __apply(self, na_action: str, outlier_action: str) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        # The data with its values replaced, the values to remove and which values are ints, for every row
+        data = self.__data
+        int_mask = self.int_mask
+        removed = np.zeros(len(data), dtype=bool)
+        match outlier_action:
+            case "remove" | "ignore":
+                # The quartiles of data with missing values are nan (like np.percentile), so nothing is removed
+                if not self.has_missing:
+                    removed = self.outlier_mask
+            case "average" | "mean":
+                data = np.where(self.outlier_mask, self.no_outlier_mean, data)
+                int_mask = _replace_int_mask(int_mask, self.outlier_mask, self.no_outlier_mean)
+            case "median":
+                median = self.filled_no_outlier_median if na_action in ["average", "mean"] \
+                    else self.no_outlier_median
+                data = np.where(self.outlier_mask, median, data)
+                int_mask = _replace_int_mask(int_mask, self.outlier_mask, median)
+
+        # Replacement values are computed from the values that are left; only replaced outliers change them
+        unchanged = outlier_action not in ["average", "mean", "median"]
+        missing = self.na_mask & ~removed
+        if na_action in ["remove", "ignore"]:
+            removed = removed | missing
+        elif na_action in ["average", "mean", "median"] and self.has_missing:
+            remaining = ~removed & ~self.na_mask
+            if na_action == "median":
+                value = self.no_outlier_median if unchanged else \
+                    _no_outlier_median(data[remaining], None if int_mask is None else int_mask[remaining])
+            elif outlier_action == "keep":
+                value = self.mean
             else:
-                mean = _no_outlier_mean(numeric_data)
-            modified_data = _replace_nans(modified_data, mean)
-        case "median":
-            modified_data = _replace_nans(modified_data, _no_outlier_median(modified_data))
+                value = self.no_outlier_mean if unchanged else _no_outlier_mean(data[remaining])
+            data = np.where(missing, value, data)
+            int_mask = _replace_int_mask(int_mask, missing, value)
+        return data, removed, int_mask
 
-    # if round_dp:
-    #     return [round(value, round_dp) for value in modified_data]
-    # else:
-    #     return modified_data
 
-    return modified_data
+def reformat_data(data: Data, *, na_action: str = "ignore", outlier_action: str = "keep",
+                  keep_length: bool = False) -> np.ndarray:
+    # With keep_length, removed values are left in place as missing values (i.e. so the rows of a dataset stay aligned)
+    plan = getattr(data, "reformat_plan", None) or _ReformatPlan(data)
+    return plan.reformat(na_action, outlier_action, keep_length)
+
+
+def _get_numeric_plan(data: Data) -> Optional[_ReformatPlan]:
+    # Returns None for data that is not numeric
+    # Column views carry their data type and reformat plan; plain lists have theirs inferred
+    dtype = data.dtype if isinstance(getattr(data, "dtype", None), type) else _get_array_dtype(data)
+    if dtype not in (int, float):
+        # I don't particularly like this method, but
+        # the case-match syntax does not accept the Numeric type hint
+        return None
+    return getattr(data, "reformat_plan", None) or _ReformatPlan(data, dtype)
 
 
 class _StatisticalMeasure:
 
     # Handles arguments of stat functions
+    # What a statistic needs is declared when it is registered (see register_statistic), so calling it
+    # never inspects the function itself
 
-    __instances = {}
-
-    def __new__(cls, function_name: str, function: Callable):
+    def __new__(cls, function_name: str, function: Callable, extra_args: int, *,
+                vectorized: Optional[Callable] = None, sorted_input: bool = False, intermediates: tuple = (),
+                min_count: int = 1):
         self = object.__new__(cls)
         self.__function_name = function_name
         self.__function = function
         # Extra arguments only; assumes data array is passed in
-        self.__extra_args = self.__function.__code__.co_argcount - 1
+        self.__extra_args = extra_args
+        self.__vectorized = vectorized
+        self.__sorted_input = sorted_input
+        self.__intermediates = intermediates
+        self.__min_count = min_count
         # Check if the variable name of the function != the actual name of the function in memory
-        self.__is_alias = self.__function_name != self.__function.__name__
-        cls.__instances[self.__function_name] = self.__function
+        self.__is_alias = self.__function_name != getattr(self.__function, "__name__", self.__function_name)
         return self
 
     def __repr__(self):
@@ -104,19 +349,22 @@ class _StatisticalMeasure:
 
     def __call__(self, data: Data, fargs: list | frozenset = frozenset(), *, na_action: str = "ignore",
                  outlier_action: str = "keep", round_dp: Optional[int] = None) -> list | None:
-        # make the type checkers and PyCharm happy
-        modified_data = data[:]
-        if _get_array_dtype(modified_data) not in (int, float):
-            # I don't particularly like this method, but
-            # the case-match syntax does not accept the Numeric type hint
+        plan = _get_numeric_plan(data)
+        if plan is None:
             return NAN
-
-        modified_data = reformat_data(data, na_action=na_action, outlier_action=outlier_action)
         # The array data is an assumed argument
         assert (expected_additional_function_args := self.__extra_args) == len(fargs), \
             f"Expected {expected_additional_function_args} argument(s), got {len(fargs)}"
 
-        stat = self.__function(modified_data, *fargs)
+        if approximate_quantiles.value and self.__function_name in APPROXIMATE_FUNCTIONS:
+            sketch = plan.quantile_sketch(na_action, outlier_action, quantile_sketch_error.value)
+            stat = APPROXIMATE_FUNCTIONS[self.__function_name](sketch, *fargs)
+        else:
+            # The sorted data and the intermediates are remembered by the plan, so statistics of a column share them
+            modified_data = plan.intermediate("sorted", na_action, outlier_action) if self.__sorted_input \
+                else plan.prepare(na_action, outlier_action)
+            intermediates = {name: plan.intermediate(name, na_action, outlier_action) for name in self.__intermediates}
+            stat = self.__function(modified_data, *fargs, **intermediates)
         return stat if round_dp is None else round(stat, round_dp)
 
     @property
@@ -127,6 +375,31 @@ class _StatisticalMeasure:
     def function(self) -> Callable:
         return self.__function
 
+    @property
+    def vectorized(self) -> Optional[Callable]:
+        return self.__vectorized
+
+    @property
+    def sorted_input(self) -> bool:
+        return self.__sorted_input
+
+    @property
+    def intermediates(self) -> tuple:
+        return self.__intermediates
+
+    @property
+    def min_count(self) -> int:
+        return self.__min_count
+
+    def has_enough_values(self, data: Data, na_action: str = "ignore", outlier_action: str = "keep") -> bool:
+        # Whether the reformatted data has at least min_count values, e.g. a month in which a column was measured
+        # once has no standard deviation. Data without any values has none, whichever values would replace them
+        plan = _get_numeric_plan(data)
+        if plan is None:
+            # The statistic of data that is not numeric is a missing value
+            return True
+        return len(plan.valid_data) > 0 and plan.intermediate("count", na_action, outlier_action) >= self.__min_count
+
     @property
     def is_alias(self) -> bool:
         return self.__is_alias
@@ -135,27 +408,27 @@ class _StatisticalMeasure:
 def _get_statistical_functions() -> Dict[str, _StatisticalMeasure]:
     # Enclose within function to store functions locally, defined only in this scope
 
-    def range(data: Data) -> Numeric:
-        return max(data) - min(data)
+    def range(data: Data, *, int_mask: Optional[np.ndarray] = None) -> Numeric:
+        data = _as_array(data)
+        if int_mask is None:
+            return (np.max(data) - np.min(data)).item()
+        # The first of the largest and of the smallest values, like max() and min()
+        return _typed_value(data, np.argmax(data), int_mask) - _typed_value(data, np.argmin(data), int_mask)
 
     def mean(data: Data) -> Numeric:
-        return sum(data) / len(data)
-
-    def mode(data: Data) -> Numeric | list:
-        # Handles multimodal data
-        value_counts = Counter(data).most_common()
-        max_count, mode_values = next(groupby(value_counts, key=operator.itemgetter(1)), (0, []))
-        return list(map(operator.itemgetter(0), mode_values))
-
-    def median(data: Data) -> Numeric:
-        # Use the non-inplace operation so that the data is not modified
-        # i.e. the list.sort method modifies the parameter because it is passed in by reference
-        data_copy = sorted(data)
-        mid, remainder = divmod(len(data), 2)
-        if remainder == 0:
-            return (data_copy[mid - 1] + data_copy[mid]) / 2
-        else:
-            return data_copy[mid]
+        return _sequential_sum(_as_array(data)) / len(data)
+
+    def mode(data: Data, *, int_mask: Optional[np.ndarray] = None) -> Numeric | list:
+        # Handles multimodal data; modes are listed in the order they first appear (like Counter.most_common)
+        data = _as_array(data)
+        if not len(data):
+            return []
+        _, first_indexes, counts = np.unique(data, return_index=True, return_counts=True)
+        return _typed_values(data, np.sort(first_indexes[counts == counts.max()]), int_mask)
+
+    def median(data: Data, *, int_mask: Optional[np.ndarray] = None) -> Numeric:
+        # np.sort returns a sorted copy so that the data is not modified
+        return _typed_median(_as_array(data), int_mask)
 
     def q1(data: Data) -> Numeric:
         return np.percentile(data, 25)
@@ -176,7 +449,10 @@ def _get_statistical_functions() -> Dict[str, _StatisticalMeasure]:
         return lower_outlier(data, value) or upper_outlier(data, value)
 
     def stdev(data: Data) -> Numeric:
-        return math.sqrt(sum(pow(x - mean(data), 2) for x in data) / (len(data) - 1))
+        data = _as_array(data)
+        # float_power uses the same pow() as the builtin, which np.square does not always round like
+        squared_deviations = np.float_power(data - mean(data), 2)
+        return math.sqrt(_sequential_sum(squared_deviations) / (len(data) - 1))
 
     def variance(data: Data) -> Numeric:
         return pow(stdev(data), 2)
@@ -198,12 +474,361 @@ def _get_statistical_functions() -> Dict[str, _StatisticalMeasure]:
     # std = sd = stdev
     # z = z_score
 
-    return {function_name: _StatisticalMeasure(function_name, function) for function_name, function in locals().items()}
+    return dict(locals())
+
+
+# Registered statistics by name; statistics are added with register_statistic, never by modifying these directly
+STATISTICAL_FUNCTIONS: Dict[str, _StatisticalMeasure] = {}
+VECTORIZED_FUNCTIONS: Dict[str, Callable] = {}
+APPROXIMATE_FUNCTIONS: Dict[str, Callable] = {}
+INTERMEDIATES = ("sorted", "count", "mean", "stdev", "int_mask")
+_measures_by_function: Dict[Callable, _StatisticalMeasure] = {}
+_registry_version = 0
+# Arguments of the statistics registered after the built-in ones, which worker processes are given when they start
+# (processes that are not forked only import the built-in statistics)
+_runtime_registrations: Dict[str, dict] = {}
+_builtins_registered = False
+
+
+def register_statistic(function_name: str, function: Callable, *, extra_args: Optional[int] = None,
+                       vectorized: Optional[Callable] = None, approximate: Optional[Callable] = None,
+                       sorted_input: bool = False, intermediates: Iterable[str] = (), min_count: int = 1,
+                       replace: bool = False) -> _StatisticalMeasure:
+    # Adds a statistic that is scheduled, remembered and batched like the built-in ones
+    # function(data, *extra_args, **intermediates) is given the prepared (reformatted) data, sorted if sorted_input
+    # extra_args: the number of arguments after the data; when not declared, it is read from the function once, here
+    # vectorized: for statistics taking (data, value), evaluates every value of the data at once (see filter_column)
+    # approximate: evaluates the statistic from a quantile sketch instead while approximate_quantiles is enabled
+    # min_count: the fewest values the statistic is defined for; groups of rows with fewer (e.g. in resample) are
+    # given a missing value instead of being evaluated
+    # intermediates: any of INTERMEDIATES, each computed once per column and set of options and passed by keyword
+    #   int_mask tells which values of an int column's data are still ints once others were replaced with floats
+    #   (None if they all are), so that statistics picking values of the data can return them with their own type
+    # e.g. register_statistic("p90", lambda sorted_data: sorted_data[int(0.9 * (len(sorted_data) - 1))].item(),
+    #                         extra_args=0, sorted_input=True)
+    global _registry_version
+    if function_name in STATISTICAL_FUNCTIONS and not replace:
+        raise ValueError(f"The statistic {function_name!r} is already registered")
+    if extra_args is None:
+        extra_args = function.__code__.co_argcount - 1
+    if vectorized is not None and extra_args != 1:
+        raise ValueError("Only statistics taking (data, value) can have a vectorized counterpart")
+    intermediates = tuple(intermediates)
+    if sorted_input and "int_mask" in intermediates:
+        raise ValueError("The int_mask intermediate is aligned with the unsorted data")
+    if unknown_intermediates := set(intermediates).difference(INTERMEDIATES):
+        raise ValueError(f"Unknown intermediates {sorted(unknown_intermediates)}, expected any of {INTERMEDIATES}")
+
+    measure = _StatisticalMeasure(function_name, function, extra_args, vectorized=vectorized,
+                                  sorted_input=sorted_input, intermediates=intermediates, min_count=min_count)
+    replaced_measure = STATISTICAL_FUNCTIONS.get(function_name)
+    STATISTICAL_FUNCTIONS[function_name] = measure
+    for functions, counterpart in ((VECTORIZED_FUNCTIONS, vectorized), (APPROXIMATE_FUNCTIONS, approximate)):
+        functions.pop(function_name, None)
+        if counterpart is not None:
+            functions[function_name] = counterpart
+    if replaced_measure is not None and _measures_by_function.get(replaced_measure.function) is replaced_measure:
+        # The replaced function is forgotten, unless it is still registered under another name (e.g. q2 of median)
+        del _measures_by_function[replaced_measure.function]
+        for other_measure in STATISTICAL_FUNCTIONS.values():
+            if other_measure.function is replaced_measure.function:
+                _measures_by_function[replaced_measure.function] = other_measure
+                break
+    _measures_by_function[function] = measure
+    if _builtins_registered:
+        _runtime_registrations.pop(function_name, None)
+        _runtime_registrations[function_name] = {
+            "function": function, "extra_args": extra_args, "vectorized": vectorized, "approximate": approximate,
+            "sorted_input": sorted_input, "intermediates": intermediates, "min_count": min_count,
+        }
+    # Worker processes only know the statistics registered before they were started
+    _registry_version += 1
+    return measure
+
+
+def _get_registry_version() -> int:
+    return _registry_version
+
+
+def _get_runtime_registrations() -> Dict[str, dict]:
+    return dict(_runtime_registrations)
+
+
+def _register_worker_statistics(registrations: Dict[str, dict]):
+    # Initializer of the worker processes, given _get_runtime_registrations() of the process that started them
+    for function_name, registration in registrations.items():
+        register_statistic(function_name, **registration, replace=True)
+
+
+def get_statistical_measure(function: Callable) -> Optional[_StatisticalMeasure]:
+    # The registered statistic of a function, if any, e.g. to read its declared arguments
+    try:
+        return _measures_by_function.get(function)
+    except TypeError:
+        # Unhashable callables are never registered
+        return None
+
+
+def _get_approximate_functions() -> Dict[str, Callable]:
+    # Counterparts of the quantile based statistics that read a quantile sketch of the data instead of sorting it
+    # They are used in place of the exact statistics while approximate_quantiles is enabled
+
+    def median(sketch: QuantileSketch) -> Numeric:
+        return sketch.median()
+
+    def q1(sketch: QuantileSketch) -> Numeric:
+        return sketch.quantile(0.25)
+
+    def q3(sketch: QuantileSketch) -> Numeric:
+        return sketch.quantile(0.75)
+
+    def iqr(sketch: QuantileSketch) -> Numeric:
+        return sketch.iqr()
+
+    def upper_outlier(sketch: QuantileSketch, value: Numeric) -> bool:
+        return value > sketch.outlier_fences()[1]
+
+    def lower_outlier(sketch: QuantileSketch, value: Numeric) -> bool:
+        return value < sketch.outlier_fences()[0]
+
+    def outlier(sketch: QuantileSketch, value: Numeric) -> bool:
+        lower_fence, upper_fence = sketch.outlier_fences()
+        return value < lower_fence or value > upper_fence
 
+    q2 = median
 
-# Functions cannot be updated post-runtime
-STATISTICAL_FUNCTIONS = _get_statistical_functions()
+    return dict(locals())
 
 
 def get_base_statistical_function(function_name: str) -> Callable:
     return STATISTICAL_FUNCTIONS[function_name].function
+
+
+# Statistics of a sample, which need at least two values (i.e. divide by the count less one)
+SAMPLE_STATISTICS = ("stdev", "variance", "z_score", "cv", "se")
+# Statistics returning values of the data, which keep the type they have in the column (see the int_mask intermediate)
+VALUE_STATISTICS = ("range", "mode", "median", "q2")
+SUMMARY_STATISTICS = (
+    "count", "min", "max", "range", "mean", "median", "q1", "q2", "q3", "iqr", "mode", "variance", "stdev", "cv", "se"
+)
+
+
+def statistical_summary(data: Data, *, na_action: str = "ignore", outlier_action: str = "keep",
+                        round_dp: Optional[int] = None) -> Dict[str, Numeric | list]:
+    # Every statistic in SUMMARY_STATISTICS from one (stable) sort and one pass of moments
+    # The values are identical to calling each statistical function separately
+    plan = _get_numeric_plan(data)
+    if plan is None:
+        return dict.fromkeys(SUMMARY_STATISTICS, NAN)
+    # Data without any values has no statistics, whichever values would replace them
+    if not len(plan.valid_data) or not len(modified_data := plan.prepare(na_action, outlier_action)):
+        return {**dict.fromkeys(SUMMARY_STATISTICS, NAN), "count": 0}
+    int_mask = plan.intermediate("int_mask", na_action, outlier_action)
+
+    count = len(modified_data)
+    # The moments are summed in the original order of the data, since the order affects the rounding
+    mean = _sequential_sum(modified_data) / count
+    # The sample statistics need at least two values (see SAMPLE_STATISTICS)
+    sample_statistics = dict.fromkeys(("variance", "stdev", "cv", "se"), NAN)
+    if count > 1:
+        stdev = math.sqrt(_sequential_sum(np.float_power(modified_data - mean, 2)) / (count - 1))
+        sample_statistics = {"variance": pow(stdev, 2), "stdev": stdev, "cv": stdev / mean,
+                             "se": stdev / math.sqrt(count)}
+
+    # A stable sort keeps equal values in their original order, so the first value of each run of
+    # equal values is also the first to appear in the data (which is the order modes are listed in)
+    order = np.argsort(modified_data, kind="stable")
+    sorted_data = modified_data[order]
+    q1, q3 = np.percentile(sorted_data, [25, 75])
+    run_starts = np.flatnonzero(np.concatenate(([True], sorted_data[1:] != sorted_data[:-1])))
+    run_lengths = np.diff(np.append(run_starts, count))
+    mode_starts = run_starts[run_lengths == run_lengths.max()]
+    # The first of the smallest and of the largest values, like min() and max()
+    minimum, maximum = _typed_values(modified_data, order[[0, run_starts[-1]]], int_mask)
+
+    summary = {
+        "count": count,
+        "min": minimum,
+        "max": maximum,
+        "range": maximum - minimum,
+        "mean": mean,
+        "median": _ordered_median(modified_data, order, int_mask),
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1,
+        "mode": _typed_values(modified_data, np.sort(order[mode_starts]), int_mask),
+        **sample_statistics,
+    }
+    summary["q2"] = summary["median"]
+    if round_dp is not None:
+        summary = {name: value if type(value) is list else round(value, round_dp) for name, value in summary.items()}
+    return summary
+
+
+def _predicate_fences(data: Data) -> tuple:
+    # Fences of the outlier predicates, estimated from a quantile sketch while approximate_quantiles is enabled
+    # In both modes, the fences of data with missing values are nan (like np.percentile), so no value is an outlier
+    if approximate_quantiles.value:
+        plan = getattr(data, "reformat_plan", None) or _ReformatPlan(data)
+        return (NAN, NAN) if plan.has_missing else plan.quantile_sketch(error=quantile_sketch_error.value).outlier_fences()
+    return _outlier_fences(_as_array(data))
+
+
+def _get_vectorized_functions() -> Dict[str, Callable]:
+    # Counterparts of the functions taking (data, value) that evaluate every value of the data at once
+    # The quartiles, mean and standard deviation are computed once instead of once per value
+
+    def upper_outlier(data: Data) -> np.ndarray:
+        return _as_array(data) > _predicate_fences(data)[1]
+
+    def lower_outlier(data: Data) -> np.ndarray:
+        return _as_array(data) < _predicate_fences(data)[0]
+
+    def outlier(data: Data) -> np.ndarray:
+        lower_fence, upper_fence = _predicate_fences(data)
+        data = _as_array(data)
+        return (data < lower_fence) | (data > upper_fence)
+
+    def z_score(data: Data) -> np.ndarray:
+        data = _as_array(data)
+        return (data - get_base_statistical_function("mean")(data)) / get_base_statistical_function("stdev")(data)
+
+    return dict(locals())
+
+
+def get_vectorized_function(function: Callable) -> Optional[Callable]:
+    # Only the registered statistical functions have vectorized counterparts
+    measure = get_statistical_measure(function)
+    return None if measure is None else measure.vectorized
+
+
+def _get_declared_statistical_functions() -> Dict[str, dict]:
+    # Statistics declared in the same way as custom ones, mapped to their registration arguments
+
+    def percentile(sorted_data: np.ndarray, percent: Numeric) -> Numeric:
+        # Linear interpolation between the closest ranks, like np.percentile
+        if not 0 <= percent <= 100:
+            raise ValueError("The percentile must be between 0 and 100")
+        position = (len(sorted_data) - 1) * percent / 100
+        lower_index = math.floor(position)
+        upper_index = min(lower_index + 1, len(sorted_data) - 1)
+        lower_value, upper_value = sorted_data[lower_index].item(), sorted_data[upper_index].item()
+        return lower_value + (upper_value - lower_value) * (position - lower_index)
+
+    def trimmed_mean(sorted_data: np.ndarray, proportion: Numeric) -> Numeric:
+        # Mean of the data without the given proportion of its smallest and largest values
+        if not 0 <= proportion < 0.5:
+            raise ValueError("The proportion to trim must be at least 0 and less than 0.5")
+        trimmed_count = int(proportion * len(sorted_data))
+        trimmed_data = sorted_data[trimmed_count:len(sorted_data) - trimmed_count]
+        return _sequential_sum(trimmed_data) / len(trimmed_data)
+
+    def geometric_mean(data: np.ndarray, *, count: int) -> Numeric:
+        # Zeros give 0 and negative values give nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return math.exp(_sequential_sum(np.log(data)) / count)
+
+    return {
+        "percentile": {"function": percentile, "extra_args": 1, "sorted_input": True},
+        "trimmed_mean": {"function": trimmed_mean, "extra_args": 1, "sorted_input": True},
+        "geometric_mean": {"function": geometric_mean, "extra_args": 0, "intermediates": ("count",)},
+    }
+
+
+def _register_statistical_functions():
+    vectorized_functions = _get_vectorized_functions()
+    approximate_functions = _get_approximate_functions()
+    for function_name, function in _get_statistical_functions().items():
+        register_statistic(function_name, function, vectorized=vectorized_functions.get(function_name),
+                           approximate=approximate_functions.get(function_name),
+                           intermediates=("int_mask",) if function_name in VALUE_STATISTICS else (),
+                           min_count=2 if function_name in SAMPLE_STATISTICS else 1)
+    for function_name, declaration in _get_declared_statistical_functions().items():
+        register_statistic(function_name, **declaration)
+    global _builtins_registered
+    _builtins_registered = True
+
+
+_register_statistical_functions()
+
+
+CORRELATION_METHODS = ("pearson", "spearman")
+
+
+def _sorted_valid_indexes(data: np.ndarray) -> np.ndarray:
+    # Positions of the values that are not missing, in the (stable) order of their values
+    valid_indexes = np.flatnonzero(~np.isnan(data))
+    return valid_indexes[np.argsort(data[valid_indexes], kind="stable")]
+
+
+def _pairwise_moments(data: np.ndarray) -> tuple:
+    # For every pair of columns (i, j) of the data, using only the rows where both are not missing:
+    # the number of rows, the sum of column i, the sum of squares of column i and the sum of products
+    # Each is one matrix product over all of the columns at once
+    valid = ~np.isnan(data)
+    weights = valid.astype(np.float64)
+    # Columns are centred first so that the sums of squares and products do not lose precision
+    column_counts = weights.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        column_means = np.where(column_counts > 0, np.where(valid, data, 0.0).sum(axis=0) / column_counts, 0.0)
+    centred = np.where(valid, data - column_means, 0.0)
+    return weights.T @ weights, centred.T @ weights, (centred * centred).T @ weights, centred.T @ centred
+
+
+def covariance_matrix(data: np.ndarray) -> np.ndarray:
+    # Sample covariance of every pair of columns (rows × columns, missing values are nan), pairwise-complete
+    counts, sums, squares, products = _pairwise_moments(np.asarray(data, dtype=np.float64))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = (products - sums * sums.T / counts) / (counts - 1)
+    covariance[counts < 2] = np.nan
+    return covariance
+
+
+def _pairwise_rank_moments(data: np.ndarray) -> tuple:
+    # The moments of _pairwise_moments for the ranks of every pair of columns (i, j), where column i is ranked over
+    # just the rows that both have values in
+    # Each column is sorted once. Along its order, the running count of the rows with values in every other column
+    # gives the ranks of its values among those rows, for all of the other columns at once
+    valid = ~np.isnan(data)
+    weights = valid.astype(np.float64)
+    counts = weights.T @ weights
+    ranks = np.zeros((data.shape[1], *data.shape))
+    for i, column in enumerate(data.T):
+        order = _sorted_valid_indexes(column)
+        sorted_data = column[order]
+        group_starts = np.flatnonzero(np.concatenate(([True], sorted_data[1:] != sorted_data[:-1])))
+        group_sizes = np.diff(np.append(group_starts, len(order)))
+        # The number of rows before each group of tied values and within it, per other column
+        shared = np.concatenate((np.zeros((1, data.shape[1])), np.cumsum(weights[order], axis=0)))
+        before = shared[group_starts]
+        within = shared[group_starts + group_sizes] - before
+        # Tied values share the mean of the ranks they span; ranks are centred on the mean rank of each pair's rows
+        group_ranks = before + (within + 1) / 2 - (counts[i] + 1) / 2
+        ranks[i, order] = np.where(valid[order], np.repeat(group_ranks, group_sizes, axis=0), 0.0)
+    sums = ranks.sum(axis=1)
+    squares = (ranks * ranks).sum(axis=1)
+    # The rank of column i among the rows it shares with column j, times that of column j among the same rows
+    products = np.array([(ranks[i] * ranks[:, :, i].T).sum(axis=0) for i in range(data.shape[1])])
+    return counts, sums, squares, products.reshape(counts.shape)
+
+
+def correlation_matrix(data: np.ndarray, method: str = "pearson") -> np.ndarray:
+    # Correlation coefficient of every pair of columns (rows × columns, missing values are nan), pairwise-complete
+    # Spearman's coefficient is Pearson's coefficient of the ranks, which are those of the rows each pair shares
+    data = np.asarray(data, dtype=np.float64)
+    match method:
+        case "pearson":
+            counts, sums, squares, products = _pairwise_moments(data)
+        case "spearman":
+            counts, sums, squares, products = _pairwise_rank_moments(data)
+        case _:
+            raise ValueError(f"Unknown correlation method {method!r}, expected one of {CORRELATION_METHODS}")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deviations = squares - sums * sums / counts
+        correlation = (products - sums * sums.T / counts) / np.sqrt(deviations * deviations.T)
+    correlation[(counts < 2) | ~np.isfinite(correlation)] = np.nan
+    correlation = np.clip(correlation, -1.0, 1.0)
+    # Every column with any variation correlates perfectly with itself
+    np.fill_diagonal(correlation, np.where(np.isnan(np.diag(correlation)), np.nan, 1.0))
+    return correlation
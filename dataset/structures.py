@@ -1,17 +1,29 @@
 __all__ = [
+    "_StatisticCache",
     "_DatasetArrayRow",
     "_DatasetArrayColumnView",
+    "_DatasetColumn",
     "_DatasetArray",
+    "_DateIndex",
+    "_check_date_storage",
     "_Schema",
+    "_StatisticTable",
 ]
 
 import numpy as np
 from abc import ABCMeta, abstractmethod
-from typing import Callable, Any, List, Tuple
+from collections import Counter, OrderedDict
+from threading import Lock
+from typing import Callable, Any, List, Tuple, Optional
 
 from dataset.constants import NAN
-from dataset.functions import _generate_structure_string
-from dataset.statmeasures import STATISTICAL_FUNCTIONS, Numeric
+from dataset.functions import (
+    _fits_dtype, _generate_structure_string, _get_cast_type, _get_missing_mask, _get_storage_dtype, _is_dtype_subtype,
+    _is_missing, _pack_validity, _set_validity_bit, _to_column_storage, _to_column_value, _to_datetime64,
+    _to_storage_array, _to_storage_value, _to_python_list, _to_python_value, _unpack_validity
+)
+from dataset.statmeasures import STATISTICAL_FUNCTIONS, Numeric, _ReformatPlan, statistical_summary
+from dataset.config import approximate_quantiles, quantile_sketch_error, statistic_cache_size
 
 
 class _DatasetStructureABC(metaclass=ABCMeta):
@@ -29,69 +41,205 @@ class _DatasetStructureABC(metaclass=ABCMeta):
         pass
 
 
+class _StatisticCache:
+
+    # Least recently used cache of statistics computed on the columns of a dataset
+    # Entries remember the version of the column they were computed from; a mutated column is never served stale
+
+    def __init__(self):
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        # Columns may be evaluated concurrently (see statistic_executor); the statistics are computed outside the lock
+        self.__lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @staticmethod
+    def _make_key(column_name: str, statistic: str, args: tuple, kwargs: dict) -> tuple:
+        fargs = kwargs.get("fargs", args[0] if args else ())
+        # Exact and approximate quantiles are remembered separately
+        approximation = approximate_quantiles.value and quantile_sketch_error.value
+        # A statistic registered again under the same name is a different measure, so it is never served stale
+        return (column_name, statistic, tuple(fargs), kwargs.get("na_action", "ignore"),
+                kwargs.get("outlier_action", "keep"), kwargs.get("round_dp"), approximation,
+                STATISTICAL_FUNCTIONS.get(statistic))
+
+    @staticmethod
+    def _copy_value(value: Any) -> Any:
+        # Lists (i.e. modes) are copied so that the remembered value cannot be modified by the caller
+        return value[:] if type(value) is list else value
+
+    def lookup(self, column_view: "_DatasetArrayColumnView", statistic: str, args: tuple,
+               kwargs: dict) -> Tuple[bool, Any]:
+        # Returns whether the statistic is remembered for the current version of the column, and its value
+        try:
+            key = self._make_key(column_view.name, statistic, args, kwargs)
+            hash(key)
+        except TypeError:
+            # Unhashable function arguments cannot be remembered
+            return False, None
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] == column_view.version:
+                self.__hits += 1
+                self.__entries.move_to_end(key)
+                return True, self._copy_value(entry[1])
+            self.__misses += 1
+        return False, None
+
+    def store(self, column_view: "_DatasetArrayColumnView", statistic: str, args: tuple, kwargs: dict,
+              value: Any, version: Optional[int] = None):
+        # The version the value was computed from is given when the column could have changed in the meantime
+        try:
+            key = self._make_key(column_view.name, statistic, args, kwargs)
+            hash(key)
+        except TypeError:
+            return
+
+        with self.__lock:
+            self.__entries[key] = (column_view.version if version is None else version, self._copy_value(value))
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > max(statistic_cache_size.value, 0):
+                self.__entries.popitem(last=False)
+
+    def get_statistic(self, column_view: "_DatasetArrayColumnView", statistic: str, args: tuple, kwargs: dict) -> Any:
+        found, value = self.lookup(column_view, statistic, args, kwargs)
+        if not found:
+            version = column_view.version
+            value = STATISTICAL_FUNCTIONS[statistic](column_view, *args, **kwargs)
+            self.store(column_view, statistic, args, kwargs, value, version)
+        return value
+
+    def invalidate(self, column_name: Optional[str] = None):
+        with self.__lock:
+            if column_name is None:
+                self.__entries.clear()
+                return
+            for key in [key for key in self.__entries if key[0] == column_name]:
+                del self.__entries[key]
+
+    def cache_info(self) -> dict:
+        with self.__lock:
+            return {"hits": self.__hits, "misses": self.__misses,
+                    "maxsize": statistic_cache_size.value, "size": len(self.__entries)}
+
+
 class _DatasetArrayRow(_DatasetStructureABC):
 
     # Categorising by row allows entries to be sorted easier and better comparisons
     # However, statistical data is more difficult to obtain
 
-    def __init__(self, data: list, dataset_column_names: List[str]):
-        self.__data = data
+    # Rows are light views produced on demand; the data itself is stored by column
+    # Edits made to a row are made to the columns it is a view of
+
+    def __init__(self, columns: List["_DatasetColumn"], row_index: int, dataset_column_names: List[str]):
+        self.__columns = columns
+        self.__row_index = row_index
         self.__dataset_column_names = dataset_column_names
 
-    def __getitem__(self, index: int) -> Any:
-        return self.__data[index]
+    def __getitem__(self, index: int | slice) -> Any:
+        if type(index) is slice:
+            return [column[self.__row_index] for column in self.__columns[index]]
+        return self.__columns[index][self.__row_index]
+
+    def __iter__(self):
+        return (column[self.__row_index] for column in self.__columns)
 
     def __len__(self) -> int:
-        return len(self.__data)
+        return len(self.__columns)
 
     def __setitem__(self, index: int, value: Any):
-        self.__data[index] = value
+        self.__columns[index][self.__row_index] = value
 
     def __str__(self) -> str:
         return _generate_structure_string([self.__dataset_column_names, list(self)], ["Column", "Value"])
 
     def apply_function(self, function: Callable):
-        self.__data = type(self.__data)(list(map(function, self.__data)))
+        for index in range(len(self.__columns)):
+            self[index] = function(self[index])
 
     def apply_function_at_index(self, function: Callable, index: int):
-        if self.__data[index] is not NAN:
-            self.__data[index] = function(self.__data[index])
+        if not self.__columns[index].is_missing(self.__row_index):
+            self[index] = function(self[index])
 
 
 class _DatasetArrayColumnView(_DatasetStructureABC):
 
-    # Copy of data. Not synonymous with real data; used for presentation purposes
-    # All edits are made to the row data
+    # References the column storage itself (no data is copied), so the view always reflects the real data
+    # All edits are made through the dataset (i.e. Dataset.__setitem__ or the rows)
 
     # Unlike its row counterpart, this class has no __setitem__, hence the inclusion of "view"
 
-    def __init__(self, name: str, data: list, dtype: type):
-        self.__data = data
-        self.__dtype = dtype
-        self.__name = name
+    def __init__(self, column: "_DatasetColumn", statistic_cache: Optional[_StatisticCache] = None):
+        self.__column = column
+        self.__statistic_cache = statistic_cache
+        self.__reformat_plan = None
+        self.__reformat_plan_version = None
+
+    def __getitem__(self, index: int | slice) -> Any:
+        return self.__column[index]
 
-    def __getitem__(self, index: int) -> Any:
-        return self.__data[index]
+    def __iter__(self):
+        return iter(self.__column)
 
     def __len__(self) -> int:
-        return len(self.__data)
+        return len(self.__column)
 
     def __str__(self):
-        return _generate_structure_string([list(self)], [self.__name], index_column=True)
+        return _generate_structure_string([self], [self.name], index_column=True)
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        return self.values if dtype is None else self.values.astype(dtype)
 
     @property
-    def dtype(self):
-        return self.__dtype
+    def dtype(self) -> type:
+        # Stored by the column and re-evaluated when values of another type are assigned or a function is applied
+        return self.__column.dtype
 
     @property
-    def name(self):
-        return self.__name
+    def name(self) -> str:
+        return self.__column.name
+
+    @property
+    def values(self) -> np.ndarray:
+        # Read-only NumPy view of the underlying storage
+        values = self.__column.values.view()
+        values.flags.writeable = False
+        return values
+
+    @property
+    def version(self) -> int:
+        return self.__column.version
+
+    @property
+    def missing_mask(self) -> np.ndarray:
+        return self.__column.missing_mask
+
+    @property
+    def missing_count(self) -> int:
+        return self.__column.missing_count
+
+    @property
+    def reformat_plan(self) -> _ReformatPlan:
+        # Shared by every statistic computed on the column until the column is modified
+        if self.__reformat_plan is None or self.__reformat_plan_version != self.version:
+            self.__reformat_plan_version = self.version
+            self.__reformat_plan = _ReformatPlan(self.values, self.dtype, self.missing_mask)
+        return self.__reformat_plan
 
     def statistic(self, statistic: str, *args: Any, **kwargs) -> Numeric | list | bool:
-        return STATISTICAL_FUNCTIONS[statistic](self.__data, *args, **kwargs)
+        if self.__statistic_cache is None:
+            return STATISTICAL_FUNCTIONS[statistic](self, *args, **kwargs)
+        return self.__statistic_cache.get_statistic(self, statistic, args, kwargs)
 
     def get_statistical_summary(self, statistics_list: list) -> Tuple[list, list]:
-        statistical_values = [self.statistic(statistic.lower()) for statistic in statistics_list]
+        # The summary shares one sort of the data; statistics outside of it are computed separately
+        summary = statistical_summary(self)
+        statistical_values = [summary[statistic.lower()] if statistic.lower() in summary
+                              else self.statistic(statistic.lower()) for statistic in statistics_list]
         statistics_list[statistics_list.index("Mode")] = "Mode(s)"
         return statistics_list, statistical_values
 
@@ -100,22 +248,278 @@ class _DatasetArrayColumnView(_DatasetStructureABC):
                                           cut_data=False)
 
 
-class _DatasetArray:
+class _DatasetColumn:
 
-    def __init__(self, array: list):
-        self.__data = array
+    # Typed storage for one column of the dataset: float64 for measurements (int columns included),
+    # datetime64 for dates and object for anything else. Missing values are stored as nan or NaT
+    # Values are converted back to the column's Python type (dtype) when they are accessed
+    # The data type is the most frequent type of the values, and is evaluated again whenever a value of another type
+    # is assigned. A column with values of other types (e.g. 2.7 assigned to an int column) keeps them all as they are
+    # in object storage, until they all have the data type again
+    # Copies share their storage until either column is written to (copy-on-write)
+
+    def __init__(self, name: str, values: np.ndarray, dtype: type, shared: bool = False,
+                 validity: Optional[np.ndarray] = None):
+        self.__name = name
+        self.__values = values
+        self.__dtype = dtype
+        # Incremented on every mutation so that anything derived from the column knows when it is out of date
+        self.__version = 0
+        self.__shared = shared
+        # Packed bitmask of the values that are not missing, kept up to date by every mutation
+        self.__validity = validity if validity is not None else _pack_validity(~_get_missing_mask(values))
+        # How many values there are of each type, only while some do not have the data type of the column
+        self.__type_counts = None
+        if values.dtype == object and _get_storage_dtype(dtype) != object:
+            self.__type_counts = Counter(type(value) for value in values.tolist() if not _is_missing(value))
 
     def __len__(self) -> int:
-        return len(self.__data)
+        return len(self.__values)
 
-    def __getitem__(self, index: int) -> Any:
-        return self.__data[index]
+    def __getitem__(self, index: int | slice) -> Any:
+        if type(index) is slice:
+            return _to_python_list(self.__values[index], self.__dtype, self.missing_mask[index])
+        if self.is_missing(index):
+            return NAN
+        return _to_python_value(self.__values[index], self.__dtype)
 
     def __setitem__(self, index: int, value: Any):
-        self.__data[index] = value
+        value = _to_column_value(value, self.__dtype)
+        if self.__type_counts is not None:
+            self.__set_mixed_value(index, value)
+            return
+        if not _fits_dtype(value, self.__dtype):
+            # e.g. 2.7 assigned to an int column, or a string to a date column
+            self.__set_column_storage(self.__assigned_values(index, [value]))
+            return
+        self.__own_values()
+        self.__values[index] = _to_storage_value(value, self.__dtype)
+        _set_validity_bit(self.__validity, index % len(self), not _is_missing(value))
+        self.__version += 1
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __assigned_values(self, index: int | slice, values: list) -> list:
+        data = self.tolist()
+        data[index if type(index) is slice else slice(index % len(self), index % len(self) + 1)] = values
+        return data
+
+    def __set_column_storage(self, data: list):
+        # The data type is evaluated again, and values that do not fit it are kept in object storage (see dtype)
+        self.__values, self.__dtype = _to_column_storage(data)
+        self.__validity = _pack_validity(~_get_missing_mask(self.__values))
+        self.__type_counts = None
+        if not all(_fits_dtype(value, self.__dtype) for value in data):
+            self.__type_counts = Counter(type(value) for value in data if not _is_missing(value))
+        self.__shared = False
+        self.__version += 1
+
+    def __set_mixed_value(self, index: int, value: Any):
+        # The counts of the types are updated instead of counting every value again
+        index %= len(self)
+        self.__own_values()
+        if not _is_missing(previous_value := self.__values[index]):
+            self.__type_counts[type(previous_value)] -= 1
+        if not _is_missing(value):
+            self.__type_counts[type(value)] += 1
+        self.__type_counts = +self.__type_counts
+        self.__values[index] = NAN if _is_missing(value) else value
+        _set_validity_bit(self.__validity, index, not _is_missing(value))
+        self.__version += 1
+        most_common_types = self.__type_counts.most_common(2)
+        if len(most_common_types) == 2 and most_common_types[0][1] == most_common_types[1][1]:
+            # Ties are resolved in favour of the data type that appears first (see _get_cast_type)
+            self.__dtype = _get_cast_type(self.__values.tolist())
+        elif most_common_types:
+            self.__dtype = most_common_types[0][0]
+        if all(_is_dtype_subtype(value_type, self.__dtype) for value_type in self.__type_counts):
+            # Every value has the data type again, so the column goes back to its typed storage
+            self.__set_column_storage(self.tolist())
+
+    def __own_values(self):
+        # Storage shared with another column is copied before it is modified in place
+        if self.__shared:
+            self.__values = self.__values.copy()
+            self.__validity = self.__validity.copy()
+            self.__shared = False
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.__values
+
+    @property
+    def dtype(self) -> type:
+        return self.__dtype
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
+    @property
+    def validity(self) -> np.ndarray:
+        return self.__validity
+
+    @property
+    def missing_mask(self) -> np.ndarray:
+        return ~_unpack_validity(self.__validity, len(self))
+
+    @property
+    def missing_count(self) -> int:
+        return len(self) - self.valid_count
+
+    @property
+    def valid_count(self) -> int:
+        # The padding bits of the last byte are never set
+        return int(np.unpackbits(self.__validity).sum())
+
+    def is_missing(self, index: int) -> bool:
+        index %= len(self)
+        return not self.__validity[index >> 3] & (1 << (index & 7))
+
+    def tolist(self, remove_missing: bool = False) -> list:
+        missing_mask = self.missing_mask
+        if remove_missing:
+            return _to_python_list(self.__values[~missing_mask], self.__dtype, missing_mask[~missing_mask])
+        return _to_python_list(self.__values, self.__dtype, missing_mask)
+
+    def take(self, rows: slice | np.ndarray) -> "_DatasetColumn":
+        # A column of only the given rows; a slice of rows shares the storage (copy-on-write), other selections copy it
+        validity = _pack_validity(~self.missing_mask[rows])
+        if type(rows) is slice:
+            self.__shared = True
+            return _DatasetColumn(self.__name, self.__values[rows], self.__dtype, shared=True, validity=validity)
+        return _DatasetColumn(self.__name, self.__values[rows], self.__dtype, validity=validity)
+
+    def copy(self) -> "_DatasetColumn":
+        # Both columns share the current storage until one of them modifies it
+        self.__shared = True
+        return _DatasetColumn(self.__name, self.__values, self.__dtype, shared=True, validity=self.__validity)
+
+    def set_values(self, values: Any):
+        # Like assigning to each row in turn, a shorter sequence only replaces the first values of the column
+        data = [_to_column_value(value, self.__dtype) for value in values]
+        if self.__type_counts is not None or not all(_fits_dtype(value, self.__dtype) for value in data):
+            self.__set_column_storage(self.__assigned_values(slice(0, len(data)), data))
+            return
+        self.__own_values()
+        self.__values[:len(data)] = _to_storage_array(data, self.__dtype)
+        self.__validity = _pack_validity(~_get_missing_mask(self.__values))
+        self.__version += 1
+
+    def set_storage(self, values: np.ndarray, dtype: type):
+        # Replaces the whole column with values that were already converted to its storage (e.g. parsed dates)
+        self.__dtype = dtype
+        self.__values = values
+        self.__validity = _pack_validity(~_get_missing_mask(values))
+        self.__shared = False
+        self.__version += 1
+
+    def apply_function(self, function: Callable):
+        # Missing values are skipped; the data type of the column is re-evaluated from the results
+        data = self.tolist()
+        for index in np.flatnonzero(~self.missing_mask).tolist():
+            data[index] = function(data[index])
+        self.__set_column_storage(data)
+
+
+class _DatasetArray:
+
+    def __init__(self, columns: List[_DatasetColumn]):
+        self.__columns = columns
+        self.__column_names = [column.name for column in columns]
+
+    def __len__(self) -> int:
+        return len(self.__columns[0]) if self.__columns else 0
+
+    def __getitem__(self, index: int) -> _DatasetArrayRow:
+        length = len(self)
+        if not -length <= index < length:
+            raise IndexError("Dataset row index out of range")
+        return _DatasetArrayRow(self.__columns, index % length, self.__column_names)
 
     def __iter__(self):
-        return iter(self.__data)
+        return (_DatasetArrayRow(self.__columns, index, self.__column_names) for index in range(len(self)))
+
+    @property
+    def columns(self) -> List[_DatasetColumn]:
+        return self.__columns
+
+    def column(self, index: int) -> _DatasetColumn:
+        return self.__columns[index]
+
+
+def _check_date_storage(column: _DatasetColumn):
+    # Dates are only looked up in columns of dates, not in columns that values of other types were assigned to
+    if column.values.dtype.kind != "M":
+        raise TypeError(f"The column {column.name!r} has values that are not dates")
+
+
+class _DateIndex:
+
+    # The rows of a date column sorted by date, so that dates are looked up with a binary search
+    # Rows without a date are left out. The index is rebuilt whenever the column has changed since it was built
+
+    def __init__(self, column: _DatasetColumn):
+        self.__column = column
+        self.__build()
+
+    def __len__(self) -> int:
+        return len(self.__sorted_index()[0])
+
+    def __build(self):
+        _check_date_storage(self.__column)
+        rows = np.flatnonzero(~self.__column.missing_mask)
+        self.__rows = rows[np.argsort(self.__column.values[rows], kind="stable")]
+        self.__dates = self.__column.values[self.__rows]
+        # If the dates are already in row order, a range of dates is a range of rows
+        self.__in_row_order = len(self.__rows) == len(self.__column) and \
+            bool(np.all(self.__rows == np.arange(len(self.__rows))))
+        self.__version = self.__column.version
+
+    def __sorted_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self.__version != self.__column.version:
+            self.__build()
+        return self.__dates, self.__rows
+
+    @property
+    def in_row_order(self) -> bool:
+        self.__sorted_index()
+        return self.__in_row_order
+
+    def sorted_rows(self) -> Tuple[np.ndarray, np.ndarray]:
+        # The sorted dates and the row each of them belongs to
+        return self.__sorted_index()
+
+    def between(self, start: Any, end: Any) -> slice | np.ndarray:
+        # Rows dated from start to end (both inclusive), in date order
+        dates, rows = self.__sorted_index()
+        lower = int(np.searchsorted(dates, _to_datetime64(start), side="left"))
+        upper = int(np.searchsorted(dates, _to_datetime64(end), side="right"))
+        if self.__in_row_order:
+            return slice(lower, max(lower, upper))
+        return rows[lower:upper]
+
+    def asof(self, date: Any) -> Optional[int]:
+        # Row of the latest measurement made on or before the date
+        dates, rows = self.__sorted_index()
+        position = int(np.searchsorted(dates, _to_datetime64(date), side="right")) - 1
+        return int(rows[position]) if position >= 0 else None
+
+    def nearest(self, date: Any) -> Optional[int]:
+        # Row of the measurement closest to the date; the earlier one is chosen when two are as close
+        dates, rows = self.__sorted_index()
+        if not len(dates):
+            return None
+        date = _to_datetime64(date)
+        position = int(np.searchsorted(dates, date, side="left"))
+        if position == len(dates) or (position > 0 and date - dates[position - 1] <= dates[position] - date):
+            position -= 1
+        return int(rows[position])
 
 
 class _Schema:
@@ -129,6 +533,39 @@ class _Schema:
     def __str__(self) -> str:
         return _generate_structure_string([list(self.__data), list(self.__data.values())], ["Column", "Description"])
 
+    def to_dict(self) -> dict:
+        return dict(self.__data)
+
+
+class _StatisticTable:
+
+    # Tidy table of results: one row per observation (e.g. a statistic of a column), stored by column
+
+    def __init__(self, headings: List[str], columns: List[list]):
+        self.__headings = headings
+        self.__columns = columns
+
+    def __len__(self) -> int:
+        return len(self.__columns[0]) if self.__columns else 0
+
+    def __getitem__(self, heading: str) -> list:
+        return self.__columns[self.__headings.index(heading)]
+
+    def __str__(self) -> str:
+        return _generate_structure_string(self.__columns, self.__headings, cut_data=False)
+
+    @property
+    def headings(self) -> List[str]:
+        return self.__headings
+
+    @property
+    def columns(self) -> List[list]:
+        return self.__columns
+
+    def to_columns(self) -> List[list]:
+        # Each column headed by its heading, as write_columns_to_worksheet takes them
+        return [[heading, *column] for heading, column in zip(self.__headings, self.__columns)]
+
 
 if __name__ == "__main__":
     # # col1 = _DatasetArrayColumnView(list(range(31))) # Sufficient values
@@ -147,6 +584,6 @@ if __name__ == "__main__":
     # d = _Schema({"a": "b", "c": "d", "g": "h"})
     # print(d)
 
-    dr = _DatasetArrayColumnView("Integers", [1, 2, 3, 68, np.nan], int)
+    dr = _DatasetArrayColumnView(_DatasetColumn("Integers", _to_storage_array([1, 2, 3, 68, np.nan], int), int))
     # print(dr)
     print(dr.statistic("mean", na_action="average", outlier_action="average", round_dp=False))
@@ -0,0 +1,185 @@
+__all__ = [
+    "RESAMPLE_FREQUENCIES",
+    "ROLLING_STATISTICS",
+    "_get_bucket_bounds",
+    "_get_window_starts",
+    "_rolling_statistic",
+]
+
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import timedelta
+from typing import Tuple
+
+import numpy as np
+
+RESAMPLE_FREQUENCIES = ("monthly", "seasonal", "yearly")
+# Statistics that are updated incrementally as the window slides; no other statistic can be rolled
+ROLLING_STATISTICS = ("mean", "variance", "stdev", "se", "cv", "range", "median", "q1", "q2", "q3", "iqr")
+# The fractions of the window's values below the quantiles each quantile statistic is interpolated from
+ROLLING_QUANTILES = {"median": (0.5,), "q2": (0.5,), "q1": (0.25,), "q3": (0.75,), "iqr": (0.25, 0.75)}
+# Windows whose sum of squared deviations is within this many times the rounding error of the prefix sums are summed
+# again from their own values, at most this many values at a time
+RECOMPUTE_TOLERANCE = 1024
+RECOMPUTE_CHUNK_SIZE = 1 << 16
+
+
+def _get_bucket_keys(dates: np.ndarray, frequency: str) -> np.ndarray:
+    # The first month of the bucket each date belongs to
+    months = dates.astype("datetime64[M]")
+    match frequency:
+        case "monthly":
+            return months
+        case "seasonal":
+            # Seasons run from December to February, March to May, June to August and September to November
+            return ((months.astype(np.int64) + 1) // 3 * 3 - 1).astype("datetime64[M]")
+        case "yearly":
+            return dates.astype("datetime64[Y]").astype("datetime64[M]")
+    raise ValueError(f"Unknown frequency {frequency!r}, expected one of {RESAMPLE_FREQUENCIES}")
+
+
+def _get_bucket_bounds(sorted_dates: np.ndarray, frequency: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # The start date of every bucket and the positions [start, stop) of its dates within the sorted dates
+    if not len(sorted_dates):
+        empty_positions = np.zeros(0, dtype=np.int64)
+        return np.zeros(0, dtype="datetime64[us]"), empty_positions, empty_positions
+    keys = _get_bucket_keys(sorted_dates, frequency)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    stops = np.append(starts[1:], len(keys))
+    return keys[starts].astype("datetime64[us]"), starts, stops
+
+
+def _get_window_starts(sorted_dates: np.ndarray, window: timedelta) -> np.ndarray:
+    # Each window ends at (and includes) a measurement and reaches back over the window: (date - window, date]
+    return np.searchsorted(sorted_dates, sorted_dates - np.timedelta64(window), side="right")
+
+
+def _window_moments(values: np.ndarray, starts: np.ndarray,
+                    stops: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # The count, mean and sum of squared deviations of each window [start, stop), summed from its own values
+    # Every window holds at least its last value, so no window is empty
+    lengths = stops - starts
+    offsets = np.cumsum(lengths) - lengths
+    window_values = values[np.arange(lengths.sum()) + np.repeat(starts - offsets, lengths)]
+    valid = ~np.isnan(window_values)
+    counts = np.add.reduceat(valid.astype(np.int64), offsets)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.add.reduceat(np.where(valid, window_values, 0.0), offsets) / counts
+        # Deviations from each window's own mean, corrected by the rounding error left in the mean
+        deviations = np.where(valid, window_values - np.repeat(means, lengths), 0.0)
+        sums = np.add.reduceat(deviations, offsets)
+        return counts, means + sums / counts, np.add.reduceat(deviations * deviations, offsets) - sums * sums / counts
+
+
+def _rolling_moments(values: np.ndarray, starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # The count, mean and sum of squared deviations of every window
+    # Prefix sums give those of any window with a subtraction each
+    valid = ~np.isnan(values)
+    # Values are centred first so that the sums of squares do not lose precision to a large mean
+    centre = values[valid].mean() if valid.any() else 0.0
+    centred = np.where(valid, values - centre, 0.0)
+    stops = np.arange(1, len(values) + 1)
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    sums = np.concatenate(([0.0], np.cumsum(centred)))
+    squares = np.concatenate(([0.0], np.cumsum(centred * centred)))
+    window_counts, window_sums = counts[stops] - counts[starts], sums[stops] - sums[starts]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = centre + window_sums / window_counts
+        deviations = squares[stops] - squares[starts] - window_sums * window_sums / window_counts
+    # The rounding error of a prefix sum grows with its size and the number of values summed, so a window with little
+    # variation after many values (or of equal values) loses its deviations to it. Those windows are summed again
+    tolerance = RECOMPUTE_TOLERANCE * np.finfo(np.float64).eps * len(values) * squares[stops]
+    imprecise = np.flatnonzero(deviations <= tolerance)
+    chunk_numbers = np.cumsum(stops[imprecise] - starts[imprecise]) // RECOMPUTE_CHUNK_SIZE
+    for windows in np.split(imprecise, np.flatnonzero(np.diff(chunk_numbers)) + 1):
+        if len(windows):
+            window_counts[windows], means[windows], deviations[windows] = \
+                _window_moments(values, starts[windows], stops[windows])
+    return window_counts, means, deviations
+
+
+def _rolling_range(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    # Monotonic queues of the positions of candidate maxima and minima; each position enters and leaves them once
+    data = values.tolist()
+    maxima, minima = deque(), deque()
+    result = np.full(len(data), np.nan)
+    for stop, (start, value) in enumerate(zip(starts.tolist(), data)):
+        if value == value:
+            while maxima and data[maxima[-1]] <= value:
+                maxima.pop()
+            while minima and data[minima[-1]] >= value:
+                minima.pop()
+            maxima.append(stop)
+            minima.append(stop)
+        while maxima and maxima[0] < start:
+            maxima.popleft()
+        while minima and minima[0] < start:
+            minima.popleft()
+        if maxima:
+            result[stop] = data[maxima[0]] - data[minima[0]]
+    return result
+
+
+def _interpolate(lower: np.ndarray, upper: np.ndarray, fractions: np.ndarray) -> np.ndarray:
+    # Linear interpolation between the values either side of a quantile, rounded the way np.percentile rounds it
+    differences = upper - lower
+    return np.where(fractions >= 0.5, upper - differences * (1 - fractions), lower + differences * fractions)
+
+
+def _rolling_quantiles(values: np.ndarray, starts: np.ndarray, statistic: str) -> np.ndarray:
+    # A sorted list of the window's values, into which each value is inserted as the window reaches it and from
+    # which it is removed as the window leaves it, so no window is sorted from scratch
+    data = values.tolist()
+    quantiles = ROLLING_QUANTILES[statistic]
+    window = []
+    # The values either side of each quantile of every window and the fraction of the way between them
+    bounds = np.full((len(quantiles), 3, len(data)), np.nan)
+    start = 0
+    for stop, (window_start, value) in enumerate(zip(starts.tolist(), data)):
+        if value == value:
+            insort(window, value)
+        for leaving_value in data[start:window_start]:
+            if leaving_value == leaving_value:
+                del window[bisect_left(window, leaving_value)]
+        start = window_start
+        if count := len(window):
+            for index, quantile in enumerate(quantiles):
+                position = quantile * (count - 1)
+                lower = int(position)
+                upper = lower + 1 if position > lower else lower
+                bounds[index, :, stop] = window[lower], window[upper], position - lower
+
+    if statistic in ("median", "q2"):
+        # Like the median statistic, the middle value or the mean of the two middle values
+        return (bounds[0, 0] + bounds[0, 1]) / 2
+    results = [_interpolate(*quantile_bounds) for quantile_bounds in bounds]
+    return results[1] - results[0] if statistic == "iqr" else results[0]
+
+
+def _rolling_statistic(values: np.ndarray, starts: np.ndarray, statistic: str) -> np.ndarray:
+    # The statistic (one of ROLLING_STATISTICS) of every window of the (date sorted) values
+    # Windows without enough values for the statistic are nan
+    if statistic not in ROLLING_STATISTICS:
+        raise ValueError(f"The statistic {statistic!r} cannot be rolled, expected one of {ROLLING_STATISTICS}")
+    if statistic == "range":
+        return _rolling_range(values, starts)
+    if statistic in ROLLING_QUANTILES:
+        return _rolling_quantiles(values, starts, statistic)
+
+    counts, mean, deviations = _rolling_moments(values, starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # The sample variance, like stdev
+        variance = deviations / (counts - 1)
+        variance[counts < 2] = np.nan
+        stdev = np.sqrt(variance)
+        match statistic:
+            case "mean":
+                return mean
+            case "variance":
+                return variance
+            case "stdev":
+                return stdev
+            case "se":
+                return stdev / np.sqrt(counts)
+            case "cv":
+                return stdev / mean
@@ -8,30 +8,43 @@ from dataset.constants import EXCEL_FILE_NAME, FOLDER_DIRECTORY
 from dataset.config import Configurable as WorkbookSelector
 from dataset.datasetclass import Dataset
 from dataset.statmeasures import Numeric
-from dataset.export import write_dataset_to_worksheet, write_columns_to_worksheet
+from dataset.export import (
+    write_dataset_to_worksheet, write_dataset_to_file, write_columns_to_worksheet,
+    write_dataset_to_csv, write_columns_to_csv, write_dataset_to_columnar, write_columns_to_columnar,
+)
 from ui.selector import Selector, SelectionDisplay
 from ui.plotting import get_valid_plot_type, plot_data, plot_compared_data
 from ui.functions import (
     create_new_directory,
-    get_valid_filename_input, get_workbook_mapping, label_workbooks, get_valid_worksheet_name,
+    get_valid_filename_input, get_saved_workbook_names, get_saved_workbook, get_workbook_name, label_workbooks,
+    get_valid_worksheet_name, save_workbook_in_background, wait_for_workbook_save, wait_for_all_saves,
+    collect_finished_saves,
     get_formatted_statistical_function_list, get_statistical_measure_of_region, get_user_decision,
     get_valid_column_name, get_valid_row_number, get_dataset_or_stat_kwargs, valid_column_name,
 )
 
-os.chdir(FOLDER_DIRECTORY)
-dataset = Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality")
 unsaved_workbooks = {}
 
-FIRST_COLUMN = dataset.column_names[0]
-
 
 def get_all_current_workbook_names() -> list:
-    # Both unsaved_workbooks and get_workbook_mapping are variable
-    return list(unsaved_workbooks) + list(get_workbook_mapping())
+    # Both unsaved_workbooks and the saved workbooks are variable
+    return list(unsaved_workbooks) + get_saved_workbook_names()
+
+
+def report_finished_saves():
+    # Workbooks are saved in the background; how each save went is reported the next time a menu is shown
+    for workbook_name, workbook, error in collect_finished_saves():
+        if error is None:
+            if unsaved_workbooks.get(workbook_name) is workbook:
+                del unsaved_workbooks[workbook_name]
+            print(f"Saved workbook {workbook_name!r}.")
+        else:
+            print(f"Could not save workbook {workbook_name!r} ({error}). It is still unsaved.")
 
 
 def spreadsheet_menu():
     while 1:
+        report_finished_saves()
         match workbook_options.run():
             case 1:
                 if not os.path.exists("workbooks"):
@@ -48,15 +61,15 @@ def spreadsheet_menu():
                               f"since there is no other selected workbook.")
                         current_workbook.register_value(workbook)
             case 2:
-                for workbook_name, workbook in (get_workbook_mapping() | unsaved_workbooks).items():
-                    if workbook == current_workbook.value:
-                        print(repr(workbook_name), "is currently the selected workbook.")
-                        break
+                if (workbook_name := get_workbook_name(current_workbook.value, unsaved_workbooks)) is not None:
+                    print(repr(workbook_name), "is currently the selected workbook.")
                 else:
                     print("No workbook is currently selected.")
+                # A save that finished while the menu was shown must not leave its workbook listed as unsaved as well
+                report_finished_saves()
                 all_current_workbook_names = get_all_current_workbook_names()
                 if all_current_workbook_names:
-                    labelled_workbooks = label_workbooks(unsaved_workbooks, get_workbook_mapping())
+                    labelled_workbooks = label_workbooks(unsaved_workbooks, get_saved_workbook_names())
                     formatted_labelled_workbooks = [
                         workbook_name + " " + status for workbook_name, status in labelled_workbooks
                     ]
@@ -64,17 +77,18 @@ def spreadsheet_menu():
                     user_input = workbook_selector.run()
                     if type(user_input) is int:
                         selected_workbook_index = user_input - 1
-                        selected_workbook_name = labelled_workbooks[selected_workbook_index][0]
-                        for workbook_name, workbook in (get_workbook_mapping() | unsaved_workbooks).items():
-                            if workbook_name == selected_workbook_name:
-                                current_workbook.register_value(workbook)
-                                print(f"The current workbook is now {workbook_name!r}.")
-                                break
+                        selected_workbook_name, status = labelled_workbooks[selected_workbook_index]
+                        # Only the selected workbook is loaded (if it is saved and has not been loaded already)
+                        workbook = unsaved_workbooks[selected_workbook_name] if status == "(Unsaved)" \
+                            else get_saved_workbook(selected_workbook_name)
+                        current_workbook.register_value(workbook)
+                        print(f"The current workbook is now {selected_workbook_name!r}.")
                 else:
                     print("There are no existing workbooks. Create a new one.")
             case 3:
                 workbook: Workbook = current_workbook.value
                 if workbook is not None:
+                    wait_for_workbook_save(workbook)
                     new_sheet_name = get_valid_worksheet_name(existing_sheetnames=workbook.sheetnames)
                     workbook.create_sheet(new_sheet_name)
                     # assert workbook.active.title == new_sheet_name
@@ -87,14 +101,9 @@ def spreadsheet_menu():
                     # current_worksheet.register_value()
                     worksheet_selector = Selector(workbook.sheetnames)
                     if (selected_worksheet := worksheet_selector.run()) is not None:
+                        wait_for_workbook_save(workbook)
                         workbook.active = selected_worksheet
-                        for workbook_name, wb in (get_workbook_mapping() | unsaved_workbooks).items():
-                            if wb == current_workbook.value:
-                                current_workbook_name = workbook_name
-                                break
-                        else:
-                            # Should never happen; line implemented to make PyCharm happy
-                            current_workbook_name = None
+                        current_workbook_name = get_workbook_name(workbook, unsaved_workbooks)
                         print(repr(selected_worksheet), f"is the active worksheet for {current_workbook_name!r}.")
                 elif workbook is None:
                     print("You have not selected any workbook. Select a workbook before selecting a worksheet")
@@ -102,10 +111,8 @@ def spreadsheet_menu():
                     # This line should never be executed, right? (sheet created by default)
                     print("You have not created any worksheets. Create a new worksheet before selecting one.")
             case 5:
-                for workbook_name, workbook in (get_workbook_mapping() | unsaved_workbooks).items():
-                    if workbook == current_workbook.value:
-                        print(repr(workbook_name))
-                        break
+                if (workbook_name := get_workbook_name(current_workbook.value, unsaved_workbooks)) is not None:
+                    print(repr(workbook_name))
                 else:
                     print("No workbook is currently selected.")
             case 6:
@@ -115,6 +122,7 @@ def spreadsheet_menu():
                     print("No worksheet is currently selected because no workbook is currently selected.")
             case 7:
                 if current_workbook.value is not None:
+                    wait_for_workbook_save(current_workbook.value)
                     old_worksheet_name = current_workbook.value.active.title
                     new_worksheet_name = get_valid_worksheet_name(existing_sheetnames=current_workbook.value.sheetnames)
                     current_workbook.value.active.title = new_worksheet_name
@@ -137,7 +145,12 @@ def data_console_menu():
                     print(dataset[row_number])
             case 3:
                 print()
-                print(dataset)
+                # One screen at a time; later pages are only formatted if they are asked for
+                for page_number, page in enumerate(dataset.pages()):
+                    if page_number:
+                        if input("Press enter for the next page or type 'q' to stop: ").strip().lower() == "q":
+                            break
+                    print(page)
             case 4:
                 statistical_measures_submenu()
             case 5:
@@ -229,12 +242,30 @@ def data_plotting_menu():
                 return
 
 
+def get_export_file_path() -> Optional[Tuple[str, int]]:
+    # CSV and columnar files are written to the exports folder; returns the path and the selected format
+    file_format = export_format_selector.run()
+    if type(file_format) is not int:
+        return None
+    if not os.path.exists("exports"):
+        create_new_directory("exports")
+    existing_filenames = [os.path.splitext(filename)[0] for filename in os.listdir("exports")]
+    filename = get_valid_filename_input(existing_filenames=existing_filenames)
+    if type(filename) is not str:
+        return None
+    extension = ".csv" if file_format == 1 else ".npz"
+    return os.path.join("exports", f"{filename}{extension}"), file_format
+
+
 def export_data_menu():
-    if current_workbook.value is None:
+    selection = export_data_selector.run()
+    if current_workbook.value is None and selection in (1, 2):
         print("Select a workbook or create a new workbook using the 'Modify Excel files' menu "
               "before using this menu.")
         return
-    match export_data_selector.run():
+    # The selected workbook may still be being saved in the background
+    wait_for_workbook_save(current_workbook.value)
+    match selection:
         case 1:
             enter_kwargs = get_user_decision(
                 "Would you like to specify the parameters for the statistics? Type 'y' for yes and 'n' for no "
@@ -264,11 +295,57 @@ def export_data_menu():
             if num_to_save == 0:
                 print("No workbooks to save.")
                 return
-            workbooks_to_save = unsaved_workbooks.copy()
-            for workbook_name, workbook in workbooks_to_save.items():
-                workbook.save(os.path.join("workbooks", f"{workbook_name}.xlsx"))
-                del unsaved_workbooks[workbook_name]
-            print(f"Successfully saved {num_to_save} workbook(s).")
+            # Saved workbooks are removed from unsaved_workbooks when their saves are reported
+            for workbook_name, workbook in unsaved_workbooks.items():
+                save_workbook_in_background(workbook_name, workbook, os.path.join("workbooks", f"{workbook_name}.xlsx"))
+            print(f"Saving {num_to_save} workbook(s) in the background.")
+        case 4:
+            # Large datasets are streamed straight to a file instead of being held in a workbook until saved
+            if not os.path.exists("workbooks"):
+                create_new_directory("workbooks")
+            workbook_name = get_valid_filename_input(existing_filenames=get_all_current_workbook_names())
+            if type(workbook_name) is not str:
+                return
+            enter_kwargs = get_user_decision(
+                "Would you like to specify the parameters for the statistics? Type 'y' for yes and 'n' for no "
+                "(if no, the default options will be used): ",
+                "Please re-enter either 'y' or 'n'"
+            )
+            kwargs = get_dataset_or_stat_kwargs() if enter_kwargs else {}
+            write_dataset_to_file(os.path.join("workbooks", f"{workbook_name}.xlsx"), dataset.reformat(**kwargs))
+            print(f"Wrote data from the modified dataset to the new file {workbook_name!r}.")
+        case 5:
+            if (export_file := get_export_file_path()) is None:
+                return
+            file_path, file_format = export_file
+            enter_kwargs = get_user_decision(
+                "Would you like to specify the parameters for the statistics? Type 'y' for yes and 'n' for no "
+                "(if no, the default options will be used): ",
+                "Please re-enter either 'y' or 'n'"
+            )
+            kwargs = get_dataset_or_stat_kwargs() if enter_kwargs else {}
+            write_dataset = write_dataset_to_csv if file_format == 1 else write_dataset_to_columnar
+            write_dataset(file_path, dataset.reformat(**kwargs))
+            print(f"Wrote data from the modified dataset to {file_path!r}.")
+        case 6:
+            stat_index = statistical_measure_selector.run()
+            if type(stat_index) is int:
+                statistic = get_formatted_statistical_function_list()[stat_index - 1].lower()
+            else:
+                return
+            if (export_file := get_export_file_path()) is None:
+                return
+            file_path, file_format = export_file
+            enter_kwargs = get_user_decision(
+                "Would you like to specify the parameters for the statistics? Type 'y' for yes and 'n' for no "
+                "(if no, the default options will be used): ",
+                "Please re-enter either 'y' or 'n'"
+            )
+            kwargs = get_dataset_or_stat_kwargs() if enter_kwargs else {}
+            column_names, statistical_data = dataset.statistic(statistic, **kwargs)
+            write_columns = write_columns_to_csv if file_format == 1 else write_columns_to_columnar
+            write_columns(file_path, [column_names, statistical_data], ["Column", statistic])
+            print(f"Wrote {statistic} data to {file_path!r}.")
 
         case _:
             return
@@ -279,12 +356,19 @@ def quit_program_menu():
     if unsaved_workbooks:
         message += "You have unsaved workbooks; the data in them will be lost if you do not save them. "
     if get_user_decision(message, "Please confirm whether you would like to exit the program or not."):
+        # Workbooks that are still being saved are finished first
+        wait_for_all_saves()
+        report_finished_saves()
         sys.exit()
     else:
         return
 
 
 if __name__ == "__main__":
+    # The dataset is only loaded here, since worker processes of the statistic executor may import this module again
+    os.chdir(FOLDER_DIRECTORY)
+    dataset = Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality")
+    FIRST_COLUMN = dataset.column_names[0]
     current_workbook = WorkbookSelector(name="selected_workbook", value=None)
     workbook_options = Selector([
         "Create new workbook",
@@ -313,6 +397,13 @@ if __name__ == "__main__":
         "Export a modified Dataset to a spreadsheet",
         "Export a dataset statistic to a spreadsheet",
         "Save all files",
+        "Export a modified Dataset straight to a new spreadsheet file",
+        "Export a modified Dataset to a CSV or columnar file",
+        "Export a dataset statistic to a CSV or columnar file",
+    ])
+    export_format_selector = Selector([
+        "CSV (.csv)",
+        "Columnar NumPy arrays (.npz)",
     ])
     statistical_measure_selector = Selector(get_formatted_statistical_function_list())
     main_menu_selection = Selector({"Modify Excel files": spreadsheet_menu,
@@ -322,4 +413,5 @@ if __name__ == "__main__":
                                     "Quit the program": quit_program_menu})
     print("NOTE: Pressing enter will almost always take you to the previous menu.")
     while main_menu_selection.running:
+        report_finished_saves()
         main_menu_selection.run()
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from dataset.constants import EXCEL_FILE_NAME, NAN
+from dataset.datasetclass import Dataset
+
+INT_COLUMN = "Chl a, µg/L"
+
+
+@pytest.fixture
+def dataset() -> Dataset:
+    return Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality", use_cache=False)
+
+
+def test_float_assigned_to_an_int_cell_is_kept(dataset: Dataset):
+    column_index = dataset.column_names.index(INT_COLUMN)
+    values = list(dataset[INT_COLUMN])
+    dataset[0][column_index] = 2.7
+    assert dataset[0][column_index] == 2.7
+    # The other values keep their type, and so does the column (ints are still the most frequent)
+    assert dataset[INT_COLUMN][1:] == values[1:] and type(dataset[INT_COLUMN][1]) is int
+    assert dataset.get_column_dtype(INT_COLUMN) == "int"
+    assert dataset[INT_COLUMN].statistic("mean") == pytest.approx(
+        sum(value for value in [2.7, *values[1:]] if value == value) / (len(values) - values.count(NAN)))
+    # Once every value is an int again, so is the storage
+    dataset[0][column_index] = 3
+    assert dataset[INT_COLUMN].values.dtype.kind == "f" and dataset[0][column_index] == 3
+
+
+def test_floats_assigned_to_an_int_column_are_kept(dataset: Dataset):
+    values = list(dataset[INT_COLUMN])
+    values[-1] = 9.9
+    dataset[INT_COLUMN] = values
+    assert dataset[INT_COLUMN][-1] == 9.9 and type(dataset[INT_COLUMN][0]) is int
+    dataset[INT_COLUMN] = [1.5] * len(values)
+    assert dataset.get_column_dtype(INT_COLUMN) == "float"
+
+
+def test_values_assigned_to_the_date_column(dataset: Dataset):
+    dataset[0][0] = "21.07.09"
+    assert dataset[0][0] == datetime(2009, 7, 21)
+    assert dataset.between("2009-07-21", "2009-07-21")[0][0] == datetime(2009, 7, 21)
+    dataset[0][0] = 5
+    assert dataset[0][0] == 5 and dataset.get_column_dtype("Date") == "datetime"
+    with pytest.raises(TypeError, match="Date"):
+        dataset.between("2009-01-01", "2010-01-01")
+
+
+def test_string_assigned_to_a_numeric_cell_changes_the_cached_statistics(dataset: Dataset):
+    column_index = dataset.column_names.index(INT_COLUMN)
+    dataset.statistic("mean")
+    dataset[0][column_index] = "n/a"
+    assert dataset[0][column_index] == "n/a"
+    with pytest.raises(ValueError):
+        dataset[INT_COLUMN].statistic("mean")
+
+
+def test_data_type_follows_item_assignment(dataset: Dataset):
+    column_index = dataset.column_names.index(INT_COLUMN)
+    for row in dataset:
+        row[column_index] = 0.5
+    assert dataset.get_column_dtype(INT_COLUMN) == "float"
+    assert dataset[INT_COLUMN].statistic("mean") == 0.5
+
+
+def test_reformatted_columns_share_unchanged_storage(dataset: Dataset):
+    reformatted = dataset.reformat()
+    assert np.shares_memory(reformatted[INT_COLUMN].values, dataset[INT_COLUMN].values)
+    assert reformatted.get_column_dtype(INT_COLUMN) == "int"
+    column_index = dataset.column_names.index(INT_COLUMN)
+    value = dataset[0][column_index]
+    reformatted[0][column_index] = value + 1
+    assert dataset[0][column_index] == value and reformatted[0][column_index] == value + 1
+    # Replaced outliers change the column, so it has storage of its own
+    assert not np.shares_memory(dataset.reformat(outlier_action="mean")[INT_COLUMN].values,
+                                dataset[INT_COLUMN].values)
@@ -0,0 +1,136 @@
+import json
+import os
+import pickle
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from dataset.cache import CACHE_FORMAT_VERSION, _get_cache_path, _read_dataset_cache, _write_dataset_cache
+from dataset.constants import DATA_FILE_DIRECTORY, EXCEL_FILE_NAME
+from dataset.datasetclass import Dataset
+
+_unpickled = []
+
+
+def _record_unpickling():
+    _unpickled.append(True)
+
+
+class _Payload:
+
+    # Unpickling this object calls a function, like a malicious cache file could
+
+    def __reduce__(self):
+        return _record_unpickling, ()
+
+
+@pytest.fixture
+def workbook_path(tmp_path) -> str:
+    # A copy of the bundled workbook, so that its cache is written next to the copy
+    path = str(tmp_path / EXCEL_FILE_NAME)
+    shutil.copyfile(os.path.join(DATA_FILE_DIRECTORY, EXCEL_FILE_NAME), path)
+    return path
+
+
+def _assert_same_dataset(dataset: Dataset, other: Dataset):
+    assert dataset.column_names == other.column_names
+    assert str(dataset.schema) == str(other.schema)
+    for column_name in dataset.column_names:
+        assert dataset.get_column_dtype(column_name) == other.get_column_dtype(column_name)
+        np.testing.assert_array_equal(dataset[column_name].values, other[column_name].values)
+
+
+def test_dataset_is_loaded_from_its_cache(workbook_path: str):
+    dataset = Dataset(workbook_path, "Workbook")
+    assert _read_dataset_cache(workbook_path) is not None
+    _assert_same_dataset(dataset, Dataset(workbook_path, "Cache"))
+    # Only plain arrays are stored
+    with np.load(_get_cache_path(workbook_path), allow_pickle=False) as archive:
+        assert all(archive[name].dtype != object for name in archive.files)
+
+
+def test_pickled_cache_is_never_unpickled(workbook_path: str):
+    with open(_get_cache_path(workbook_path), "wb") as file:
+        pickle.dump(_Payload(), file)
+    dataset = Dataset(workbook_path, "Workbook")
+    assert not _unpickled
+    _assert_same_dataset(dataset, Dataset(workbook_path, "Workbook", use_cache=False))
+    # The cache is written again
+    assert _read_dataset_cache(workbook_path) is not None
+
+
+def _write_metadata(cache_path: str, metadata, **arrays):
+    with open(cache_path, "wb") as file:
+        np.savez(file, metadata=np.array(json.dumps(metadata)), **arrays)
+
+
+@pytest.mark.parametrize("corrupt", ["truncated", "empty", "list", "no_fingerprint", "short_fingerprint", "version",
+                                     "dtype_name", "dtype", "length"])
+def test_malformed_cache_is_a_cache_miss(workbook_path: str, corrupt: str):
+    Dataset(workbook_path, "Workbook")
+    cache_path = _get_cache_path(workbook_path)
+    with np.load(cache_path, allow_pickle=False) as archive:
+        metadata = json.loads(archive["metadata"].item())
+        arrays = {name: archive[name] for name in archive.files if name != "metadata"}
+    match corrupt:
+        case "truncated":
+            with open(cache_path, "rb") as file:
+                content = file.read()
+            with open(cache_path, "wb") as file:
+                file.write(content[:len(content) // 2])
+        case "empty":
+            open(cache_path, "wb").close()
+        case "list":
+            _write_metadata(cache_path, [metadata], **arrays)
+        case "no_fingerprint":
+            del metadata["fingerprint"]
+            _write_metadata(cache_path, metadata, **arrays)
+        case "short_fingerprint":
+            metadata["fingerprint"] = metadata["fingerprint"][:2]
+            _write_metadata(cache_path, metadata, **arrays)
+        case "version":
+            metadata["version"] = CACHE_FORMAT_VERSION - 1
+            _write_metadata(cache_path, metadata, **arrays)
+        case "dtype_name":
+            metadata["dtypes"][1] = "complex"
+            _write_metadata(cache_path, metadata, **arrays)
+        case "dtype":
+            arrays["column_1"] = arrays["column_1"].astype(np.int32)
+            _write_metadata(cache_path, metadata, **arrays)
+        case "length":
+            arrays["column_1"] = arrays["column_1"][1:]
+            _write_metadata(cache_path, metadata, **arrays)
+    assert _read_dataset_cache(workbook_path) is None
+    _assert_same_dataset(Dataset(workbook_path, "Workbook"), Dataset(workbook_path, "Workbook", use_cache=False))
+    assert _read_dataset_cache(workbook_path) is not None
+
+
+def test_cache_keeps_the_values_of_other_columns(tmp_path):
+    workbook_path = str(tmp_path / "workbook.xlsx")
+    with open(workbook_path, "wb") as file:
+        file.write(b"contents")
+    text = np.empty(3, dtype=object)
+    text[:] = ["a", np.nan, 3]
+    dates = np.array(["2009-07-21", "NaT", "2010-01-02"], dtype="datetime64[us]")
+    columns = [(dates, datetime), (text, str), (np.array([1.0, np.nan, 3.0]), int)]
+    _write_dataset_cache(workbook_path, ["Date", "Text", "Count"], [("Date", "Title"), ("Count", None)], columns)
+    column_names, schema, cached_columns = _read_dataset_cache(workbook_path)
+    assert column_names == ["Date", "Text", "Count"]
+    assert schema == [("Date", "Title"), ("Count", None)]
+    for (values, dtype), (cached_values, cached_dtype) in zip(columns, cached_columns):
+        assert cached_dtype is dtype and cached_values.dtype == values.dtype
+        assert [value for value in cached_values.tolist() if value == value] == \
+               [value for value in values.tolist() if value == value]
+    assert type(cached_columns[1][0][2]) is int
+
+
+def test_columns_that_cannot_be_cached(tmp_path):
+    workbook_path = str(tmp_path / "workbook.xlsx")
+    with open(workbook_path, "wb") as file:
+        file.write(b"contents")
+    values = np.empty(1, dtype=object)
+    values[:] = [datetime(2009, 7, 21).time()]
+    _write_dataset_cache(workbook_path, ["Time"], [], [(values, type(values[0]))])
+    assert not os.path.exists(_get_cache_path(workbook_path))
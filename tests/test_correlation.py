@@ -0,0 +1,73 @@
+import math
+import statistics
+
+import numpy as np
+import pytest
+from openpyxl import Workbook
+
+from dataset.constants import EXCEL_FILE_NAME
+from dataset.datasetclass import Dataset
+from dataset.export import write_columns_to_worksheet
+from dataset.statmeasures import correlation_matrix
+
+
+@pytest.fixture(scope="module")
+def dataset() -> Dataset:
+    return Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality", use_cache=False)
+
+
+def _ranks(values: list) -> list:
+    # Ranks starting at 1, where tied values share the mean of the ranks they span
+    ranks = [0.0] * len(values)
+    ordered_indexes = sorted(range(len(values)), key=values.__getitem__)
+    start = 0
+    while start < len(ordered_indexes):
+        stop = start
+        while stop < len(ordered_indexes) and values[ordered_indexes[stop]] == values[ordered_indexes[start]]:
+            stop += 1
+        for index in ordered_indexes[start:stop]:
+            ranks[index] = (start + 1 + stop) / 2
+        start = stop
+    return ranks
+
+
+def _expected_coefficient(x: np.ndarray, y: np.ndarray, method: str) -> float:
+    # The coefficient of the rows where both columns have values, ranked over just those rows for Spearman's
+    rows = ~np.isnan(x) & ~np.isnan(y)
+    x, y = x[rows].tolist(), y[rows].tolist()
+    if method == "spearman":
+        x, y = _ranks(x), _ranks(y)
+    try:
+        return statistics.correlation(x, y)
+    except statistics.StatisticsError:
+        return math.nan
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_correlation_is_pairwise_complete(dataset: Dataset, method: str):
+    column_names, matrix = dataset.correlation(method)
+    for i, x_name in enumerate(column_names):
+        for j, y_name in enumerate(column_names):
+            expected = _expected_coefficient(dataset[x_name].values, dataset[y_name].values, method)
+            if math.isnan(expected):
+                assert math.isnan(matrix[i][j]), (x_name, y_name)
+            else:
+                assert matrix[i][j] == pytest.approx(expected, rel=1e-9, abs=1e-12), (x_name, y_name)
+
+
+def test_spearman_ranks_the_shared_rows():
+    # Ranked over all of its values, the first column would be ranked [1, 3, 4] in the rows both have values in
+    data = np.array([[1.0, 10.0], [2.0, np.nan], [3.0, 30.0], [4.0, 20.0]])
+    assert correlation_matrix(data, "spearman")[0, 1] == pytest.approx(0.5)
+
+
+def test_matrix_columns_can_be_exported(dataset: Dataset):
+    column_names, matrix = dataset.correlation("spearman")
+    columns = Dataset.get_matrix_columns(column_names, matrix)
+    assert columns[0] == ["Column Name", *column_names]
+    for column_name, values, column in zip(column_names, matrix, columns[1:]):
+        assert column[0] == column_name
+        assert column[1:] == values
+    worksheet = Workbook().active
+    write_columns_to_worksheet(worksheet, columns)
+    assert [cell.value for cell in worksheet[1]] == ["Column Name", *column_names]
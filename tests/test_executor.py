@@ -0,0 +1,45 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from dataset.config import statistic_executor, statistic_workers
+from dataset.constants import EXCEL_FILE_NAME
+from dataset.datasetclass import Dataset
+from dataset.statmeasures import STATISTICAL_FUNCTIONS, _get_runtime_registrations, _runtime_registrations, \
+    register_statistic
+
+
+def sum_of_squares(data: np.ndarray) -> float:
+    return float(np.dot(data, data))
+
+
+@pytest.fixture
+def spawned_processes():
+    # Workers that are not forked only import the package, like on Windows and macOS
+    start_method = multiprocessing.get_start_method()
+    runtime_registrations = _get_runtime_registrations()
+    multiprocessing.set_start_method("spawn", force=True)
+    statistic_executor.register_value("process")
+    statistic_workers.register_value(2)
+    yield
+    statistic_executor.register_value("serial")
+    statistic_workers.register_value(None)
+    multiprocessing.set_start_method(start_method, force=True)
+    STATISTICAL_FUNCTIONS.pop("sum_of_squares", None)
+    _runtime_registrations.clear()
+    _runtime_registrations.update(runtime_registrations)
+
+
+def test_spawned_workers_know_registered_statistics(spawned_processes):
+    register_statistic("sum_of_squares", sum_of_squares)
+    dataset = Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality", use_cache=False)
+    expected = [STATISTICAL_FUNCTIONS["sum_of_squares"](column) for column in dataset._column_iterator()]
+    assert dataset.get_stat_of_columns("sum_of_squares") == pytest.approx(expected, nan_ok=True)
+
+
+@pytest.mark.parametrize("workers", [0, -1, 1.5, "2"])
+def test_worker_count_must_be_positive(workers):
+    with pytest.raises(ValueError):
+        Dataset.set_config("statistic_workers", workers)
+    assert statistic_workers.value is None
@@ -0,0 +1,73 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+from openpyxl import load_workbook
+
+from dataset.constants import DATA_FILE_DIRECTORY, EXCEL_FILE_NAME
+from dataset.datasetclass import Dataset
+from dataset.export import write_dataset_column_to_worksheet
+from dataset.functions import _column_letter_to_number, _column_number_to_letter, _to_datetime64_array
+
+
+def test_dates_may_mix_native_dates_and_strings(tmp_path):
+    dataset = Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality", use_cache=False)
+    workbook = load_workbook(os.path.join(DATA_FILE_DIRECTORY, EXCEL_FILE_NAME))
+    worksheet = workbook.active
+    date_cells = [row[0] for row in worksheet.iter_rows(min_row=3) if isinstance(row[0].value, str)]
+    # Most of the dates become native Excel dates, so the most frequent data type of the column is datetime
+    for cell in date_cells[:-2]:
+        cell.value = datetime.strptime(cell.value, "%d.%m.%y")
+    workbook_path = str(tmp_path / EXCEL_FILE_NAME)
+    workbook.save(workbook_path)
+
+    mixed_dataset = Dataset(workbook_path, "Mixed dates", use_cache=False)
+    assert mixed_dataset.get_column_dtype("Date", type_string=False) is datetime
+    np.testing.assert_array_equal(mixed_dataset["Date"].values, dataset["Date"].values)
+    assert mixed_dataset["Date"].missing_count == dataset["Date"].missing_count
+
+
+@pytest.mark.parametrize("value", [5, 1.5, True])
+def test_dates_must_be_dates(tmp_path, value):
+    workbook = load_workbook(os.path.join(DATA_FILE_DIRECTORY, EXCEL_FILE_NAME))
+    next(row[0] for row in workbook.active.iter_rows(min_row=3) if row[0].value is not None).value = value
+    workbook_path = str(tmp_path / EXCEL_FILE_NAME)
+    workbook.save(workbook_path)
+    with pytest.raises(TypeError, match="is not a date"):
+        Dataset(workbook_path, "Invalid dates", use_cache=False)
+
+
+def test_dates_of_every_kind():
+    values = np.empty(5, dtype=object)
+    values[:] = ["21.07.09", datetime(2009, 7, 22, 12), datetime(2009, 7, 23).date(), None, np.datetime64("2009-07-24")]
+    np.testing.assert_array_equal(_to_datetime64_array(values), np.array(
+        ["2009-07-21", "2009-07-22T12", "2009-07-23", "NaT", "2009-07-24"], dtype="datetime64[us]"))
+
+
+@pytest.mark.parametrize("number, letter", [(1, "A"), (26, "Z"), (27, "AA"), (52, "AZ"), (53, "BA"), (702, "ZZ"),
+                                            (703, "AAA")])
+def test_column_letters_past_z(number: int, letter: str):
+    assert _column_number_to_letter(number) == letter
+    assert _column_letter_to_number(letter) == number
+    assert _column_letter_to_number(letter.lower()) == number
+
+
+def test_worksheet_wider_than_the_alphabet(tmp_path):
+    dataset = Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality", use_cache=False)
+    workbook = load_workbook(os.path.join(DATA_FILE_DIRECTORY, EXCEL_FILE_NAME))
+    worksheet = workbook.active
+    # The last data row is the first row below the index row whose date cell has a bottom border
+    last_row = next(row for row in range(3, worksheet.max_row + 1) if worksheet.cell(row, 1).border.bottom.style)
+    chl_a = [worksheet.cell(row, 6).value for row in range(3, last_row + 1)]
+    # Copies of the Chl a column fill every column from the first one after the data up to "AD"
+    copy_names = [f"Chl a copy {number}" for number in range(worksheet.max_column, 31)]
+    for number, copy_name in zip(range(worksheet.max_column, 31), copy_names):
+        write_dataset_column_to_worksheet(worksheet, _column_number_to_letter(number), [None, copy_name, *chl_a])
+    workbook_path = str(tmp_path / EXCEL_FILE_NAME)
+    workbook.save(workbook_path)
+
+    wide_dataset = Dataset(workbook_path, "Wide", use_cache=False)
+    assert wide_dataset.column_names == dataset.column_names + copy_names
+    for copy_name in copy_names:
+        np.testing.assert_array_equal(wide_dataset[copy_name].values, dataset["Chl a, µg/L"].values)
@@ -0,0 +1,34 @@
+from datetime import date
+
+import pytest
+
+from dataset.constants import EXCEL_FILE_NAME
+from dataset.datasetclass import Dataset
+from dataset.query import _Expression, col
+
+
+@pytest.fixture(scope="module")
+def dataset() -> Dataset:
+    return Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality", use_cache=False)
+
+
+def test_expressions_must_be_evaluated():
+    class _Incomplete(_Expression):
+        pass
+
+    with pytest.raises(TypeError):
+        _Incomplete()
+
+
+@pytest.mark.parametrize("condition", [col("pH at 0.5m") > "8", col("pH at 0.5m") == "8",
+                                       col("pH at 0.5m").isin(["8"]), col("Date") > 8,
+                                       col("pH at 0.5m") > col("Date")])
+def test_comparisons_of_other_types_name_the_column(dataset: Dataset, condition: _Expression):
+    with pytest.raises(TypeError, match="pH at 0.5m|Date"):
+        dataset.query(condition)
+
+
+def test_comparisons_of_the_same_types(dataset: Dataset):
+    ph_values = dataset["pH at 0.5m"].values
+    assert dataset.query(col("pH at 0.5m") > 8) == [index for index, value in enumerate(ph_values) if value > 8]
+    assert dataset.query(col("Date") < date(2000, 1, 1)) == []
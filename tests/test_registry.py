@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+import pytest
+
+from dataset.statmeasures import STATISTICAL_FUNCTIONS, VECTORIZED_FUNCTIONS, _get_runtime_registrations, \
+    _runtime_registrations, get_statistical_measure, get_vectorized_function, register_statistic
+
+
+@pytest.fixture
+def restore_registry():
+    # Registers the replaced statistics again once the test is done
+    measures = {function_name: STATISTICAL_FUNCTIONS[function_name] for function_name in ("z_score", "median", "q2")}
+    vectorized_functions = {function_name: VECTORIZED_FUNCTIONS.get(function_name) for function_name in measures}
+    runtime_registrations = _get_runtime_registrations()
+    yield
+    for function_name, measure in measures.items():
+        register_statistic(function_name, measure.function, extra_args=measure.extra_args,
+                           vectorized=vectorized_functions[function_name], sorted_input=measure.sorted_input,
+                           intermediates=measure.intermediates, min_count=measure.min_count, replace=True)
+    # The built-in statistics are not given to worker processes again
+    _runtime_registrations.clear()
+    _runtime_registrations.update(runtime_registrations)
+
+
+def test_replaced_statistic_is_found_by_its_function(restore_registry):
+    replaced_function = STATISTICAL_FUNCTIONS["z_score"].function
+
+    def z_score(data: np.ndarray, value: float) -> float:
+        return value
+
+    def vectorized_z_score(data: np.ndarray) -> np.ndarray:
+        return data
+
+    measure = register_statistic("z_score", z_score, vectorized=vectorized_z_score, replace=True)
+    assert get_statistical_measure(z_score) is measure
+    assert get_vectorized_function(z_score) is vectorized_z_score
+    assert get_statistical_measure(replaced_function) is None
+    assert get_vectorized_function(replaced_function) is None
+
+
+def test_replaced_alias_keeps_the_shared_function(restore_registry):
+    # median and q2 are the same function, registered under two names
+    median_function = STATISTICAL_FUNCTIONS["median"].function
+    register_statistic("median", lambda data: 0, extra_args=0, replace=True)
+    assert get_statistical_measure(median_function) is STATISTICAL_FUNCTIONS["q2"]
+    register_statistic("q2", lambda data: 0, extra_args=0, replace=True)
+    assert get_statistical_measure(median_function) is None
+
+
+@pytest.mark.parametrize("data, expected", [([0.0, 1.0, 2.0], 0.0), ([-1.0, 2.0, 3.0], math.nan),
+                                            ([1.5, np.nan, 2.0], math.sqrt(3.0))])
+def test_geometric_mean(data: list, expected: float):
+    result = STATISTICAL_FUNCTIONS["geometric_mean"](data)
+    assert result == pytest.approx(expected, nan_ok=True)
@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+import pytest
+
+from dataset.config import approximate_quantiles, quantile_sketch_error
+from dataset.sketch import QuantileSketch
+from dataset.statmeasures import STATISTICAL_FUNCTIONS, VECTORIZED_FUNCTIONS
+
+
+@pytest.fixture(params=[False, True], ids=["exact", "approximate"])
+def quantile_mode(request):
+    approximate_quantiles.register_value(request.param)
+    yield request.param
+    approximate_quantiles.register_value(False)
+
+
+@pytest.mark.parametrize("predicate", ["outlier", "upper_outlier", "lower_outlier"])
+def test_outlier_predicates_treat_missing_values_alike(quantile_mode: bool, predicate: str):
+    data = np.array([-100.0, 1.0, 2.0, 3.0, 2.5, 100.0])
+    data_with_missing = np.append(data, np.nan)
+    expected = {"outlier": [True, False, False, False, False, True], "upper_outlier": [False] * 5 + [True],
+                "lower_outlier": [True] + [False] * 5}[predicate]
+    assert VECTORIZED_FUNCTIONS[predicate](data).tolist() == expected
+    # Like np.percentile, the fences of data with missing values are nan
+    assert not VECTORIZED_FUNCTIONS[predicate](data_with_missing).any()
+    # The statistic itself is given the data without its missing values
+    assert STATISTICAL_FUNCTIONS[predicate](data_with_missing.tolist(), [100.0]) == (predicate != "lower_outlier")
+
+
+def test_merged_chunks_match_one_sketch():
+    values = np.random.default_rng(1).normal(size=50_000)
+    merged_sketch = QuantileSketch(0.01)
+    for chunk in np.array_split(values, 7):
+        merged_sketch.merge(QuantileSketch(0.01).update(chunk))
+    assert merged_sketch.count == len(values)
+    assert merged_sketch.retained_items < len(values) / 10
+    for fraction in (0.25, 0.5, 0.75):
+        rank = np.searchsorted(np.sort(values), merged_sketch.quantile(fraction)) / len(values)
+        assert math.isclose(rank, fraction, abs_tol=0.02)
+
+
+@pytest.mark.parametrize("error", [0, 1, -0.5, 1.5, math.nan, True, "0.01"])
+def test_sketch_error_outside_zero_and_one(error):
+    with pytest.raises(ValueError):
+        quantile_sketch_error.register_value(error)
+    assert quantile_sketch_error.value == 0.01
+    if type(error) is not str:
+        with pytest.raises(ValueError):
+            QuantileSketch(error)
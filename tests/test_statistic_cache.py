@@ -0,0 +1,59 @@
+import pytest
+
+from dataset.constants import EXCEL_FILE_NAME
+from dataset.datasetclass import Dataset
+
+COLUMN = "Chl a, µg/L"
+
+
+@pytest.fixture
+def dataset() -> Dataset:
+    return Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality", use_cache=False)
+
+
+def _fresh_mean(dataset: Dataset) -> float:
+    # The mean computed without the statistic cache, from a copy of the column's current values
+    fresh_dataset = Dataset(EXCEL_FILE_NAME, "Fresh", use_cache=False)
+    fresh_dataset[COLUMN] = list(dataset[COLUMN])
+    return fresh_dataset[COLUMN].statistic("mean")
+
+
+def test_remembered_statistic_is_served(dataset: Dataset):
+    mean = dataset[COLUMN].statistic("mean")
+    hits = dataset.statistic_cache_info()["hits"]
+    assert dataset[COLUMN].statistic("mean") == mean
+    assert dataset.statistic_cache_info()["hits"] == hits + 1
+
+
+def test_item_assignment_invalidates_the_column(dataset: Dataset):
+    column_index = dataset.column_names.index(COLUMN)
+    mean = dataset[COLUMN].statistic("mean")
+    dataset[0][column_index] = dataset[0][column_index] + 100
+    assert dataset[COLUMN].statistic("mean") == pytest.approx(_fresh_mean(dataset))
+    assert dataset[COLUMN].statistic("mean") != mean
+
+
+def test_column_assignment_invalidates_the_column(dataset: Dataset):
+    other_mean = dataset["Total N,mg/L as N"].statistic("mean")
+    dataset[COLUMN].statistic("mean")
+    dataset[COLUMN] = [1] * len(dataset)
+    assert dataset[COLUMN].statistic("mean") == 1
+    # The statistics of the other columns are still remembered
+    hits = dataset.statistic_cache_info()["hits"]
+    assert dataset["Total N,mg/L as N"].statistic("mean") == other_mean
+    assert dataset.statistic_cache_info()["hits"] == hits + 1
+
+
+def test_applied_function_invalidates_the_row(dataset: Dataset):
+    mean = dataset[COLUMN].statistic("mean")
+    dataset[0].apply_function(lambda value: value * 0 if type(value) in (int, float) else value)
+    assert dataset[COLUMN].statistic("mean") == pytest.approx(_fresh_mean(dataset))
+    assert dataset[COLUMN].statistic("mean") != mean
+
+
+def test_statistics_table_after_a_mutation(dataset: Dataset):
+    before = dataset.statistics(["mean", "median"], [COLUMN])
+    dataset[COLUMN] = [2] * len(dataset)
+    after = dataset.statistics(["mean", "median"], [COLUMN])
+    assert after["Value"] == [2, 2]
+    assert after["Value"] != before["Value"]
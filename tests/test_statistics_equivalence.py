@@ -0,0 +1,83 @@
+import json
+import math
+import os
+from itertools import product
+
+import numpy as np
+import pytest
+
+from dataset.constants import EXCEL_FILE_NAME
+from dataset.datasetclass import Dataset
+from dataset.statmeasures import statistical_summary
+
+# Every statistic without extra arguments of every column of the bundled workbook, under every combination of
+# na_action, outlier_action and round_dp, as computed by the list-based statistics of the baseline commit
+# Errors are recorded by the name of the exception, e.g. rounding the list returned by mode raises a TypeError
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "data", "baseline_statistics.json")
+# na_action="median" is left out on purpose: the baseline sorted data that still contained nan, so its result
+# depended on the order of the rows. Missing values are now filled with the median of the other values
+NA_ACTIONS = ["ignore", "remove", "average", "mean"]
+OUTLIER_ACTIONS = ["keep", "remove", "ignore", "average", "mean", "median"]
+ROUND_DPS = [None, 0, 2]
+
+with open(BASELINE_FILE, encoding="utf-8") as baseline_file:
+    BASELINE = json.load(baseline_file)
+
+STATISTICS = sorted({key.split("|")[0] for key in BASELINE["results"]})
+
+
+def _python_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, list):
+        return list(map(_python_value, value))
+    return value
+
+
+def _assert_same(value, expected, description: str):
+    # Values must match exactly, including their type (e.g. the range of an int column is an int)
+    if isinstance(expected, list):
+        assert isinstance(value, list) and len(value) == len(expected), description
+        for item, expected_item in zip(value, expected):
+            _assert_same(item, expected_item, description)
+    elif isinstance(expected, float) and math.isnan(expected):
+        assert isinstance(value, float) and math.isnan(value), description
+    else:
+        assert type(value) is type(expected) and value == expected, f"{description}: {value!r} != {expected!r}"
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["workbook", "cache"])
+def dataset(request) -> Dataset:
+    # Loaded from the workbook, then from the cache written by that load
+    return Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality", use_cache=request.param)
+
+
+def test_baseline_columns(dataset: Dataset):
+    assert dataset.column_names == BASELINE["columns"]
+
+
+@pytest.mark.parametrize("statistic", STATISTICS)
+def test_statistics_match_baseline(dataset: Dataset, statistic: str):
+    for na_action, outlier_action, round_dp in product(NA_ACTIONS, OUTLIER_ACTIONS, ROUND_DPS):
+        options = {"na_action": na_action, "outlier_action": outlier_action, "round_dp": round_dp}
+        expected_values = BASELINE["results"][f"{statistic}|{na_action}|{outlier_action}|{round_dp}"]
+        for column_name, expected in zip(BASELINE["columns"], expected_values):
+            description = f"{statistic} of {column_name!r} with {options}"
+            if isinstance(expected, dict):
+                with pytest.raises(Exception) as exception_info:
+                    dataset[column_name].statistic(statistic, **options)
+                assert type(exception_info.value).__name__ == expected["error"], description
+                continue
+            _assert_same(_python_value(dataset[column_name].statistic(statistic, **options)), expected, description)
+
+
+@pytest.mark.parametrize("na_action, outlier_action", list(product(NA_ACTIONS, OUTLIER_ACTIONS)))
+def test_summary_matches_baseline(dataset: Dataset, na_action: str, outlier_action: str):
+    # The summary shares one sort of the data, yet must give the same values as the statistics one by one
+    for column_index, column_name in enumerate(BASELINE["columns"][1:], 1):
+        summary = statistical_summary(dataset[column_name], na_action=na_action, outlier_action=outlier_action)
+        for statistic in STATISTICS:
+            if statistic in summary:
+                expected = BASELINE["results"][f"{statistic}|{na_action}|{outlier_action}|None"][column_index]
+                _assert_same(_python_value(summary[statistic]), expected,
+                             f"summary {statistic} of {column_name!r} with {na_action}, {outlier_action}")
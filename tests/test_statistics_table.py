@@ -0,0 +1,41 @@
+import math
+
+import pytest
+
+from dataset.constants import EXCEL_FILE_NAME
+from dataset.datasetclass import Dataset
+
+COLUMN = "Biovolume, mm3/L"
+
+
+@pytest.fixture(scope="module")
+def dataset() -> Dataset:
+    return Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality", use_cache=False)
+
+
+def _column_statistics(table, column_name: str) -> dict:
+    return {statistic: value for name, statistic, value in zip(table["Column Name"], table["Statistic"], table["Value"])
+            if name == column_name}
+
+
+def test_statistics_of_one_row(dataset: Dataset):
+    one_row = dataset.between("2009-07-21", "2009-07-21")
+    value = one_row[COLUMN][0]
+    statistics = _column_statistics(one_row.statistics(["mean", "count", "min", "max", "median", "mode", "stdev"]),
+                                    COLUMN)
+    assert statistics["count"] == 1
+    assert statistics["mean"] == statistics["min"] == statistics["max"] == statistics["median"] == value
+    assert statistics["mode"] == [value]
+    assert math.isnan(statistics["stdev"])
+
+
+def test_statistics_without_rows(dataset: Dataset):
+    no_rows = dataset.between("1990-01-01", "1990-01-02")
+    statistics = _column_statistics(no_rows.statistics(["count", "min", "mean"], columns=[COLUMN]), COLUMN)
+    assert statistics["count"] == 0 and math.isnan(statistics["min"]) and math.isnan(statistics["mean"])
+
+
+@pytest.mark.parametrize("statistic, message", [("percentile", "takes arguments"), ("average", "Unknown")])
+def test_statistics_are_validated(dataset: Dataset, statistic: str, message: str):
+    with pytest.raises(ValueError, match=message):
+        dataset.statistics(["mean", statistic])
@@ -0,0 +1,135 @@
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from dataset.constants import EXCEL_FILE_NAME
+from dataset.datasetclass import Dataset
+from dataset.statmeasures import STATISTICAL_FUNCTIONS
+from dataset.timeseries import ROLLING_STATISTICS, _rolling_statistic
+
+# Statistics of a sample, which are missing for windows of a single value
+SAMPLE_STATISTICS = ("variance", "stdev", "se", "cv")
+
+
+@pytest.fixture(scope="module")
+def dataset() -> Dataset:
+    return Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality", use_cache=False)
+
+
+def _expected_statistic(window_values: np.ndarray, statistic: str) -> float:
+    # The registered statistic of the window's values, or nan if the window has too few of them
+    if np.count_nonzero(~np.isnan(window_values)) < (2 if statistic in SAMPLE_STATISTICS else 1):
+        return math.nan
+    return STATISTICAL_FUNCTIONS[statistic](window_values.tolist())
+
+
+def _assert_close(values: np.ndarray, expected_values: list):
+    for value, expected in zip(values.tolist(), expected_values):
+        if math.isnan(expected):
+            assert math.isnan(value)
+        else:
+            assert value == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.parametrize("days", [1, 30, 90, 365])
+@pytest.mark.parametrize("statistic", ROLLING_STATISTICS)
+def test_rolling_matches_sliced_windows(dataset: Dataset, statistic: str, days: int):
+    window = np.timedelta64(timedelta(days=days))
+    dates = dataset["Date"].values
+    order = np.argsort(dates, kind="stable")
+    sorted_dates = dates[order]
+    rolling_dataset = dataset.rolling(timedelta(days=days), statistic)
+    assert rolling_dataset["Date"].values.tolist() == sorted_dates.tolist()
+    for column_name in dataset.column_names[1:]:
+        values = dataset[column_name].values[order]
+        # Each window reaches back over the window from its own measurement: (date - window, date]
+        expected_values = [_expected_statistic(values[np.searchsorted(sorted_dates, date - window, "right"):stop],
+                                               statistic) for stop, date in enumerate(sorted_dates, 1)]
+        _assert_close(rolling_dataset[column_name].values, expected_values)
+
+
+@pytest.mark.parametrize("statistic", ["variance", "stdev", "se", "cv"])
+def test_rolling_windows_with_small_variance_after_large_values(statistic: str):
+    # The prefix sums of many widely spread values are too imprecise for the deviations of the later windows
+    random = np.random.default_rng(0)
+    values = np.concatenate((random.normal(0, 100, 10_000), random.normal(5, 1e-3, 200)))
+    values[::97] = np.nan
+    starts = np.maximum(np.arange(len(values)) - 49, 0)
+    rolling_values = _rolling_statistic(values, starts, statistic)
+    expected_values = [_expected_statistic(values[start:stop], statistic)
+                       for stop, start in enumerate(starts.tolist(), 1)]
+    _assert_close(rolling_values, expected_values)
+    assert (rolling_values[-150:] > 0).all()
+
+
+def test_rolling_windows_of_equal_values():
+    values = np.concatenate((np.linspace(-1e6, 1e6, 1000), np.full(100, 0.1)))
+    rolling_stdev = _rolling_statistic(values, np.maximum(np.arange(len(values)) - 9, 0), "stdev")
+    assert rolling_stdev[-90:] == pytest.approx(0, abs=1e-15)
+
+
+@pytest.mark.parametrize("statistic", ["median", "q1", "q2", "q3", "iqr"])
+def test_rolling_quantiles_of_repeated_values(statistic: str):
+    # Equal values enter and leave the sorted window many times
+    random = np.random.default_rng(1)
+    values = random.integers(0, 8, 2000).astype(np.float64)
+    values[::13] = np.nan
+    starts = np.maximum(np.arange(len(values)) - random.integers(0, 40, len(values)), 0)
+    starts = np.maximum.accumulate(starts)
+    rolling_values = _rolling_statistic(values, starts, statistic)
+    expected_values = [_expected_statistic(values[start:stop], statistic)
+                       for stop, start in enumerate(starts.tolist(), 1)]
+    _assert_close(rolling_values, expected_values)
+
+
+def test_statistics_that_cannot_be_rolled(dataset: Dataset):
+    with pytest.raises(ValueError, match="cannot be rolled"):
+        dataset.rolling(timedelta(days=30), "mode")
+    with pytest.raises(ValueError, match="round_dp"):
+        dataset.rolling(timedelta(days=30), "mean", outlier_action="remove")
+    with pytest.raises(ValueError, match="round_dp"):
+        dataset.rolling(timedelta(days=30), "median", na_action="mean")
+
+
+def test_between_includes_both_ends(dataset: Dataset):
+    dates = [row[0] for row in dataset.between("2009-07-21", "2009-08-19")]
+    assert dates == [datetime(2009, 7, 21), datetime(2009, 8, 5), datetime(2009, 8, 19)]
+    assert [row[0] for row in dataset.between(datetime(2009, 8, 5), datetime(2009, 8, 5))] == [datetime(2009, 8, 5)]
+
+
+@pytest.mark.parametrize("start, end", [("2000-01-01", "2009-07-20"), ("2011-06-23", "2020-01-01"),
+                                        ("2009-07-22", "2009-08-04"), ("2010-01-01", "2009-01-01")])
+def test_between_without_measurements(dataset: Dataset, start: str, end: str):
+    assert len(dataset.between(start, end)) == 0
+
+
+def test_asof_and_nearest_at_measurements(dataset: Dataset):
+    assert dataset.asof("2009-08-05")[0] == datetime(2009, 8, 5)
+    assert dataset.nearest("2009-08-05")[0] == datetime(2009, 8, 5)
+    assert dataset.asof("2009-08-04")[0] == datetime(2009, 7, 21)
+    assert dataset.nearest("2009-08-04")[0] == datetime(2009, 8, 5)
+    # Halfway between two measurements, the earlier one is the nearest
+    assert dataset.nearest("2009-07-28T12:00")[0] == datetime(2009, 7, 21)
+    assert dataset.nearest("2009-07-28T12:01")[0] == datetime(2009, 8, 5)
+
+
+def test_asof_and_nearest_outside_the_measurements(dataset: Dataset):
+    assert dataset.asof("2009-07-20") is None
+    assert dataset.nearest("2009-07-20")[0] == datetime(2009, 7, 21)
+    assert dataset.asof("2020-01-01")[0] == datetime(2011, 6, 22)
+    assert dataset.nearest("2020-01-01")[0] == datetime(2011, 6, 22)
+
+
+def test_rows_without_a_date_are_never_found():
+    dataset = Dataset(EXCEL_FILE_NAME, "Logan's Dam Water Quality", use_cache=False)
+    dataset[1][0] = None
+    assert [row[0] for row in dataset.between("2009-07-21", "2009-08-19")] == [datetime(2009, 7, 21),
+                                                                                datetime(2009, 8, 19)]
+    assert dataset.asof("2009-08-05")[0] == datetime(2009, 7, 21)
+    assert dataset.nearest("2009-08-06")[0] == datetime(2009, 8, 19)
+    for row in range(len(dataset)):
+        dataset[row][0] = None
+    assert len(dataset.between("2000-01-01", "2020-01-01")) == 0
+    assert dataset.asof("2020-01-01") is None and dataset.nearest("2020-01-01") is None
@@ -3,6 +3,13 @@ __all__ = [
     "get_valid_filename_input",
     "get_valid_worksheet_name",
     "get_workbook_mapping",
+    "get_saved_workbook_names",
+    "get_saved_workbook",
+    "get_workbook_name",
+    "save_workbook_in_background",
+    "wait_for_workbook_save",
+    "wait_for_all_saves",
+    "collect_finished_saves",
     "get_formatted_statistical_function_list",
     "get_statistical_measure_of_region",
     "get_dataset_or_stat_kwargs",
@@ -17,9 +24,10 @@ __all__ = [
 ]
 
 import os
-from inspect import signature
-from typing import Pattern, Callable, Dict, Tuple, List, Literal, Optional, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Pattern, Dict, Tuple, List, Literal, Optional, Iterable
 from openpyxl import load_workbook
+from openpyxl.workbook import Workbook
 
 from dataset.constants import FOLDER_DIRECTORY, VALID_NUMERIC_MATCH
 from dataset.statmeasures import STATISTICAL_FUNCTIONS  # get_base_statistical_function
@@ -50,6 +58,27 @@ def _get_excel_file_names():
     yield from (filename for filename in os.listdir(WORKBOOK_DIRECTORY))
 
 
+# Workbooks saved as files are loaded when first needed, then reused for as long as their file is unchanged
+# Filenames are mapped to the modification time of the file when it was loaded (or saved) and the workbook
+_workbook_handles: Dict[str, Tuple[int, Workbook]] = {}
+# Saves run on one background worker (in the order they were requested) so that the menus stay responsive
+_save_executor: Optional[ThreadPoolExecutor] = None
+_pending_saves: List[Tuple[str, Workbook, str, Future]] = []
+
+
+def _save_workbook(workbook: Workbook, file_path: str):
+    # Written to a hidden temporary file first so that the workbook list never sees a partly written file
+    directory, filename = os.path.split(file_path)
+    temporary_path = os.path.join(directory, f".{filename}.tmp")
+    try:
+        workbook.save(temporary_path)
+        os.replace(temporary_path, file_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
 def _join_with_string(join_str: str, end_str: str, iterable: Iterable) -> str:
     items = list(iterable)
     last_item = items.pop(-1)
@@ -84,27 +113,87 @@ def get_valid_worksheet_name(existing_sheetnames: List[str]):
                               VALID_EXCEL_SHEET_NAME, existing_sheetnames)
 
 
-def get_workbook_mapping() -> Dict[str, Callable]:
+def get_saved_workbook_names() -> List[str]:
+    # A scan of the workbooks folder; no workbook is loaded
+    if not os.path.isdir(WORKBOOK_DIRECTORY):
+        return []
+    return [filename for filename in _get_excel_file_names() if not filename.startswith(".")]
+
+
+def get_saved_workbook(filename: str) -> Workbook:
+    # The same workbook is returned until its file is modified (e.g. by another program), when it is loaded again
+    file_path = os.path.join(WORKBOOK_DIRECTORY, filename)
+    modified_time = os.stat(file_path).st_mtime_ns
+    handle = _workbook_handles.get(filename)
+    if handle is None or handle[0] != modified_time:
+        handle = _workbook_handles[filename] = (modified_time, load_workbook(file_path))
+    return handle[1]
+
+
+def get_workbook_mapping() -> Dict[str, Workbook]:
     # Made a function so that data is updated each time it is called
-    excel_files = list(_get_excel_file_names())
-    if excel_files:
-        return {filename: load_workbook(filename=os.path.join("workbooks", filename)) for filename in excel_files
-                if not filename.startswith(".")}
-    else:
-        return {}
+    # Loads every saved workbook (only once each, see get_saved_workbook); prefer get_saved_workbook_names for names
+    return {filename: get_saved_workbook(filename) for filename in get_saved_workbook_names()}
+
+
+def get_workbook_name(workbook: Optional[Workbook], unsaved: dict) -> Optional[str]:
+    # Saved workbooks are only searched for among the loaded ones, since a workbook in use has been loaded
+    if workbook is None:
+        return None
+    for workbook_name, unsaved_workbook in unsaved.items():
+        if unsaved_workbook is workbook:
+            return workbook_name
+    for filename, (_, saved_workbook) in _workbook_handles.items():
+        if saved_workbook is workbook:
+            return filename
+    return None
+
+
+def save_workbook_in_background(workbook_name: str, workbook: Workbook, file_path: str):
+    # The result is collected with collect_finished_saves
+    global _save_executor
+    if _save_executor is None:
+        _save_executor = ThreadPoolExecutor(max_workers=1)
+    future = _save_executor.submit(_save_workbook, workbook, file_path)
+    _pending_saves.append((workbook_name, workbook, file_path, future))
+
+
+def wait_for_workbook_save(workbook: Optional[Workbook]):
+    # A workbook must not be modified while it is being written to its file
+    wait([future for _, pending_workbook, _, future in _pending_saves if pending_workbook is workbook])
+
+
+def wait_for_all_saves():
+    wait([future for *_, future in _pending_saves])
+
+
+def collect_finished_saves() -> List[Tuple[str, Workbook, Optional[BaseException]]]:
+    # The name, workbook and error (None if it was saved) of every save that has finished since the last call
+    finished_saves = []
+    for pending_save in [pending_save for pending_save in _pending_saves if pending_save[3].done()]:
+        _pending_saves.remove(pending_save)
+        workbook_name, workbook, file_path, future = pending_save
+        if (error := future.exception()) is None:
+            # The saved workbook is the one the file now holds, so it does not need to be loaded again
+            filename = os.path.basename(file_path)
+            _workbook_handles[filename] = (os.stat(file_path).st_mtime_ns, workbook)
+        finished_saves.append((workbook_name, workbook, error))
+    return finished_saves
+
 
 def get_single_argument_functions(function_mapping: dict) -> dict:
     return {function_name: statmeasure.function for function_name, statmeasure in function_mapping.items()
-            if len(signature(statmeasure.function).parameters) == 1}
+            if not statmeasure.extra_args}
 
 
-def label_workbooks(unsaved: dict, saved: dict) -> List[Tuple[str, str]]:
+def label_workbooks(unsaved: Iterable[str], saved: Iterable[str]) -> List[Tuple[str, str]]:
     labelled_workbooks = [(workbook_name, "(Unsaved)") for workbook_name in unsaved]
     labelled_workbooks.extend((workbook_name, "(Saved as file)") for workbook_name in saved)
     return sorted(labelled_workbooks)
 
 
 def get_formatted_statistical_function_list() -> list:
+    # Every registered statistic without extra arguments is offered, including declared ones like geometric_mean
     filtered_functions = get_single_argument_functions(STATISTICAL_FUNCTIONS)
     return sorted(map(lambda function_name: function_name.upper() if len(function_name) <= 3 else function_name.title(),
                       filtered_functions))